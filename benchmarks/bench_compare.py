@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/compare's single grouped query against the per-symbol
+queries a /report load runs, as the number of symbols grows.
+
+    python -m benchmarks.bench_compare [--mentions-per-symbol 200] [--repeat 5]
+
+Runs against a throwaway SQLite database unless DATABASE_URL is set.
+Prints one JSON document with timings and statement counts.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func
+
+SIZES = [10, 50, 100, 250, 500]
+
+
+def seed(db, SocialMention, StockQuote, n_symbols: int, per_symbol: int):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    mentions = []
+    quotes = []
+    for i in range(n_symbols):
+        sym = f"S{i:03d}"
+        for j in range(per_symbol):
+            mentions.append({
+                "platform": "news",
+                "source": "gdelt",
+                "symbol": sym,
+                "created_at": now - timedelta(minutes=rng.randint(0, 60 * 48)),
+                "fetched_at": now,
+                "text": f"{sym} headline {j}",
+                "url": f"https://example.com/{sym}/{j}",
+                "sentiment": rng.uniform(-1, 1),
+            })
+        for k in range(5):
+            quotes.append({
+                "symbol": f"{sym}.US",
+                "market_ts": now - timedelta(hours=k),
+                "fetched_at": now - timedelta(hours=k),
+                "close": 100 + rng.random(),
+            })
+    db.session.execute(SocialMention.__table__.insert(), mentions)
+    db.session.execute(StockQuote.__table__.insert(), quotes)
+    db.session.commit()
+
+
+def per_symbol_queries(db, SocialMention, StockQuote, symbols, since):
+    """What N separate /report loads cost: two aggregates + latest quote each."""
+    out = []
+    for sym in symbols:
+        base = (
+            db.session.query(SocialMention)
+            .filter(SocialMention.platform == "news")
+            .filter(SocialMention.symbol == sym)
+            .filter(SocialMention.created_at >= since)
+        )
+        count = base.with_entities(func.count(SocialMention.id)).scalar()
+        avg = base.with_entities(func.avg(SocialMention.sentiment)).scalar()
+        quote = (
+            StockQuote.query.filter_by(symbol=f"{sym}.US")
+            .order_by(StockQuote.market_ts.desc())
+            .first()
+        )
+        out.append((sym, count, avg, quote.close if quote else None))
+    return out
+
+
+def timed(fn, repeat: int, counter: dict) -> dict:
+    samples = []
+    counter["n"] = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "min_ms": round(min(samples) * 1000, 3),
+        "statements": counter["n"] // repeat,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mentions-per-symbol", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    tmp_path = None
+    if not os.getenv("DATABASE_URL"):
+        tmp_path = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False).name
+        os.environ["DATABASE_URL"] = f"sqlite:///{tmp_path}"
+
+    from src.app import create_app
+    from src.compare import compare_symbols
+    from src.db import db
+    from src.models import SocialMention, StockQuote
+
+    app = create_app()
+    results = []
+    with app.app_context():
+        db.create_all()
+        dialect = db.engine.dialect.name
+        seed(db, SocialMention, StockQuote, max(SIZES), args.mentions_per_symbol)
+
+        counter = {"n": 0}
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def _count(*_a, **_kw):
+            counter["n"] += 1
+
+        since = datetime.utcnow() - timedelta(hours=24)
+        for n in SIZES:
+            symbols = [f"S{i:03d}" for i in range(n)]
+            pairs = [(s, f"{s}.US") for s in symbols]
+            results.append({
+                "symbols": n,
+                "grouped": timed(lambda: compare_symbols(db.session, pairs, since), args.repeat, counter),
+                "per_symbol": timed(
+                    lambda: per_symbol_queries(db, SocialMention, StockQuote, symbols, since),
+                    args.repeat,
+                    counter,
+                ),
+            })
+
+    json.dump({
+        "benchmark": "compare",
+        "dialect": dialect,
+        "mentions_per_symbol": args.mentions_per_symbol,
+        "results": results,
+    }, sys.stdout, indent=2)
+    print()
+
+    if tmp_path:
+        os.unlink(tmp_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Load test the web tier against stubbed upstreams, once per gunicorn worker class.
+
+    python -m benchmarks.loadtest --modes sync,gevent --latency-ms 500 --concurrency 50
+    python -m benchmarks.loadtest --seed-mentions 1000000 --paths /report?symbol=S000
+
+For each mode it starts gunicorn with the same number of worker processes
+(WEB_CONCURRENCY, i.e. one dyno's worth), fires `--requests` requests from
+`--concurrency` client threads, and reports throughput, latency percentiles
+and the in-flight request count the dyno actually sustained.
+Prints one JSON document.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.stub_upstream import StubUpstream
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server at {url} did not become ready")
+
+
+def prepare_database(env: dict, seed_mentions: int = 0, seed_symbols: int = 50):
+    """Create the schema once so /report has tables to read, optionally seeded with synthetic data."""
+    if seed_mentions:
+        cmd = [sys.executable, "-m", "scripts.generate_synthetic",
+               "--mentions", str(seed_mentions), "--num-symbols", str(seed_symbols)]
+    else:
+        code = "from src.app import create_app; from src.db import db\napp = create_app()\nwith app.app_context(): db.create_all()"
+        cmd = [sys.executable, "-c", code]
+    subprocess.run(cmd, env=env, cwd=PROJECT_ROOT, check=True)
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def run_mode(mode: str, args, base_env: dict) -> dict:
+    port = free_port()
+    env = dict(base_env, WEB_WORKER_CLASS=mode, WEB_CONCURRENCY=str(args.workers))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}", "src.app:app"],
+        env=env,
+        cwd=PROJECT_ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        wait_ready(f"{base}/health")
+
+        def hit(i):
+            path = args.paths[i % len(args.paths)]
+            t0 = time.perf_counter()
+            try:
+                ok = requests.get(base + path, timeout=args.timeout).status_code < 500
+            except requests.RequestException:
+                ok = False
+            return ok, time.perf_counter() - t0
+
+        t_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(hit, range(args.requests)))
+        wall = time.perf_counter() - t_start
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+    latencies = [dt for ok, dt in results if ok]
+    errors = sum(1 for ok, _ in results if not ok)
+    throughput = len(latencies) / wall if wall else 0.0
+    return {
+        "mode": mode,
+        "workers": args.workers,
+        "requests": args.requests,
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(throughput, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+        # requests the dyno kept waiting on upstreams at once (throughput x upstream latency)
+        "effective_concurrency": round(throughput * args.latency_ms / 1000.0, 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare gunicorn worker classes under I/O-bound load.")
+    parser.add_argument("--modes", default="sync,gevent")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes (one dyno)")
+    parser.add_argument("--concurrency", type=int, default=50, help="client threads")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="added upstream latency")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument(
+        "--paths",
+        default="/api/search?q=apple,/report?symbol=apple",
+        help="comma-separated request paths, used round-robin",
+    )
+    parser.add_argument("--seed-mentions", type=int, default=0,
+                        help="preload this many synthetic mentions (symbols S000.., S000 busiest)")
+    parser.add_argument("--seed-symbols", type=int, default=50)
+    args = parser.parse_args(argv)
+    args.paths = [p for p in args.paths.split(",") if p]
+
+    with tempfile.TemporaryDirectory() as tmp, StubUpstream(latency_ms=args.latency_ms) as stub:
+        env = dict(os.environ)
+        env.update(stub.env())
+        env["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'loadtest.sqlite3')}"
+        env["REDIS_URL"] = ""
+        env["DYNO"] = "loadtest"  # no localhost Redis fallback
+        env["PYTHONPATH"] = PROJECT_ROOT
+        prepare_database(env, args.seed_mentions, args.seed_symbols)
+
+        results = [run_mode(mode.strip(), args, env) for mode in args.modes.split(",") if mode.strip()]
+
+    json.dump({
+        "benchmark": "loadtest",
+        "upstream_latency_ms": args.latency_ms,
+        "concurrency": args.concurrency,
+        "paths": args.paths,
+        "seed_mentions": args.seed_mentions,
+        "results": results,
+    }, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite. Upstreams are served from benchmarks/fixtures by a
+local stub, so runs are repeatable and need no network or API keys.
+
+    python -m benchmarks.run                                  # all benchmarks, 10k-row report
+    python -m benchmarks.run --sizes 10k,1m,10m --out results.json
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --baseline benchmarks/baseline.json   # exit 1 on regression
+
+Benchmarks:
+  vader         VADER scoring rows/sec over the recorded GDELT headlines
+  gdelt_ingest  GDELT fetch -> dedup -> score -> insert, rows/sec
+  collection    end-to-end quote + news collection, seconds per symbol
+  report        /report latency with N stored mentions (SQLite, and Postgres
+                when BENCH_POSTGRES_URL points at a scratch database)
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.stub_upstream import StubUpstream, load_fixture
+
+SIZE_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_size(value: str) -> int:
+    value = value.strip().lower()
+    if value and value[-1] in SIZE_SUFFIXES:
+        return int(float(value[:-1]) * SIZE_SUFFIXES[value[-1]])
+    return int(value)
+
+
+def metric(value: float, unit: str, better: str) -> dict:
+    return {"value": round(value, 4), "unit": unit, "better": better}
+
+
+@contextlib.contextmanager
+def scratch_database(url: str | None = None):
+    """Point DATABASE_URL at `url` or a throwaway SQLite file, with a fresh schema."""
+    from src.app import create_app
+    from src.db import db
+
+    old = os.environ.get("DATABASE_URL")
+    tmp = None
+    if url is None:
+        tmp = tempfile.NamedTemporaryFile(suffix=".sqlite3", delete=False).name
+        url = f"sqlite:///{tmp}"
+    os.environ["DATABASE_URL"] = url
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    try:
+        yield app
+    finally:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+        if old is None:
+            os.environ.pop("DATABASE_URL", None)
+        else:
+            os.environ["DATABASE_URL"] = old
+        if tmp:
+            os.unlink(tmp)
+
+
+@contextlib.contextmanager
+def quiet():
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_vader(args) -> dict:
+    from src.app import score_sentiment
+
+    titles = [a["title"] for a in load_fixture("gdelt_artlist.json")["articles"]]
+    texts = (titles * (args.vader_rows // len(titles) + 1))[: args.vader_rows]
+    t0 = time.perf_counter()
+    for text in texts:
+        score_sentiment(text)
+    dt = time.perf_counter() - t0
+    return {"vader_rows_per_sec": metric(len(texts) / dt, "rows/s", "higher")}
+
+
+def bench_gdelt_ingest(args) -> dict:
+    from scripts.fetch_news_gdelt import collect_news
+
+    inserted = 0
+    elapsed = 0.0
+    with scratch_database() as app:
+        for i in range(args.symbols):
+            with quiet():
+                t0 = time.perf_counter()
+                inserted += collect_news(f"BENCH{i}.US", app=app)["inserted"]
+                elapsed += time.perf_counter() - t0
+    return {"gdelt_ingest_rows_per_sec": metric(inserted / elapsed, "rows/s", "higher")}
+
+
+def bench_collection(args) -> dict:
+    from scripts.fetch_news_gdelt import collect_news
+    from scripts.fetch_quote import collect_quote
+
+    samples = []
+    with scratch_database() as app:
+        for i in range(args.symbols):
+            with quiet():
+                t0 = time.perf_counter()
+                collect_quote(f"BENCH{i}.US", app=app)
+                collect_news(f"BENCH{i}.US", app=app)
+                samples.append(time.perf_counter() - t0)
+    return {"collection_seconds_per_symbol": metric(statistics.median(samples), "s", "lower")}
+
+
+def seed_mentions(app, total: int, symbols: int = 50, days: int = 30):
+    """Bulk-load `total` synthetic mentions over `days`; symbol S000 is the hot one."""
+    from scripts.generate_synthetic import generate, symbol_names
+    from src.db import db
+
+    with app.app_context():
+        generate(db.engine, mentions=total, symbols=symbol_names(symbols), days=days, seed=1)
+
+
+def _report_latency(app, requests_n: int) -> tuple[float, float]:
+    client = app.test_client()
+    client.get("/report?symbol=S000")  # warm caches / connection
+    samples = []
+    for _ in range(requests_n):
+        t0 = time.perf_counter()
+        r = client.get("/report?symbol=S000")
+        samples.append(time.perf_counter() - t0)
+        assert r.status_code == 200
+    samples.sort()
+    return statistics.median(samples) * 1000, samples[int(0.95 * (len(samples) - 1))] * 1000
+
+
+def bench_report(args) -> dict:
+    out = {}
+    targets = [("sqlite", None)]
+    if os.getenv("BENCH_POSTGRES_URL"):
+        targets.append(("postgres", os.environ["BENCH_POSTGRES_URL"]))
+    for label, url in targets:
+        for size_label in args.sizes:
+            n = parse_size(size_label)
+            with scratch_database(url) as app:
+                seed_mentions(app, n)
+                p50, p95 = _report_latency(app, args.report_requests)
+            out[f"report_p50_ms[{label},{size_label}]"] = metric(p50, "ms", "lower")
+            out[f"report_p95_ms[{label},{size_label}]"] = metric(p95, "ms", "lower")
+    return out
+
+
+BENCHMARKS = {
+    "vader": bench_vader,
+    "gdelt_ingest": bench_gdelt_ingest,
+    "collection": bench_collection,
+    "report": bench_report,
+}
+
+
+def git_sha() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Metrics that got worse than the baseline by more than `tolerance` (a fraction)."""
+    regressions = []
+    for name, cur in results["metrics"].items():
+        base = baseline.get("metrics", {}).get(name)
+        if not base or not base["value"]:
+            continue
+        change = (cur["value"] - base["value"]) / base["value"]
+        worse = change > tolerance if cur["better"] == "lower" else change < -tolerance
+        if worse:
+            regressions.append({"metric": name, "baseline": base["value"], "current": cur["value"],
+                                "change_pct": round(change * 100, 1)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help="comma-separated benchmark names")
+    parser.add_argument("--sizes", default="10k", help="stored-mention counts for the report benchmark, e.g. 10k,1m,10m")
+    parser.add_argument("--symbols", type=int, default=5, help="symbols collected by gdelt_ingest/collection")
+    parser.add_argument("--vader-rows", type=int, default=20_000)
+    parser.add_argument("--report-requests", type=int, default=30)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added stub upstream latency")
+    parser.add_argument("--out", help="write results JSON here (default: stdout)")
+    parser.add_argument("--save-baseline", help="also write results to this baseline file")
+    parser.add_argument("--baseline", help="compare against this baseline; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed fractional regression")
+    args = parser.parse_args(argv)
+    args.sizes = [s for s in args.sizes.split(",") if s.strip()]
+
+    selected = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    metrics = {}
+    with StubUpstream(latency_ms=args.latency_ms) as stub:
+        os.environ.update(stub.env())
+        os.environ["DYNO"] = "benchmark"  # never fall back to a localhost Redis
+        os.environ.pop("REDIS_URL", None)
+        for name in selected:
+            print(f"running {name}...", file=sys.stderr)
+            metrics.update(BENCHMARKS[name](args))
+
+    results = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git_sha": git_sha(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "stub_latency_ms": args.latency_ms,
+        },
+        "metrics": metrics,
+    }
+
+    text = json.dumps(results, indent=2) + "\n"
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['metric']}: {r['baseline']} -> {r['current']} ({r['change_pct']:+}%)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
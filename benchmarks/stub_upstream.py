@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Finnhub, Stooq and GDELT with configurable latency,
+serving the recorded responses in benchmarks/fixtures/.
+
+    python -m benchmarks.stub_upstream --port 8765 --latency-ms 500
+
+Point the app at it with:
+
+    FINNHUB_API_URL=http://127.0.0.1:8765/api/v1
+    STOOQ_URL=http://127.0.0.1:8765/q/l/
+    GDELT_DOC_URL=http://127.0.0.1:8765/api/v2/doc/doc
+    FINNHUB_API_KEY=stub
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str):
+    path = os.path.join(FIXTURES_DIR, name)
+    with open(path) as f:
+        return json.load(f) if name.endswith(".json") else f.read()
+
+
+_SEARCH = load_fixture("finnhub_search.json")
+_PROFILES = load_fixture("finnhub_profile.json")
+_QUOTES_HEADER, *_QUOTE_LINES = load_fixture("stooq_quotes.csv").strip().splitlines()
+_QUOTES = {line.split(",")[0]: line for line in _QUOTE_LINES}
+_GDELT = load_fixture("gdelt_artlist.json")["articles"]
+
+
+def finnhub_search(query: dict) -> tuple[str, bytes]:
+    q = (query.get("q") or [""])[0]
+    body = _SEARCH.get(q.lower())
+    if body is None:
+        # unrecorded query: echo it back as the top match
+        body = {"count": 1, "result": [{"symbol": q.upper() or "AAPL", "description": f"{q.upper()} INC", "type": "Common Stock"}]}
+    return "application/json", json.dumps(body).encode()
+
+
+def finnhub_profile(query: dict) -> tuple[str, bytes]:
+    symbol = (query.get("symbol") or ["AAPL"])[0].upper()
+    body = _PROFILES.get(symbol)
+    if body is None:
+        # reuse the recorded Apple profile: the recorded GDELT articles are
+        # Apple headlines, so the relevance filter keeps them (BENCH0.US etc.)
+        body = dict(_PROFILES["AAPL"], ticker=symbol)
+    return "application/json", json.dumps(body).encode()
+
+
+def stooq_quote(query: dict) -> tuple[str, bytes]:
+    symbol = (query.get("s") or ["aapl.us"])[0].upper()
+    line = _QUOTES.get(symbol)
+    if line is None:
+        # reuse a recorded row under the requested symbol
+        line = symbol + "," + _QUOTE_LINES[0].split(",", 1)[1]
+    return "text/csv", f"{_QUOTES_HEADER}\n{line}\n".encode()
+
+
+def gdelt_articles(query: dict) -> tuple[str, bytes]:
+    """Recorded ArtList, shifted so the newest article was seen just now (the collector drops >24h)."""
+    newest = datetime.strptime(_GDELT[0]["seendate"], "%Y%m%dT%H%M%SZ")
+    shift = datetime.now(timezone.utc).replace(tzinfo=None) - newest
+    max_records = int((query.get("maxrecords") or ["250"])[0] or 250)
+    articles = []
+    for a in _GDELT[:max_records]:
+        seen = datetime.strptime(a["seendate"], "%Y%m%dT%H%M%SZ") + shift
+        articles.append(dict(a, seendate=seen.strftime("%Y%m%dT%H%M%SZ")))
+    return "application/json; charset=utf-8", json.dumps({"articles": articles}).encode()
+
+
+ROUTES = {
+    "/api/v1/search": finnhub_search,
+    "/api/v1/stock/profile2": finnhub_profile,
+    "/q/l/": stooq_quote,
+    "/api/v2/doc/doc": gdelt_articles,
+}
+
+
+def make_handler(latency_s: float, routes: dict):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            route = routes.get(parsed.path)
+            time.sleep(latency_s)
+            if route is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            content_type, body = route(parse_qs(parsed.query, keep_blank_values=True))
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class StubUpstream:
+    """Threaded stub server; usable as a context manager from load tests and benchmarks."""
+
+    def __init__(self, port: int = 0, latency_ms: float = 0.0, routes: dict | None = None):
+        handler = make_handler(latency_ms / 1000.0, routes or ROUTES)
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> dict:
+        """Environment variables that route the app's upstream calls to this stub."""
+        return {
+            "FINNHUB_API_URL": f"{self.base_url}/api/v1",
+            "FINNHUB_API_KEY": "stub",
+            "STOOQ_URL": f"{self.base_url}/q/l/",
+            "GDELT_DOC_URL": f"{self.base_url}/api/v2/doc/doc",
+        }
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stub Finnhub/Stooq/GDELT responses.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with StubUpstream(args.port, args.latency_ms) as stub:
+        print(f"Stub upstream on {stub.base_url} (latency {args.latency_ms:.0f}ms)")
+        for k, v in stub.env().items():
+            print(f"  export {k}={v}")
+        try:
+            stub.thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# gunicorn.conf.py
+#
+# WEB_WORKER_CLASS=sync   one request per worker process (default)
+# WEB_WORKER_CLASS=gevent many requests per worker; outbound HTTP and DB waits don't hold the worker
+import os
+import shutil
+import tempfile
+
+worker_class = os.getenv("WEB_WORKER_CLASS", "sync")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_connections = int(os.getenv("WEB_WORKER_CONNECTIONS", "200"))
+timeout = int(os.getenv("WEB_TIMEOUT", "30"))
+keepalive = 5
+
+# Prometheus multiprocess mode: every worker (and any collector it spawns)
+# writes samples here and /metrics aggregates them. Separate from the RQ
+# worker's dir (worker.py), since on_starting clears it. Must be set before
+# prometheus_client is imported, i.e. before the app is loaded.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "sentiment-scraper-web-metrics"),
+)
+
+
+# pool sizing defaults for web processes (see src/db.py)
+os.environ.setdefault("DB_ROLE", "web")
+
+
+def on_starting(server):
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
+def post_worker_init(worker):
+    if worker_class == "gevent":
+        from src.serving import make_psycopg2_green
+        make_psycopg2_green()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
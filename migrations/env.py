@@ -1,4 +1,5 @@
 import logging
+import re
 from logging.config import fileConfig
 
 from flask import current_app
@@ -45,6 +46,20 @@ target_db = current_app.extensions['migrate'].db
 # ... etc.
 
 
+# Schema the migrations create by hand and the models don't declare, so
+# autogenerate / `flask db check` must not propose dropping it: the SQLite
+# FTS5 table with its shadow tables, the Postgres search column and its GIN
+# index (b9d4e2f6a1c3) and the social_mentions partitions (src/partitions.py).
+UNMANAGED_TABLES = re.compile(r"social_mentions_(fts(_\w+)?|default|y\d{4}m\d{2}(d\d{2})?)$")
+UNMANAGED = {("column", "search_vector"), ("index", "ix_social_mentions_search")}
+
+
+def include_name(name, type_, parent_names):
+    if type_ == "table":
+        return not UNMANAGED_TABLES.match(name)
+    return (type_, name) not in UNMANAGED
+
+
 def get_metadata():
     if hasattr(target_db, 'metadatas'):
         return target_db.metadatas[None]
@@ -65,7 +80,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_name=include_name
     )
 
     with context.begin_transaction():
@@ -93,6 +109,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_name", include_name)
 
     connectable = get_engine()
 
@@ -0,0 +1,32 @@
+"""Create mention_rollups_hourly table
+
+Revision ID: 5b8e0f47d2c1
+Revises: c3f1d2a9b6e4
+Create Date: 2026-10-19 10:02:11.540913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b8e0f47d2c1'
+down_revision = 'c3f1d2a9b6e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('mention_rollups_hourly',
+    sa.Column('platform', sa.String(length=20), nullable=False),
+    sa.Column('symbol', sa.String(length=32), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('sentiment_sum', sa.Float(), nullable=False),
+    sa.Column('sentiment_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('platform', 'symbol', 'bucket_start')
+    )
+
+
+def downgrade():
+    op.drop_table('mention_rollups_hourly')
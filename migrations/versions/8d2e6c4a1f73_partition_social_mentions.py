@@ -0,0 +1,129 @@
+"""Partition social_mentions by created_at; add social_mentions_archive
+
+Revision ID: 8d2e6c4a1f73
+Revises: 5b8e0f47d2c1
+Create Date: 2026-10-19 14:21:37.902114
+
+On Postgres social_mentions becomes a RANGE-partitioned table on created_at
+with monthly partitions covering existing rows (plus the next few months)
+and a DEFAULT partition for anything outside them. The primary key becomes
+(id, created_at) because a partitioned table's unique keys must include the
+partition key; ids keep coming from the same sequence. Rows are copied
+once, so run this in a maintenance window on large tables.
+
+src/partitions.py creates later partitions and applies retention. SQLite
+keeps the plain table and uses social_mentions_archive instead.
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e6c4a1f73'
+down_revision = '5b8e0f47d2c1'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, platform, source, symbol, created_at, fetched_at, text, url, sentiment"
+MONTHS_AHEAD = 3
+
+
+def _month_starts(first: datetime, last: datetime):
+    y, m = first.year, first.month
+    while (y, m) <= (last.year, last.month):
+        yield datetime(y, m, 1)
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+
+
+def _next_month(d: datetime) -> datetime:
+    return datetime(d.year + 1, 1, 1) if d.month == 12 else datetime(d.year, d.month + 1, 1)
+
+
+def upgrade():
+    op.create_table('social_mentions_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('platform', sa.String(length=20), nullable=False),
+    sa.Column('source', sa.String(length=120), nullable=True),
+    sa.Column('symbol', sa.String(length=32), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('url', sa.Text(), nullable=True),
+    sa.Column('sentiment', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('social_mentions_archive', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_social_mentions_archive_created_at'), ['created_at'], unique=False)
+
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+
+    op.execute("ALTER TABLE social_mentions RENAME TO social_mentions_unpartitioned")
+    op.execute("ALTER TABLE social_mentions_unpartitioned RENAME CONSTRAINT social_mentions_pkey TO social_mentions_unpartitioned_pkey")
+    op.execute("ALTER INDEX ix_social_mentions_feed RENAME TO ix_social_mentions_feed_unpartitioned")
+
+    op.execute("""
+        CREATE TABLE social_mentions (
+            id INTEGER NOT NULL DEFAULT nextval('social_mentions_id_seq'),
+            platform VARCHAR(20) NOT NULL,
+            source VARCHAR(120),
+            symbol VARCHAR(32) NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            fetched_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            text TEXT NOT NULL,
+            url TEXT,
+            sentiment DOUBLE PRECISION,
+            CONSTRAINT social_mentions_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("CREATE INDEX ix_social_mentions_feed ON social_mentions (platform, symbol, created_at, id)")
+    op.execute("CREATE TABLE social_mentions_default PARTITION OF social_mentions DEFAULT")
+
+    first = bind.execute(sa.text("SELECT min(created_at) FROM social_mentions_unpartitioned")).scalar()
+    now = datetime.utcnow()
+    last = now
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    for start in _month_starts(first or now, last):
+        op.execute(
+            f"CREATE TABLE social_mentions_y{start:%Y}m{start:%m} PARTITION OF social_mentions "
+            f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{_next_month(start):%Y-%m-%d}')"
+        )
+
+    op.execute(f"INSERT INTO social_mentions ({COLUMNS}) SELECT {COLUMNS} FROM social_mentions_unpartitioned")
+    op.execute("ALTER SEQUENCE social_mentions_id_seq OWNED BY social_mentions.id")
+    op.execute("DROP TABLE social_mentions_unpartitioned")
+    op.execute("ANALYZE social_mentions")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("""
+            CREATE TABLE social_mentions_unpartitioned (
+                id INTEGER NOT NULL DEFAULT nextval('social_mentions_id_seq'),
+                platform VARCHAR(20) NOT NULL,
+                source VARCHAR(120),
+                symbol VARCHAR(32) NOT NULL,
+                created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                fetched_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                text TEXT NOT NULL,
+                url TEXT,
+                sentiment DOUBLE PRECISION,
+                CONSTRAINT social_mentions_unpartitioned_pkey PRIMARY KEY (id)
+            )
+        """)
+        op.execute(f"INSERT INTO social_mentions_unpartitioned ({COLUMNS}) SELECT {COLUMNS} FROM social_mentions")
+        op.execute("ALTER SEQUENCE social_mentions_id_seq OWNED BY social_mentions_unpartitioned.id")
+        op.execute("DROP TABLE social_mentions")  # drops every partition with it
+        op.execute("ALTER TABLE social_mentions_unpartitioned RENAME TO social_mentions")
+        op.execute("ALTER TABLE social_mentions RENAME CONSTRAINT social_mentions_unpartitioned_pkey TO social_mentions_pkey")
+        op.execute("CREATE INDEX ix_social_mentions_feed ON social_mentions (platform, symbol, created_at, id)")
+
+    with op.batch_alter_table('social_mentions_archive', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_social_mentions_archive_created_at'))
+
+    op.drop_table('social_mentions_archive')
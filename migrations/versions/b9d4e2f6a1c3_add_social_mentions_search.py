@@ -0,0 +1,62 @@
+"""Add a full-text search index over social_mentions.text
+
+Revision ID: b9d4e2f6a1c3
+Revises: f5a3c8e1b7d9
+Create Date: 2026-10-19 18:12:40.208311
+
+Postgres: a generated tsvector column with a GIN index (on a partitioned
+table both reach every partition). SQLite: an external-content FTS5 table
+kept in sync by triggers, filled from the existing rows. Mirrors the DDL in
+src/search.py.
+
+SQLite batch migrations that recreate social_mentions drop the triggers;
+re-run this migration's SQLite statements after any such migration.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b9d4e2f6a1c3'
+down_revision = 'f5a3c8e1b7d9'
+branch_labels = None
+depends_on = None
+
+POSTGRES_DDL = [
+    "ALTER TABLE social_mentions ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', coalesce(text, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_social_mentions_search ON social_mentions USING GIN (search_vector)",
+]
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS social_mentions_fts USING fts5("
+    "text, content='social_mentions', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS social_mentions_fts_ai AFTER INSERT ON social_mentions BEGIN "
+    "INSERT INTO social_mentions_fts(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS social_mentions_fts_ad AFTER DELETE ON social_mentions BEGIN "
+    "INSERT INTO social_mentions_fts(social_mentions_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS social_mentions_fts_au AFTER UPDATE OF text ON social_mentions BEGIN "
+    "INSERT INTO social_mentions_fts(social_mentions_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+    "INSERT INTO social_mentions_fts(rowid, text) VALUES (new.id, new.text); END",
+    # index the rows that are already there
+    "INSERT INTO social_mentions_fts(social_mentions_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for statement in POSTGRES_DDL:
+            op.execute(statement)
+    elif dialect == 'sqlite':
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_social_mentions_search")
+        op.execute("ALTER TABLE social_mentions DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        for trigger in ('social_mentions_fts_au', 'social_mentions_fts_ad', 'social_mentions_fts_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS social_mentions_fts")
@@ -0,0 +1,26 @@
+"""Add social_mentions feed index
+
+Revision ID: c3f1d2a9b6e4
+Revises: 27d6ed54c30c
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f1d2a9b6e4'
+down_revision = '27d6ed54c30c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('social_mentions', schema=None) as batch_op:
+        batch_op.create_index('ix_social_mentions_feed', ['platform', 'symbol', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('social_mentions', schema=None) as batch_op:
+        batch_op.drop_index('ix_social_mentions_feed')
@@ -0,0 +1,36 @@
+"""Add fetched_at indexes for the incremental export
+
+Revision ID: c8f1a4e6d2b7
+Revises: e7b3d9a5c2f8
+Create Date: 2026-10-20 12:14:02.518364
+
+scripts/export.py selects rows with fetched_at in [last watermark, cutoff);
+without an index each incremental run scanned all of social_mentions (every
+partition) and stock_quotes. On a partitioned social_mentions the index
+reaches every partition, and partitions created later get it too.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f1a4e6d2b7'
+down_revision = 'e7b3d9a5c2f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('social_mentions', schema=None) as batch_op:
+        batch_op.create_index('ix_social_mentions_fetched_at', ['fetched_at'], unique=False)
+
+    with op.batch_alter_table('stock_quotes', schema=None) as batch_op:
+        batch_op.create_index('ix_stock_quotes_fetched_at', ['fetched_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('stock_quotes', schema=None) as batch_op:
+        batch_op.drop_index('ix_stock_quotes_fetched_at')
+
+    with op.batch_alter_table('social_mentions', schema=None) as batch_op:
+        batch_op.drop_index('ix_social_mentions_fetched_at')
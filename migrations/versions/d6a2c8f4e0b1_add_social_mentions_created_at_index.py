@@ -0,0 +1,30 @@
+"""Add social_mentions created_at index
+
+Revision ID: d6a2c8f4e0b1
+Revises: b9d4e2f6a1c3
+Create Date: 2026-10-20 10:03:18.442917
+
+Rollup refreshes and retention look up min(created_at) on every run; no
+other index leads with created_at, so without this each lookup scanned
+every partition. On a partitioned social_mentions the index reaches every
+partition, and partitions created later get it too.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6a2c8f4e0b1'
+down_revision = 'b9d4e2f6a1c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('social_mentions', schema=None) as batch_op:
+        batch_op.create_index('ix_social_mentions_created_at', ['created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('social_mentions', schema=None) as batch_op:
+        batch_op.drop_index('ix_social_mentions_created_at')
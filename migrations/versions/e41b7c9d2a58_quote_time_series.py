@@ -0,0 +1,69 @@
+"""Key stock_quotes by (symbol, market_ts); add stock_quotes_daily
+
+Revision ID: e41b7c9d2a58
+Revises: 8d2e6c4a1f73
+Create Date: 2026-10-19 16:48:05.331902
+
+Existing rows get market_ts = fetched_at (the old code never stored the
+quote time) and are deduplicated on it before the unique constraint goes on.
+volume widens to BIGINT and the source string becomes a SMALLINT source_id
+(every stored quote came from Stooq, see QUOTE_SOURCES in src/models.py).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e41b7c9d2a58'
+down_revision = '8d2e6c4a1f73'
+branch_labels = None
+depends_on = None
+
+STOOQ = 1
+
+
+def upgrade():
+    with op.batch_alter_table('stock_quotes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('market_ts', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('source_id', sa.SmallInteger(), nullable=True))
+
+    op.execute(f"UPDATE stock_quotes SET market_ts = fetched_at, source_id = {STOOQ}")
+    op.execute(
+        "DELETE FROM stock_quotes WHERE id NOT IN "
+        "(SELECT MIN(id) FROM stock_quotes GROUP BY symbol, market_ts)"
+    )
+
+    with op.batch_alter_table('stock_quotes', schema=None) as batch_op:
+        batch_op.alter_column('market_ts', existing_type=sa.DateTime(), nullable=False)
+        batch_op.alter_column('source_id', existing_type=sa.SmallInteger(), nullable=False)
+        batch_op.alter_column('volume', existing_type=sa.Integer(), type_=sa.BigInteger())
+        batch_op.drop_column('source')
+        batch_op.drop_index(batch_op.f('ix_stock_quotes_symbol'))
+        batch_op.create_unique_constraint('uq_stock_quotes_symbol_market_ts', ['symbol', 'market_ts'])
+
+    op.create_table('stock_quotes_daily',
+    sa.Column('symbol', sa.String(length=16), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('market_ts', sa.DateTime(), nullable=False),
+    sa.Column('open', sa.Float(), nullable=True),
+    sa.Column('high', sa.Float(), nullable=True),
+    sa.Column('low', sa.Float(), nullable=True),
+    sa.Column('close', sa.Float(), nullable=True),
+    sa.Column('volume', sa.BigInteger(), nullable=True),
+    sa.Column('samples', sa.Integer(), nullable=False),
+    sa.Column('source_id', sa.SmallInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('symbol', 'day')
+    )
+
+
+def downgrade():
+    op.drop_table('stock_quotes_daily')
+
+    with op.batch_alter_table('stock_quotes', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_stock_quotes_symbol_market_ts', type_='unique')
+        batch_op.create_index(batch_op.f('ix_stock_quotes_symbol'), ['symbol'], unique=False)
+        batch_op.add_column(sa.Column('source', sa.String(length=64), nullable=False, server_default='stooq'))
+        # values past 2**31-1 would not fit back into INTEGER
+        batch_op.alter_column('volume', existing_type=sa.BigInteger(), type_=sa.Integer())
+        batch_op.drop_column('source_id')
+        batch_op.drop_column('market_ts')
@@ -0,0 +1,31 @@
+"""Add rollup_watermarks
+
+Revision ID: e7b3d9a5c2f8
+Revises: d6a2c8f4e0b1
+Create Date: 2026-10-20 11:26:54.107382
+
+The first maintenance run after this migration recomputes
+mention_rollups_hourly from the oldest raw mention and sets the watermark;
+until then time series read social_mentions only.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3d9a5c2f8'
+down_revision = 'd6a2c8f4e0b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rollup_watermarks',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('rolled_until', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('rollup_watermarks')
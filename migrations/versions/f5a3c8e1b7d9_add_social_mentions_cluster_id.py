@@ -0,0 +1,33 @@
+"""Add social_mentions.cluster_id for near-duplicate headline clusters
+
+Revision ID: f5a3c8e1b7d9
+Revises: e41b7c9d2a58
+Create Date: 2026-10-19 16:48:02.531977
+
+Existing rows keep NULL, i.e. each is its own cluster; src/clustering.py
+assigns clusters to rows ingested from now on.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f5a3c8e1b7d9'
+down_revision = 'e41b7c9d2a58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # on a partitioned social_mentions this reaches every partition
+    with op.batch_alter_table('social_mentions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cluster_id', sa.Integer(), nullable=True))
+    with op.batch_alter_table('social_mentions_archive', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cluster_id', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('social_mentions_archive', schema=None) as batch_op:
+        batch_op.drop_column('cluster_id')
+    with op.batch_alter_table('social_mentions', schema=None) as batch_op:
+        batch_op.drop_column('cluster_id')
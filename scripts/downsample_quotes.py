@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Fold intraday stock_quotes older than QUOTE_INTRADAY_DAYS into daily OHLCV
+bars (see src/quotes.py). The RQ maintenance job runs this with the mention
+upkeep; run it by hand to backfill or to use a different window once:
+
+    python -m scripts.downsample_quotes
+    python -m scripts.downsample_quotes --days 3
+"""
+import argparse
+import json
+
+from src.app import create_app
+from src.db import db
+from src.quotes import downsample_daily
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Downsample old intraday quotes into daily bars.")
+    parser.add_argument("--days", type=int, help="intraday days to keep (default QUOTE_INTRADAY_DAYS); 0 keeps all")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        result = downsample_daily(db.session, days=args.days)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Queue collection for many symbols without holding up interactive collects.
+
+    python -m scripts.enqueue_collect --priority backfill --tenant import-2026-10 AAPL MSFT NVDA
+    python -m scripts.enqueue_collect --priority scheduled --tenant watchlist:42 --file symbols.txt
+
+Symbols go to the tenant's fair backlog (src/queue.py): workers run
+interactive jobs first and take turns between tenants within a queue.
+"""
+import argparse
+import sys
+
+from src.queue import PRIORITIES, enqueue_fair, get_queue
+
+TASK = "src.tasks.run_collectors_task"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Queue collector runs for many symbols.")
+    parser.add_argument("symbols", nargs="*")
+    parser.add_argument("--file", help="one symbol per line")
+    parser.add_argument("--priority", choices=[p for p in PRIORITIES if p != "interactive"], default="backfill")
+    parser.add_argument("--tenant", default="cli", help="fairness key, e.g. a watchlist or import id")
+    args = parser.parse_args()
+
+    symbols = list(args.symbols)
+    if args.file:
+        with open(args.file) as f:
+            symbols += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not symbols:
+        parser.error("no symbols given")
+
+    queue = get_queue(args.priority)
+    if queue is None:
+        sys.exit("REDIS_URL is not configured")
+    backlog = enqueue_fair(queue, TASK, [(s.upper(),) for s in symbols], args.tenant)
+    print(f"Queued {len(symbols)} symbols on {queue.name} for tenant {args.tenant} ({backlog} still held back)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Export mentions and quotes to Hive-partitioned Parquet (or gzipped CSV).
+
+    python -m scripts.export --out exports/                       # incremental from the watermark
+    python -m scripts.export --since 2026-01-01 --until 2026-02-01 --out jan/
+    python -m scripts.export --format csv --tables quotes
+
+Layout: <out>/<table>/symbol=<SYM>/date=<YYYY-MM-DD>/part-<run>.parquet,
+readable as one Hive-partitioned dataset by pyarrow, DuckDB, Polars or Spark
+(symbol and date come from the path, not the file).
+
+Rows stream through a server-side cursor in --chunk sized batches, ordered
+by (symbol, time) so each partition is written by one open file at a time and
+memory stays flat. The scan reads EXPORT_DATABASE_URL, else the app's
+DATABASE_REPLICA_URL, so it stays off the primary when a follower exists.
+
+Incremental runs pick up rows inserted since the last run: the watermark in
+<out>/_watermark.json is on fetched_at (insert time), so mentions GDELT
+reports late still get exported. The newest --lag-minutes are left for the
+next run so in-flight transactions are never skipped. A row that changed
+since it was exported (a corrected quote gets a new fetched_at) comes out
+again, so every partition a run wrote to that already had files is
+compacted into that run's file, keeping the latest fetched_at per key (id
+for mentions, market_ts for quotes; symbol is the partition). Each key is
+in the dataset once.
+
+Parquet is written with pyarrow (pinned in requirements.txt).
+"""
+import argparse
+import csv
+import gzip
+import json
+import os
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, Integer, SmallInteger, create_engine, select
+
+from src.models import SocialMention, StockQuote
+
+WATERMARK_FILE = "_watermark.json"
+FORMATS = ("parquet", "csv")
+COMPRESSIONS = ("zstd", "snappy", "gzip", "none")
+
+# table name -> (model, column that decides the date partition, row key within a symbol)
+TABLES = {
+    "mentions": (SocialMention, "created_at", "id"),
+    "quotes": (StockQuote, "market_ts", "market_ts"),
+}
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def file_columns(table) -> list:
+    # symbol lives in the directory name; storing it again makes readers see two conflicting fields
+    return [c for c in table.columns if c.name != "symbol"]
+
+
+def arrow_schema(columns):
+    import pyarrow as pa
+
+    def arrow_type(col):
+        t = col.type
+        if isinstance(t, (BigInteger, Integer, SmallInteger)):
+            return pa.int64()
+        if isinstance(t, Float):
+            return pa.float64()
+        if isinstance(t, Boolean):
+            return pa.bool_()
+        if isinstance(t, DateTime):
+            return pa.timestamp("us")
+        return pa.string()
+
+    return pa.schema([pa.field(c.name, arrow_type(c), nullable=True) for c in columns])
+
+
+class PartitionedWriter:
+    """Writes rows that arrive grouped by partition; one open file at a time."""
+
+    def __init__(self, root: str, table, fmt: str, compression: str, run_id: str, row_group: int):
+        self.root = root
+        columns = file_columns(table)
+        self.columns = [c.name for c in columns]
+        self.fmt = fmt
+        self.compression = None if compression == "none" else compression
+        self.run_id = run_id
+        self.row_group = row_group
+        self.schema = arrow_schema(columns) if fmt == "parquet" else None
+        self.key = None
+        self.buffer = []
+        self.handle = None
+        self.files = 0
+        self.rows = 0
+        self.paths = []
+
+    def _path(self, key) -> str:
+        symbol, day = key
+        folder = os.path.join(self.root, f"symbol={_UNSAFE.sub('_', symbol)}", f"date={day}")
+        os.makedirs(folder, exist_ok=True)
+        ext = "parquet" if self.fmt == "parquet" else "csv.gz"
+        return os.path.join(folder, f"part-{self.run_id}.{ext}")
+
+    def _open(self, key):
+        path = self._path(key)
+        self.paths.append(path)
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            self.handle = pq.ParquetWriter(path, self.schema, compression=self.compression)
+        else:
+            f = gzip.open(path, "wt", newline="")
+            self.handle = (f, csv.writer(f))
+            self.handle[1].writerow(self.columns)
+        self.files += 1
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        if self.fmt == "parquet":
+            import pyarrow as pa
+
+            cols = list(zip(*self.buffer))
+            self.handle.write_table(pa.Table.from_arrays(
+                [pa.array(c, type=f.type) for c, f in zip(cols, self.schema)], schema=self.schema,
+            ))
+        else:
+            self.handle[1].writerows(self.buffer)
+        self.rows += len(self.buffer)
+        self.buffer = []
+
+    def _close(self):
+        self._flush()
+        if self.handle is not None:
+            if self.fmt == "parquet":
+                self.handle.close()
+            else:
+                self.handle[0].close()
+            self.handle = None
+
+    def write(self, key, row):
+        if key != self.key:
+            self._close()
+            self._open(key)
+            self.key = key
+        self.buffer.append(row)
+        if len(self.buffer) >= self.row_group:
+            self._flush()
+
+    def close(self):
+        self._close()
+
+    def read(self, path) -> list[list]:
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            # ParquetFile, not read_table: that would add symbol/date from the path
+            table = pq.ParquetFile(path).read(columns=self.columns)
+            return [list(r) for r in zip(*(table.column(c).to_pylist() for c in self.columns))]
+        with gzip.open(path, "rt", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header != self.columns:
+                raise ValueError(f"{path}: columns {header} don't match {self.columns}")
+            return list(reader)
+
+    def compact(self, path, key_col: str, time_col: str) -> int:
+        """
+        Merge every part file in `path`'s partition into `path`, keeping the
+        row with the latest fetched_at per `key_col`. Returns rows dropped.
+        """
+        folder = os.path.dirname(path)
+        others = sorted(
+            os.path.join(folder, f) for f in os.listdir(folder)
+            if f.startswith("part-") and os.path.join(folder, f) != path
+        )
+        if not others:
+            return 0
+        k, fetched, t = (self.columns.index(c) for c in (key_col, "fetched_at", time_col))
+        latest = {}
+        total = 0
+        for part in others + [path]:  # this run's file last: it wins fetched_at ties
+            for row in self.read(part):
+                total += 1
+                kept = latest.get(row[k])
+                if kept is None or row[fetched] >= kept[fetched]:
+                    latest[row[k]] = row
+        i = self.columns.index("id")
+        rows = sorted(latest.values(), key=lambda r: (r[t], int(r[i])))
+
+        # dot-prefixed so dataset readers skip it until it replaces `path`
+        tmp = os.path.join(folder, f".{os.path.basename(path)}.tmp")
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            cols = list(zip(*rows))
+            pq.write_table(pa.Table.from_arrays(
+                [pa.array(c, type=f.type) for c, f in zip(cols, self.schema)], schema=self.schema,
+            ), tmp, compression=self.compression, row_group_size=self.row_group)
+        else:
+            with gzip.open(tmp, "wt", newline="") as f:
+                w = csv.writer(f)
+                w.writerow(self.columns)
+                w.writerows(rows)
+        os.replace(tmp, path)
+        for part in others:
+            os.remove(part)
+        return total - len(rows)
+
+
+def export_table(engine, name: str, out: str, *, since, until, watermark_from, watermark_to,
+                 fmt: str, compression: str, chunk: int, run_id: str) -> dict:
+    model, time_attr, key_attr = TABLES[name]
+    table = model.__table__
+    time_col = table.c[time_attr]
+    stmt = select(table.c.symbol, *file_columns(table)).order_by(table.c.symbol, time_col, table.c.id)
+    if since:
+        stmt = stmt.where(time_col >= since)
+    if until:
+        stmt = stmt.where(time_col < until)
+    if watermark_from:
+        stmt = stmt.where(table.c.fetched_at >= watermark_from)
+    if watermark_to:
+        stmt = stmt.where(table.c.fetched_at < watermark_to)
+
+    writer = PartitionedWriter(os.path.join(out, table.name), table, fmt, compression, run_id, chunk)
+    time_idx = writer.columns.index(time_attr)
+    t0 = time.perf_counter()
+    with engine.connect() as conn:
+        # yield_per streams through a server-side cursor on Postgres
+        result = conn.execution_options(yield_per=chunk).execute(stmt)
+        for rows in result.partitions():
+            for symbol, *row in rows:
+                writer.write((symbol, row[time_idx].date().isoformat()), row)
+    writer.close()
+    replaced = sum(writer.compact(path, key_attr, time_attr) for path in writer.paths)
+    return {"table": table.name, "rows": writer.rows, "files": writer.files, "replaced": replaced,
+            "seconds": round(time.perf_counter() - t0, 2)}
+
+
+def load_watermark(out: str) -> dict:
+    try:
+        with open(os.path.join(out, WATERMARK_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_watermark(out: str, marks: dict) -> None:
+    path = os.path.join(out, WATERMARK_FILE)
+    with open(path + ".tmp", "w") as f:
+        json.dump(marks, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def database_url() -> str:
+    from src.app import create_app
+
+    url = os.getenv("EXPORT_DATABASE_URL") or os.getenv("DATABASE_REPLICA_URL")
+    if url:
+        return url.replace("postgres://", "postgresql://", 1)
+    return create_app().config["SQLALCHEMY_DATABASE_URI"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export mentions and quotes to partitioned Parquet/CSV.")
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--out", default="exports")
+    parser.add_argument("--tables", default="mentions,quotes")
+    parser.add_argument("--since", help="ISO date; ad-hoc range on the row time (no watermark)")
+    parser.add_argument("--until", help="ISO date, exclusive")
+    parser.add_argument("--chunk", type=int, default=50_000, help="rows per fetch and per Parquet row group")
+    parser.add_argument("--compression", choices=COMPRESSIONS, default="zstd")
+    parser.add_argument("--lag-minutes", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    tables = [t.strip() for t in args.tables.split(",") if t.strip()]
+    unknown = set(tables) - set(TABLES)
+    if unknown:
+        parser.error(f"unknown tables: {', '.join(sorted(unknown))}")
+    if args.format == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            parser.error("--format parquet needs pyarrow: pip install pyarrow (or use --format csv)")
+
+    since = datetime.fromisoformat(args.since) if args.since else None
+    until = datetime.fromisoformat(args.until) if args.until else None
+    incremental = since is None and until is None
+    cutoff = datetime.utcnow() - timedelta(minutes=args.lag_minutes)
+    marks = load_watermark(args.out) if incremental else {}
+    run_id = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")  # runs in the same second get their own files
+
+    os.makedirs(args.out, exist_ok=True)
+    engine = create_engine(database_url())
+    summary = []
+    try:
+        for name in tables:
+            table_name = TABLES[name][0].__tablename__
+            prev = marks.get(table_name)
+            stats = export_table(
+                engine, name, args.out,
+                since=since, until=until,
+                watermark_from=datetime.fromisoformat(prev) if prev else None,
+                watermark_to=cutoff if incremental else None,
+                fmt=args.format, compression=args.compression, chunk=args.chunk, run_id=run_id,
+            )
+            if incremental:
+                marks[table_name] = cutoff.isoformat()
+                save_watermark(args.out, marks)
+            summary.append(stats)
+            print(f"{stats['table']}: {stats['rows']} rows in {stats['files']} files, "
+                  f"{stats['replaced']} older copies replaced ({stats['seconds']}s)", file=sys.stderr)
+    finally:
+        engine.dispose()
+    print(json.dumps({"run": run_id, "incremental": incremental, "tables": summary}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
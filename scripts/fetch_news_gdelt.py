@@ -4,31 +4,12 @@ import sys
 import time
 from datetime import datetime, timedelta, timezone
 
-import requests
+from src import profiling, tracing, upstream
+from src.app import create_app, get_company_name, resolve_symbol
+from src.monitoring import track_collector_run
+from src.sources import Mention, store_mentions
 
-from src.app import create_app, score_sentiment, resolve_symbol
-from src.db import db
-from src.models import SocialMention
-
-GDELT_DOC_URL = "https://api.gdeltproject.org/api/v2/doc/doc"
-
-FINNHUB_PROFILE_URL = "https://finnhub.io/api/v1/stock/profile2"
-
-def get_company_name(symbol: str) -> str:
-    api_key = os.getenv("FINNHUB_API_KEY")
-    if not api_key:
-        return ""
-
-    try:
-        r = requests.get(
-            FINNHUB_PROFILE_URL,
-            params={"symbol": symbol, "token": api_key},
-            timeout=10,
-        )
-        r.raise_for_status()
-        return (r.json().get("name") or "").strip()
-    except Exception:
-        return ""
+GDELT_DOC_URL = os.getenv("GDELT_DOC_URL", "https://api.gdeltproject.org/api/v2/doc/doc")
 
 def parse_gdelt_datetime(s: str) -> datetime:
     """
@@ -40,6 +21,11 @@ def parse_gdelt_datetime(s: str) -> datetime:
 
 
 def fetch_gdelt_articles(query: str, company: str = "", max_records: int = 250):
+    with tracing.span("fetch_gdelt_articles", query=query):
+        return _fetch_gdelt_articles(query, company, max_records)
+
+
+def _fetch_gdelt_articles(query: str, company: str, max_records: int):
     params = {
         "query": query,
         "mode": "ArtList",
@@ -55,11 +41,17 @@ def fetch_gdelt_articles(query: str, company: str = "", max_records: int = 250):
 
     # Up to 2 attempts; wait if we get 429
     for attempt in range(2):
-        r = requests.get(GDELT_DOC_URL, params=params, headers=headers, timeout=15)
+        r = upstream.get("gdelt", GDELT_DOC_URL, params=params, headers=headers, timeout=15)
 
         if r.status_code == 429:
+            if upstream.breaker("gdelt").rejecting():
+                # the 429s tripped the breaker: don't sleep on a lost cause
+                raise upstream.UpstreamUnavailable("gdelt")
+            if attempt:
+                r.raise_for_status()  # still rate-limited after backing off: an error, not a skip
             # GDELT asks for 1 request per 5 seconds
-            time.sleep(6)
+            with tracing.span("gdelt_backoff_sleep", seconds=6):
+                time.sleep(6)
             continue
 
         content_type = (r.headers.get("Content-Type") or "").lower()
@@ -71,7 +63,7 @@ def fetch_gdelt_articles(query: str, company: str = "", max_records: int = 250):
             if "phrase is too short" in lower_preview and company and len(company) >= 4:
                 safe_params = dict(params)
                 safe_params["query"] = f'"{company}"'
-                r2 = requests.get(GDELT_DOC_URL, params=safe_params, headers=headers, timeout=15)
+                r2 = upstream.get("gdelt", GDELT_DOC_URL, params=safe_params, headers=headers, timeout=15)
 
                 ct2 = (r2.headers.get("Content-Type") or "").lower()
                 if r2.status_code == 200 and "json" in ct2:
@@ -91,12 +83,10 @@ def fetch_gdelt_articles(query: str, company: str = "", max_records: int = 250):
     
 
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: python -m scripts.fetch_news_gdelt <ticker-or-company>")
-        sys.exit(1)
-
-    user_input = sys.argv[1]
+def collect_news(user_input: str, app=None) -> dict:
+    """Fetch the last 24h of GDELT headlines for a symbol, score and store the new ones. Pass `app` to reuse its engine."""
+    if upstream.breaker("gdelt").rejecting():
+        raise upstream.UpstreamUnavailable("gdelt")  # before the Finnhub lookups
     canonical = resolve_symbol(user_input)  # returns e.g., AAPL or AAPL.US
     canonical = canonical.split(".")[0]     # make it canonical like AAPL
 
@@ -122,7 +112,7 @@ def main():
     # Build query with correct parentheses rules for GDELT
     if len(terms) >= 2:
         query = "(" + " OR ".join(terms) + ")"
-    elif len(terms) == 1:   
+    elif len(terms) == 1:
         query = terms[0]
     else:
         raise RuntimeError("Could not build a GDELT query (no terms).")
@@ -131,56 +121,43 @@ def main():
 
     print("since:", since.isoformat())
 
-    skipped_dupe = 0
-    skipped_time = 0
-    app = create_app()
-    with app.app_context():
+    app = app or create_app()
+    with app.app_context(), track_collector_run("news_gdelt"):
         articles = fetch_gdelt_articles(query=query, company=company, max_records=50)
         print(f"GDELT returned {len(articles)} articles")
         for a in articles[:3]:
             print("sample:", a.get("seendate"), a.get("title"), a.get("url"))
-        added = 0
+
+        mentions = []
         for a in articles:
             url = a.get("url")
-            title = a.get("title") or ""
             seendate = a.get("seendate")  # e.g. 20260127153000
-
-            if not url or not seendate:
-                continue
-
             try:
                 created_at = parse_gdelt_datetime(seendate)
             except Exception:
+                created_at = None
+            if not url or created_at is None:
+                mentions.append(None)
                 continue
+            mentions.append(Mention("news", "gdelt", url, created_at, (a.get("title") or "").strip()))
 
-            if created_at < since:
-                skipped_time += 1
-                continue
+        counts = store_mentions(canonical, mentions, since, "news_gdelt", company=company)
+        print(f"Stored {counts['inserted']} news mentions for {canonical} (last 24h). "
+            f"Skipped {counts['duplicate']} duplicates, {counts['stale']} older-than-24h, "
+            f"{counts['irrelevant']} not about {canonical}.")
 
-            # Deduplicate by (platform, url)
-            exists = SocialMention.query.filter_by(platform="news", url=url, symbol=canonical).first()
-            if exists:
-                skipped_dupe += 1
-                continue
+    return {"symbol": canonical, **counts}
 
-            text = title.strip()
-            sent = score_sentiment(text)
-
-            m = SocialMention(
-                platform="news",
-                source="gdelt",
-                symbol=canonical,
-                created_at=created_at.replace(tzinfo=None),  # store naive UTC like your other code
-                text=text,
-                url=url,
-                sentiment=sent,
-            )
-            db.session.add(m)
-            added += 1
 
-        db.session.commit()
-        print(f"Stored {added} news mentions for {canonical} (last 24h). "
-            f"Skipped {skipped_dupe} duplicates, {skipped_time} older-than-24h.")
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python -m scripts.fetch_news_gdelt <ticker-or-company>")
+        sys.exit(1)
+
+    # optional: TRACEPARENT joins an existing trace, PROFILE_OUTPUT writes collapsed stacks
+    with profiling.profile_to_file(os.getenv("PROFILE_OUTPUT")):
+        with tracing.span("fetch_news_gdelt", traceparent=os.getenv("TRACEPARENT"), input=sys.argv[1]):
+            collect_news(sys.argv[1])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,21 +1,40 @@
 #!/usr/bin/env python3
+import os
 import sys
-import requests
-from datetime import datetime
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
+from src import profiling, tracing, upstream
 from src.app import create_app, resolve_symbol, to_stooq_symbol
 from src.db import db
-from src.models import StockQuote
+from src.monitoring import count_rows, track_collector_run
+from src.quotes import upsert_quote
 
-STOOQ_URL = "https://stooq.com/q/l/"
+STOOQ_URL = os.getenv("STOOQ_URL", "https://stooq.com/q/l/")
+# Stooq reports Date/Time in Warsaw local time
+STOOQ_TZ = ZoneInfo(os.getenv("STOOQ_TZ", "Europe/Warsaw"))
+
+
+def parse_market_ts(day: str, clock: str) -> datetime | None:
+    """Stooq Date + Time fields -> naive UTC datetime; None if either is missing."""
+    try:
+        local = datetime.strptime(f"{day.strip()} {clock.strip()}", "%Y-%m-%d %H:%M:%S")
+    except (AttributeError, ValueError):
+        return None
+    return local.replace(tzinfo=STOOQ_TZ).astimezone(timezone.utc).replace(tzinfo=None)
 
 
 def fetch_quote(symbol: str):
     """
     Fetch OHLCV data from Stooq CSV endpoint.
     """
+    with tracing.span("fetch_quote", symbol=symbol):
+        return _fetch_quote(symbol)
+
+
+def _fetch_quote(symbol: str):
     params = {"s": symbol.lower(), "f": "sd2t2ohlcv", "h": "", "e": "csv"}
-    response = requests.get(STOOQ_URL, params=params, timeout=10)
+    response = upstream.get("stooq", STOOQ_URL, params=params, timeout=10)
     response.raise_for_status()
 
     lines = response.text.strip().splitlines()
@@ -35,47 +54,52 @@ def fetch_quote(symbol: str):
     def to_int(x):
         return None if is_missing(x) else int(float(x))
 
+    fetched_at = datetime.utcnow()
     return {
         "symbol": fields[0],            # e.g. AMD.US
+        # no quote time (unknown symbol, N/D): key the row by the poll minute
+        "market_ts": parse_market_ts(fields[1], fields[2]) or fetched_at.replace(second=0, microsecond=0),
         "open": to_float(fields[3]),
         "high": to_float(fields[4]),
         "low": to_float(fields[5]),
         "close": to_float(fields[6]),
         "volume": to_int(fields[7]),
-        "fetched_at": datetime.utcnow(),
+        "fetched_at": fetched_at,
     }
 
 
-def main():
-    if len(sys.argv) != 2:
-        print("Usage: python -m scripts.fetch_quote <symbol-or-company>")
-        sys.exit(1)
-
-    user_input = sys.argv[1]
-
+def collect_quote(user_input: str, app=None) -> dict:
+    """Fetch the current Stooq quote for a symbol and store it. Pass `app` to reuse its engine."""
+    if upstream.breaker("stooq").rejecting():
+        raise upstream.UpstreamUnavailable("stooq")  # before resolve_symbol spends a Finnhub call
     # Resolve + convert to Stooq format so we store rows like AMD.US (not AMD)
     resolved = resolve_symbol(user_input)         # e.g. AMD
     stooq_symbol = to_stooq_symbol(resolved)      # e.g. AMD.US
 
-    app = create_app()
-    with app.app_context():
+    app = app or create_app()
+    with app.app_context(), track_collector_run("quote"):
         quote_data = fetch_quote(stooq_symbol)
 
-        quote = StockQuote(
-            symbol=quote_data["symbol"],          # store AMD.US
-            open=quote_data["open"],
-            high=quote_data["high"],
-            low=quote_data["low"],
-            close=quote_data["close"],
-            volume=quote_data["volume"],
-            fetched_at=quote_data["fetched_at"],
-        )
+        with tracing.span("db_write", rows=1):
+            written = upsert_quote(db.session, quote_data)
+            db.session.commit()
+        count_rows("quote", inserted=written, duplicate=1 - written)
+
+        print(f"Stored quote for {user_input} as {quote_data['symbol']} at {quote_data['market_ts']} "
+              f"(close={quote_data['close']}{'' if written else ', unchanged'})")
+        return {"symbol": quote_data["symbol"], "inserted": written, "close": quote_data["close"]}
+
 
-        db.session.add(quote)
-        db.session.commit()
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python -m scripts.fetch_quote <symbol-or-company>")
+        sys.exit(1)
 
-        print(f"Stored quote for {user_input} as {quote.symbol} at {quote.fetched_at} (close={quote.close})")
+    # optional: TRACEPARENT joins an existing trace, PROFILE_OUTPUT writes collapsed stacks
+    with profiling.profile_to_file(os.getenv("PROFILE_OUTPUT")):
+        with tracing.span("fetch_quote_script", traceparent=os.getenv("TRACEPARENT"), input=sys.argv[1]):
+            collect_quote(sys.argv[1])
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Collect the last day's mentions for a symbol from the source adapters.
+
+    python -m scripts.fetch_sources AAPL                      # every adapter
+    python -m scripts.fetch_sources --source reddit TSLA
+    NEWS_RSS_FEEDS="https://example.com/{symbol}.rss" python -m scripts.fetch_sources --source rss NVDA
+
+Adapters live in src/sources; collect jobs run the ones listed in INGEST_SOURCES.
+"""
+import argparse
+import os
+
+from src import profiling, tracing
+from src.sources import ADAPTERS, collect_sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect mentions from the RSS / Reddit source adapters.")
+    parser.add_argument("symbol")
+    parser.add_argument("--source", action="append", choices=sorted(ADAPTERS), help="repeatable; default: all")
+    args = parser.parse_args()
+
+    # optional: TRACEPARENT joins an existing trace, PROFILE_OUTPUT writes collapsed stacks
+    with profiling.profile_to_file(os.getenv("PROFILE_OUTPUT")):
+        with tracing.span("fetch_sources", traceparent=os.getenv("TRACEPARENT"), input=args.symbol):
+            collect_sources(args.symbol, sources=args.source or sorted(ADAPTERS))
+
+
+if __name__ == "__main__":
+    main()
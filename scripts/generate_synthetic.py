@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Bulk-load realistic synthetic SocialMention and StockQuote rows.
+
+    python -m scripts.generate_synthetic --mentions 10000000 --num-symbols 500 --days 90
+    python -m scripts.generate_synthetic --mentions 200000 --symbols AAPL,MSFT,NVDA --days 7
+
+Mention volume per symbol follows a Zipf law (rank 1 is busiest), posting
+times follow a weekday/diurnal profile peaking around US market hours, and
+sentiment mimics VADER on headlines: a spike at exactly 0 plus a per-symbol
+skewed spread. Quotes are a geometric random walk every --quote-interval
+minutes during market hours.
+
+Rows go in through COPY on Postgres and executemany on SQLite, in chunks,
+so 10M mentions load in minutes. Quotes already stored for a (symbol,
+market_ts) are kept, so reruns over an overlapping window only add the new
+snapshots. Targets DATABASE_URL like the app does.
+"""
+import argparse
+import csv
+import io
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.models import QUOTE_SOURCES
+
+# Relative posting volume per UTC hour: quiet overnight, ramping into the
+# US open (13:30 UTC), peaking through the session, tailing off after close.
+DIURNAL = np.array([
+    0.30, 0.25, 0.20, 0.20, 0.25, 0.35, 0.50, 0.70,
+    0.90, 1.00, 1.10, 1.30, 1.60, 2.20, 2.60, 2.50,
+    2.40, 2.30, 2.40, 2.60, 2.20, 1.40, 0.80, 0.45,
+])
+WEEKDAY = np.array([1.0, 1.05, 1.05, 1.0, 0.95, 0.35, 0.30])  # Mon..Sun
+
+NEUTRAL_SHARE = 0.35  # VADER returns exactly 0.0 for many headlines
+
+POSITIVE_TEMPLATES = [
+    "{s} shares jump after strong quarterly results",
+    "Analysts upgrade {s} on robust demand outlook",
+    "{s} beats estimates and raises full-year guidance",
+    "{s} rallies as investors cheer new product launch",
+    "{s} hits record high on upbeat forecast",
+]
+NEUTRAL_TEMPLATES = [
+    "{s} to report earnings next week",
+    "{s} announces annual shareholder meeting date",
+    "What to watch for {s} this week",
+    "{s} files quarterly report with the SEC",
+    "{s} shares trade flat in early session",
+]
+NEGATIVE_TEMPLATES = [
+    "{s} shares fall after disappointing guidance",
+    "{s} hit with lawsuit over product defects",
+    "Analysts downgrade {s} citing weak demand",
+    "{s} misses estimates as costs surge",
+    "{s} slides amid regulatory probe",
+]
+
+MENTION_COLUMNS = ["platform", "source", "symbol", "created_at", "fetched_at", "text", "url", "sentiment"]
+QUOTE_COLUMNS = ["symbol", "market_ts", "fetched_at", "open", "high", "low", "close", "volume", "source_id"]
+
+
+def symbol_names(num: int) -> list[str]:
+    return [f"S{i:03d}" for i in range(num)]
+
+
+def zipf_weights(n: int, s: float) -> np.ndarray:
+    w = 1.0 / np.arange(1, n + 1) ** s
+    return w / w.sum()
+
+
+def _time_profile(start: datetime, days: int) -> np.ndarray:
+    """Probability of each hour slot in [start, start + days)."""
+    hours = np.arange(days * 24)
+    slot_start = np.datetime64(start, "h") + hours
+    hour_of_day = (slot_start.astype("datetime64[h]").astype(np.int64)) % 24
+    weekday = (slot_start.astype("datetime64[D]").astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    w = DIURNAL[hour_of_day] * WEEKDAY[weekday]
+    return w / w.sum()
+
+
+def _format_ts(epoch_us: np.ndarray) -> list[str]:
+    # The layout SQLAlchemy writes DateTime in on SQLite; Postgres COPY accepts it too.
+    return [s.replace("T", " ") for s in np.datetime_as_string(epoch_us.astype("datetime64[us]"), unit="us")]
+
+
+def mention_chunks(rng, symbols, total, start, days, zipf_s, chunk, url_prefix):
+    """Yield lists of mention row tuples (MENTION_COLUMNS order)."""
+    weights = zipf_weights(len(symbols), zipf_s)
+    slot_p = _time_profile(start, days)
+    start_us = np.datetime64(start, "us").astype(np.int64)
+    end_us = start_us + days * 86_400_000_000
+    # each symbol leans a little bullish or bearish
+    bias = rng.normal(0.05, 0.15, size=len(symbols))
+    sym_arr = np.array(symbols)
+
+    done = 0
+    while done < total:
+        n = min(chunk, total - done)
+        sym_idx = rng.choice(len(symbols), size=n, p=weights)
+        slots = rng.choice(slot_p.size, size=n, p=slot_p)
+        created = start_us + slots * 3_600_000_000 + rng.integers(0, 3_600_000_000, size=n)
+        fetched = np.minimum(created + rng.integers(60_000_000, 6 * 3_600_000_000, size=n), end_us)
+
+        sent = np.clip(rng.normal(bias[sym_idx], 0.45), -0.99, 0.99)
+        sent[rng.random(n) < NEUTRAL_SHARE] = 0.0
+        sent = np.round(sent, 4)
+
+        template_pick = rng.integers(0, 5, size=n)
+        created_s = _format_ts(created)
+        fetched_s = _format_ts(fetched)
+        rows = []
+        for j in range(n):
+            sym = sym_arr[sym_idx[j]]
+            score = float(sent[j])
+            if score >= 0.2:
+                text = POSITIVE_TEMPLATES[template_pick[j]].format(s=sym)
+            elif score <= -0.2:
+                text = NEGATIVE_TEMPLATES[template_pick[j]].format(s=sym)
+            else:
+                text = NEUTRAL_TEMPLATES[template_pick[j]].format(s=sym)
+            rows.append((
+                "news", "synthetic", sym, created_s[j], fetched_s[j], text,
+                f"{url_prefix}/{sym}/{done + j}", score,
+            ))
+        yield rows
+        done += n
+
+
+def quote_chunks(rng, symbols, start, days, interval_minutes, chunk):
+    """Yield lists of quote row tuples (QUOTE_COLUMNS order), market hours only."""
+    steps_per_day = (6 * 60 + 30) // interval_minutes  # 13:30-20:00 UTC session
+    rows = []
+    for sym in symbols:
+        price = float(rng.uniform(20, 500))
+        base_volume = float(rng.lognormal(15, 1))
+        for d in range(days):
+            day = start + timedelta(days=d)
+            if day.weekday() >= 5:
+                continue
+            session_open = day.replace(hour=13, minute=30, second=0, microsecond=0)
+            rets = rng.normal(0, 0.002 * np.sqrt(interval_minutes), size=steps_per_day)
+            for k in range(steps_per_day):
+                open_ = price
+                price = price * float(np.exp(rets[k]))
+                wiggle = abs(float(rng.normal(0, 0.001))) * price
+                vol = int(base_volume * rng.uniform(0.3, 1.7) / steps_per_day)
+                ts = (session_open + timedelta(minutes=interval_minutes * k)).strftime("%Y-%m-%d %H:%M:%S.%f")
+                rows.append((
+                    f"{sym}.US", ts, ts,
+                    round(open_, 4), round(max(open_, price) + wiggle, 4),
+                    round(min(open_, price) - wiggle, 4), round(price, 4), vol, QUOTE_SOURCES["stooq"],
+                ))
+                if len(rows) >= chunk:
+                    yield rows
+                    rows = []
+    if rows:
+        yield rows
+
+
+def bulk_load(engine, table: str, columns: list[str], chunks, skip_conflicts_on: list[str] | None = None) -> int:
+    """
+    COPY on Postgres, executemany otherwise; one transaction per chunk.
+    With `skip_conflicts_on` (a unique key), rows that clash with stored ones
+    are skipped, so reruns over an overlapping window load cleanly: on
+    Postgres the chunk is COPYed into a temp staging table first. Returns the
+    rows inserted.
+    """
+    total = 0
+    cols = ", ".join(columns)
+    on_conflict = f" ON CONFLICT ({', '.join(skip_conflicts_on)}) DO NOTHING" if skip_conflicts_on else ""
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        if engine.dialect.name == "postgresql":
+            target = f"{table}_staging" if skip_conflicts_on else table
+            copy_sql = f"COPY {target} ({cols}) FROM STDIN WITH (FORMAT csv)"
+            for rows in chunks:
+                if skip_conflicts_on:
+                    cur.execute(f"CREATE TEMP TABLE {target} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+                buf = io.StringIO()
+                csv.writer(buf).writerows(rows)
+                buf.seek(0)
+                cur.copy_expert(copy_sql, buf)
+                if skip_conflicts_on:
+                    cur.execute(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {target}{on_conflict}")
+                    total += cur.rowcount
+                else:
+                    total += len(rows)
+                raw.commit()
+        else:
+            marks = ", ".join("?" for _ in columns)
+            insert_sql = f"INSERT INTO {table} ({cols}) VALUES ({marks}){on_conflict}"
+            for rows in chunks:
+                cur.executemany(insert_sql, rows)
+                raw.commit()
+                total += cur.rowcount if skip_conflicts_on else len(rows)
+        cur.close()
+    finally:
+        raw.close()
+    return total
+
+
+def generate(
+    engine,
+    *,
+    mentions: int,
+    symbols: list[str],
+    days: int = 30,
+    zipf_s: float = 1.1,
+    quote_interval: int = 15,
+    quotes: bool = True,
+    seed: int = 0,
+    chunk: int = 100_000,
+    end: datetime | None = None,
+) -> dict:
+    """Generate and load `days` of synthetic data up to the hour of `end` (default now). Returns row counts."""
+    rng = np.random.default_rng(seed)
+    end = (end or datetime.utcnow()).replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=days)
+    url_prefix = f"https://synthetic.example/{seed}-{int(end.timestamp())}"
+
+    n_mentions = bulk_load(
+        engine, "social_mentions", MENTION_COLUMNS,
+        mention_chunks(rng, symbols, mentions, start, days, zipf_s, chunk, url_prefix),
+    )
+    n_quotes = 0
+    if quotes:
+        n_quotes = bulk_load(
+            engine, "stock_quotes", QUOTE_COLUMNS,
+            quote_chunks(rng, symbols, start, days, quote_interval, chunk),
+            skip_conflicts_on=["symbol", "market_ts"],
+        )
+    return {"mentions": n_mentions, "quotes": n_quotes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load synthetic mentions and quotes.")
+    parser.add_argument("--mentions", type=int, default=100_000)
+    parser.add_argument("--symbols", help="comma-separated tickers (default: S000..S<n>)")
+    parser.add_argument("--num-symbols", type=int, default=50)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent for per-symbol volume")
+    parser.add_argument("--quote-interval", type=int, default=15, help="minutes between quote snapshots")
+    parser.add_argument("--no-quotes", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk", type=int, default=100_000)
+    args = parser.parse_args()
+
+    from src.app import create_app
+    from src.db import db
+
+    symbols = [s.strip().upper() for s in args.symbols.split(",")] if args.symbols else symbol_names(args.num_symbols)
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        t0 = time.perf_counter()
+        counts = generate(
+            db.engine,
+            mentions=args.mentions,
+            symbols=symbols,
+            days=args.days,
+            zipf_s=args.zipf,
+            quote_interval=args.quote_interval,
+            quotes=not args.no_quotes,
+            seed=args.seed,
+            chunk=args.chunk,
+        )
+        dt = time.perf_counter() - t0
+
+    print(
+        f"Loaded {counts['mentions']} mentions and {counts['quotes']} quotes "
+        f"for {len(symbols)} symbols in {dt:.1f}s ({counts['mentions'] / dt:,.0f} mentions/s)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
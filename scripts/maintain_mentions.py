@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Partition upkeep and retention for social_mentions (see src/partitions.py).
+
+The RQ worker runs this every MENTION_MAINTENANCE_HOURS; run it by hand to
+preview or to apply a different policy once:
+
+    python -m scripts.maintain_mentions
+    python -m scripts.maintain_mentions --retention-days 90 --mode rollup
+"""
+import argparse
+import json
+
+from src.app import create_app
+from src.db import db
+from src.partitions import INTERVALS, RETENTION_MODES, apply_retention, ensure_partitions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create upcoming partitions and apply mention retention.")
+    parser.add_argument("--interval", choices=INTERVALS, help="partition size (default MENTION_PARTITION_INTERVAL)")
+    parser.add_argument("--ahead", type=int, help="future partitions to keep ready (default MENTION_PARTITIONS_AHEAD)")
+    parser.add_argument("--retention-days", type=int, help="default MENTION_RETENTION_DAYS; 0 keeps everything")
+    parser.add_argument("--mode", choices=RETENTION_MODES, help="default MENTION_RETENTION_MODE")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        created = ensure_partitions(db.session, interval=args.interval, ahead=args.ahead)
+        retention = apply_retention(db.session, days=args.retention_days, mode=args.mode)
+    print(json.dumps({"created_partitions": created, **retention}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+import argparse
+from datetime import datetime
+
+from src.app import create_app
+from src.db import db
+from src.rollups import refresh_hourly_rollups, roll_forward, rolled_until
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Roll hourly sentiment rollups forward (maintain_mentions_task does this on a schedule)."
+    )
+    parser.add_argument(
+        "--since",
+        help="Recompute from this ISO date instead of the stored watermark (does not move the watermark).",
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        if args.since:
+            since = datetime.fromisoformat(args.since)
+            written = refresh_hourly_rollups(db.session, since)
+            print(f"Wrote {written} hourly rollup rows since {since.isoformat()}")
+        else:
+            written = roll_forward(db.session)
+            print(f"Wrote {written} hourly rollup rows; final until {rolled_until(db.session).isoformat()}")
+
+
+if __name__ == "__main__":
+    main()
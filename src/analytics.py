@@ -0,0 +1,287 @@
+# src/analytics.py
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import select
+
+from .models import StockQuote, StockQuoteDaily
+from .monitoring import track_query
+from .rollups import truncate_hour
+from .timeseries import load_buckets, lttb_indices
+
+HOUR = 3600.0
+
+CACHE_TTL_SECONDS = int(os.getenv("ANALYTICS_CACHE_TTL", "300"))
+CACHE_MAX_ENTRIES = 256
+
+_cache: dict[tuple, tuple[float, dict]] = {}
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key):
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+        _cache.pop(key, None)
+        return None
+
+
+def _cache_put(key, value):
+    with _cache_lock:
+        if len(_cache) >= CACHE_MAX_ENTRIES:
+            # drop the entry closest to expiry
+            _cache.pop(min(_cache, key=lambda k: _cache[k][0]))
+        _cache[key] = (time.monotonic() + CACHE_TTL_SECONDS, value)
+
+
+def clear_cache():
+    with _cache_lock:
+        _cache.clear()
+
+
+def hourly_sentiment(session, symbol: str, start: datetime, hours: int) -> tuple[np.ndarray, np.ndarray]:
+    """(counts, mean sentiment) on an hourly grid starting at `start`; NaN where there were no scores."""
+    counts = np.zeros(hours)
+    sums = np.zeros(hours)
+    scored = np.zeros(hours)
+    acc = load_buckets(session, symbol, start, start + timedelta(hours=hours), "hour")
+    if acc:
+        t = np.array([(b - start).total_seconds() for b in acc]) // HOUR
+        vals = np.array(list(acc.values()), dtype=float)
+        idx = t.astype(np.int64)
+        counts[idx] = vals[:, 0]
+        sums[idx] = vals[:, 1]
+        scored[idx] = vals[:, 2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(scored > 0, sums / scored, np.nan)
+    return counts, mean
+
+
+def hourly_close(session, stooq_symbol: str, start: datetime, hours: int) -> np.ndarray:
+    """
+    Last close seen in each hour, forward-filled; NaN before the first quote.
+    Days already downsampled (src/quotes.py) contribute their daily close at
+    the time of the last snapshot folded into the bar.
+    """
+    end = start + timedelta(hours=hours)
+    stmt = (
+        select(StockQuote.market_ts, StockQuote.close)
+        .where(StockQuote.symbol == stooq_symbol)
+        .where(StockQuote.market_ts >= start)
+        .where(StockQuote.market_ts < end)
+        .where(StockQuote.close.is_not(None))
+        .union_all(
+            select(StockQuoteDaily.market_ts, StockQuoteDaily.close)
+            .where(StockQuoteDaily.symbol == stooq_symbol)
+            .where(StockQuoteDaily.market_ts >= start)
+            .where(StockQuoteDaily.market_ts < end)
+            .where(StockQuoteDaily.close.is_not(None))
+        )
+        .order_by("market_ts")
+    )
+    with track_query("analytics_quotes"):
+        rows = session.execute(stmt).all()
+    close = np.full(hours, np.nan)
+    if not rows:
+        return close
+
+    ts = np.array([(r[0] - start).total_seconds() for r in rows])
+    px = np.array([r[1] for r in rows], dtype=float)
+    idx = (ts // HOUR).astype(np.int64)
+
+    # rows are time-ordered: the last snapshot of each hour is the first one seen from the end
+    uniq, first_from_end = np.unique(idx[::-1], return_index=True)
+    close[uniq] = px[::-1][first_from_end]
+    return forward_fill(close)
+
+
+def forward_fill(a: np.ndarray) -> np.ndarray:
+    valid = np.isfinite(a)
+    pos = np.where(valid, np.arange(a.size), 0)
+    np.maximum.accumulate(pos, out=pos)
+    out = a[pos]
+    out[: np.argmax(valid) if valid.any() else a.size] = np.nan
+    return out
+
+
+def log_returns(close: np.ndarray) -> np.ndarray:
+    r = np.full(close.size, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r[1:] = np.log(close[1:] / close[:-1])
+    return r
+
+
+def _window_sums(a: np.ndarray, window: int) -> np.ndarray:
+    cs = np.concatenate(([0.0], np.cumsum(a)))
+    return cs[window:] - cs[:-window]
+
+
+def rolling_corr(x: np.ndarray, y: np.ndarray, window: int, min_periods: int | None = None) -> np.ndarray:
+    """
+    Trailing Pearson correlation over `window` hours, ignoring hours where
+    either side is NaN. Computed from cumulative sums, so O(n) for any window.
+    Element i covers hours [i - window + 1, i]; the first window - 1 are NaN.
+    """
+    n_total = x.size
+    out = np.full(n_total, np.nan)
+    if n_total < window:
+        return out
+    min_periods = min_periods or max(3, window // 2)
+
+    mask = np.isfinite(x) & np.isfinite(y)
+    xm = np.where(mask, x, 0.0)
+    ym = np.where(mask, y, 0.0)
+    n = _window_sums(mask.astype(float), window)
+    sx = _window_sums(xm, window)
+    sy = _window_sums(ym, window)
+    sxx = _window_sums(xm * xm, window)
+    syy = _window_sums(ym * ym, window)
+    sxy = _window_sums(xm * ym, window)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        vx = sxx - sx * sx / n
+        vy = syy - sy * sy / n
+        corr = cov / np.sqrt(vx * vy)
+    corr[(n < min_periods) | (vx <= 1e-12) | (vy <= 1e-12)] = np.nan
+    out[window - 1:] = np.clip(corr, -1.0, 1.0)
+    return out
+
+
+def _corr(x: np.ndarray, y: np.ndarray, min_periods: int = 3) -> float | None:
+    mask = np.isfinite(x) & np.isfinite(y)
+    if mask.sum() < min_periods:
+        return None
+    xv = x[mask] - x[mask].mean()
+    yv = y[mask] - y[mask].mean()
+    denom = np.sqrt((xv * xv).sum() * (yv * yv).sum())
+    if denom <= 1e-12:
+        return None
+    return float((xv * yv).sum() / denom)
+
+
+def lagged_cross_correlation(sentiment: np.ndarray, returns: np.ndarray, max_lag: int) -> list[dict]:
+    """
+    corr(sentiment[t], returns[t + lag]) for lag in [-max_lag, max_lag].
+    A peak at a positive lag means sentiment moves before price.
+    """
+    out = []
+    n = sentiment.size
+    for lag in range(-max_lag, max_lag + 1):
+        if abs(lag) >= n:
+            continue
+        if lag >= 0:
+            c = _corr(sentiment[: n - lag], returns[lag:])
+        else:
+            c = _corr(sentiment[-lag:], returns[: n + lag])
+        out.append({"lag_hours": lag, "corr": c})
+    return out
+
+
+def rolling_zscore(x: np.ndarray, window: int) -> np.ndarray:
+    """z of each value against the trailing `window` values before it (NaN-aware)."""
+    out = np.full(x.size, np.nan)
+    if x.size <= window:
+        return out
+    mask = np.isfinite(x)
+    xm = np.where(mask, x, 0.0)
+    n = _window_sums(mask.astype(float), window)[:-1]
+    s = _window_sums(xm, window)[:-1]
+    ss = _window_sums(xm * xm, window)[:-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s / n
+        std = np.sqrt(np.maximum(ss / n - mean * mean, 0.0))
+        z = (x[window:] - mean) / std
+    z[(n < 3) | (std <= 1e-12)] = np.nan
+    out[window:] = z
+    return out
+
+
+def _nan_to_none(a: np.ndarray) -> list:
+    return [None if not np.isfinite(v) else round(float(v), 6) for v in a]
+
+
+def sentiment_price_analytics(
+    session,
+    symbol: str,
+    stooq_symbol: str,
+    window: timedelta,
+    window_label: str,
+    *,
+    roll_hours: int = 24,
+    max_lag: int = 24,
+    z_threshold: float = 3.0,
+    max_points: int = 500,
+) -> dict:
+    """
+    Align hourly sentiment with hourly closes and compute rolling correlation,
+    lagged cross-correlation and z-score anomaly flags. Cached per
+    (symbol, window, parameters) for ANALYTICS_CACHE_TTL seconds.
+    """
+    key = (symbol, stooq_symbol, window_label, roll_hours, max_lag, z_threshold, max_points)
+    cached = _cache_get(key)
+    if cached is not None:
+        return cached
+
+    end = truncate_hour(datetime.utcnow()) + timedelta(hours=1)
+    start = truncate_hour(end - window)
+    hours = int((end - start).total_seconds() // HOUR)
+
+    counts, sentiment = hourly_sentiment(session, symbol, start, hours)
+    close = hourly_close(session, stooq_symbol, start, hours)
+    returns = log_returns(close)
+
+    corr = rolling_corr(sentiment, returns, roll_hours)
+    xcorr = lagged_cross_correlation(sentiment, returns, max_lag)
+    best = max(
+        (c for c in xcorr if c["corr"] is not None),
+        key=lambda c: abs(c["corr"]),
+        default=None,
+    )
+
+    z_count = rolling_zscore(counts, roll_hours)
+    z_sent = rolling_zscore(sentiment, roll_hours)
+    flagged = np.flatnonzero(
+        (np.abs(np.nan_to_num(z_count)) >= z_threshold)
+        | (np.abs(np.nan_to_num(z_sent)) >= z_threshold)
+    )
+
+    # keep the chart payload bounded on multi-year windows
+    hours_axis = np.arange(hours, dtype=float)
+    idx = lttb_indices(list(hours_axis), list(np.nan_to_num(corr)), max_points)
+
+    def ts(i):
+        return (start + timedelta(hours=int(i))).isoformat()
+
+    result = {
+        "symbol": symbol,
+        "quote_symbol": stooq_symbol,
+        "window": window_label,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "hours": hours,
+        "roll_hours": roll_hours,
+        "overall_corr": _corr(sentiment, returns),
+        "rolling_corr": {
+            "t": [ts(i) for i in idx],
+            "corr": _nan_to_none(corr[idx]),
+        },
+        "cross_correlation": xcorr,
+        "best_lag": best,
+        "anomalies": [
+            {
+                "t": ts(i),
+                "count": int(counts[i]),
+                "sentiment": None if not np.isfinite(sentiment[i]) else float(sentiment[i]),
+                "z_count": None if not np.isfinite(z_count[i]) else float(z_count[i]),
+                "z_sentiment": None if not np.isfinite(z_sent[i]) else float(z_sent[i]),
+            }
+            for i in flagged
+        ],
+    }
+    _cache_put(key, result)
+    return result
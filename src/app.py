@@ -2,23 +2,26 @@
 import os
 import time
 from datetime import datetime, timedelta
-import requests
-from flask import Flask, request, jsonify, redirect, Response, g
+from flask import Flask, request, jsonify, redirect
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 from sqlalchemy import func
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
 from rq.job import Job
 from urllib.parse import quote as url_quote
 
-from .db import db, migrate
+from . import health as health_checks
+from . import jobstatus, monitoring, profiling, replica, tracing, upstream
+from .db import db, engine_options, migrate
 from .models import StockQuote, SocialMention
+from .analytics import sentiment_price_analytics
+from .compare import MAX_COMPARE_SYMBOLS, compare_symbols, parse_window
+from .mentions import BUCKETS, DEFAULT_PAGE_SIZE, mentions_page, mention_to_dict, parse_timestamp
 from .pages import home_page_html, report_page_html
-from .queue import get_queue
+from .queue import get_queue, get_redis_conn, observe_depths
+from .search import search_mentions
 from .tasks import run_collectors_task
+from .timeseries import DEFAULT_MAX_POINTS, DOWNSAMPLE_METHODS, INTERVALS, load_buckets, sentiment_timeseries
 
 APP_START = time.time()
-REQUEST_COUNT = Counter("http_requests_total", "Total HTTP requests", ["method", "endpoint", "status"])
-REQUEST_LATENCY = Histogram("http_request_latency_seconds", "Request latency", ["endpoint"])
 
 sentiment_analyzer = SentimentIntensityAnalyzer()
 
@@ -37,9 +40,27 @@ def score_sentiment(text: str) -> float:
     """
     if not text:
         return 0.0
-    return sentiment_analyzer.polarity_scores(text)["compound"]
-
-FINNHUB_SEARCH_URL = "https://finnhub.io/api/v1/search"
+    t0 = time.perf_counter()
+    score = sentiment_analyzer.polarity_scores(text)["compound"]
+    monitoring.SENTIMENT_SECONDS.inc(time.perf_counter() - t0)
+    monitoring.SENTIMENT_SCORED.inc()
+    return score
+
+def score_sentiments(texts: list[str]) -> list[float]:
+    """score_sentiment for a batch; repeated texts (syndicated headlines) are scored once."""
+    t0 = time.perf_counter()
+    scores = {}
+    for text in texts:
+        if text not in scores:
+            scores[text] = sentiment_analyzer.polarity_scores(text)["compound"] if text else 0.0
+    monitoring.SENTIMENT_SECONDS.inc(time.perf_counter() - t0)
+    monitoring.SENTIMENT_SCORED.inc(len(scores))
+    return [scores[text] for text in texts]
+
+# Base URLs are overridable so load tests and benchmarks can point at a local stub.
+FINNHUB_API_URL = os.getenv("FINNHUB_API_URL", "https://finnhub.io/api/v1")
+FINNHUB_SEARCH_URL = f"{FINNHUB_API_URL}/search"
+FINNHUB_PROFILE_URL = f"{FINNHUB_API_URL}/stock/profile2"
 
 def resolve_symbol(user_input: str) -> str:
     """
@@ -63,21 +84,41 @@ def resolve_symbol(user_input: str) -> str:
     if not api_key:
         return raw.upper()
 
+    with tracing.span("resolve_symbol", input=raw):
+        try:
+            r = upstream.get(
+                "finnhub",
+                FINNHUB_SEARCH_URL,
+                params={"q": raw, "token": api_key},
+                timeout=10,
+            )
+            r.raise_for_status()
+            results = r.json().get("result", [])
+            if results:
+                # pick the top match
+                return (results[0].get("symbol") or raw).upper()
+        except Exception:
+            pass
+
+    return raw.upper()
+
+
+def get_company_name(symbol: str) -> str:
+    api_key = os.getenv("FINNHUB_API_KEY")
+    if not api_key:
+        return ""
+
     try:
-        r = requests.get(
-            FINNHUB_SEARCH_URL,
-            params={"q": raw, "token": api_key},
+        r = upstream.get(
+            "finnhub",
+            FINNHUB_PROFILE_URL,
+            params={"symbol": symbol, "token": api_key},
             timeout=10,
         )
         r.raise_for_status()
-        results = r.json().get("result", [])
-        if results:
-            # pick the top match
-            return (results[0].get("symbol") or raw).upper()
+        return (r.json().get("name") or "").strip()
     except Exception:
-        pass
-
-    return raw.upper()
+        return ""
 
 
 def to_stooq_symbol(symbol: str) -> str:
@@ -112,9 +153,15 @@ def create_app():
         app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
 
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+    # optional read replica (DATABASE_REPLICA_URL) for the @replica.read_only views
+    app.config["SQLALCHEMY_BINDS"] = replica.binds_config(engine_options)
 
     db.init_app(app)
     migrate.init_app(app, db)
+    monitoring.init_app(app)
+    tracing.init_app(app)
+    profiling.init_app(app)
 
 
     @app.route("/collect", methods=["POST"])
@@ -126,10 +173,19 @@ def create_app():
         if not resolved_full:
             return {"error": "Missing symbol"}, 400
 
+        # this client's next reads of the symbol must see what the collect writes
+        replica.stick_to_primary(resolved_full)
+
         # Prefer async via Redis/RQ if configured; otherwise run inline
         try:
             q = get_queue()
-            job = q.enqueue(run_collectors_task, resolved_full)
+            job = jobstatus.enqueue(
+                q,
+                run_collectors_task,
+                resolved_full,
+                symbol=resolved_full,
+                meta={"traceparent": tracing.current_traceparent()},
+            )
             return {"job_id": job.id, "symbol": resolved_full}, 202
         except Exception:
             # Redis not configured / not reachable -> run synchronously
@@ -137,6 +193,7 @@ def create_app():
             return {"job_id": None, "symbol": resolved_full, "status": "ran_inline"}, 200
 
     @app.route("/report")
+    @replica.read_only
     def report():
         user_input = (request.args.get("symbol") or "").strip()
         resolved_full = resolve_symbol(user_input)        # full (keeps suffix)
@@ -148,59 +205,69 @@ def create_app():
         since = datetime.utcnow() - timedelta(days=1)
 
         resolved = canonical
+        # count=clusters counts each syndicated story once (src/clustering.py)
+        by_cluster = request.args.get("count") == "clusters"
         # news uses CANONICAL
-        count = (
-            db.session.query(func.count(SocialMention.id))
-            .filter(SocialMention.platform == "news")
-            .filter(SocialMention.symbol == canonical)
-            .filter(SocialMention.created_at >= since)
-            .scalar()
-        ) or 0
-
-        avg_sent = (
-            db.session.query(func.avg(SocialMention.sentiment))
-            .filter(SocialMention.platform == "news")
-            .filter(SocialMention.symbol == canonical)
-            .filter(SocialMention.created_at >= since)
-            .scalar()
-        )
-
-        recent = (
-            SocialMention.query
-            .filter_by(platform="news", symbol=canonical)
-            .filter(SocialMention.created_at >= since)
-            .order_by(SocialMention.created_at.desc())
-            .limit(25)
-            .all()
-        )
+        if by_cluster:
+            with monitoring.track_query("report_clusters"):
+                stories = (
+                    db.session.query(func.avg(SocialMention.sentiment).label("sentiment"))
+                    .filter(SocialMention.platform == "news")
+                    .filter(SocialMention.symbol == canonical)
+                    .filter(SocialMention.created_at >= since)
+                    .group_by(func.coalesce(SocialMention.cluster_id, SocialMention.id))
+                    .subquery()
+                )
+                count, avg_sent = db.session.query(func.count(), func.avg(stories.c.sentiment)).one()
+        else:
+            with monitoring.track_query("report_count"):
+                count = (
+                    db.session.query(func.count(SocialMention.id))
+                    .filter(SocialMention.platform == "news")
+                    .filter(SocialMention.symbol == canonical)
+                    .filter(SocialMention.created_at >= since)
+                    .scalar()
+                ) or 0
+
+            with monitoring.track_query("report_avg"):
+                avg_sent = (
+                    db.session.query(func.avg(SocialMention.sentiment))
+                    .filter(SocialMention.platform == "news")
+                    .filter(SocialMention.symbol == canonical)
+                    .filter(SocialMention.created_at >= since)
+                    .scalar()
+                )
+
+        recent, next_cursor = mentions_page(db.session, canonical, since=since)
 
         # Sentiment buckets (VADER compound)
         pos = 0
         neu = 0
         neg = 0
 
-        # Mentions per hour (last 24h)
-        mentions_by_hour = {}  # key: "YYYY-mm-dd HH:00"
+        # Mentions per hour (last 24h), from the grouped query rather than the 25 rows shown
+        mentions_by_hour = load_buckets(db.session, canonical, since, datetime.utcnow(), "hour")
 
         # Quotes use STOOQ symbol (keep suffix if provided, else add .US)
         stooq_symbol = to_stooq_symbol(resolved_full)
 
-        latest_quote = (
-            StockQuote.query
-            .filter_by(symbol=stooq_symbol)
-            .order_by(StockQuote.fetched_at.desc())
-            .first()
-        )
-
-        # Fallback for any older rows you may have saved as canonical (like "AMD")
-        if not latest_quote:
+        with monitoring.track_query("report_latest_quote"):
             latest_quote = (
                 StockQuote.query
-                .filter(StockQuote.symbol.ilike(f"{canonical}%"))
-                .order_by(StockQuote.fetched_at.desc())
+                .filter_by(symbol=stooq_symbol)
+                .order_by(StockQuote.market_ts.desc())
                 .first()
             )
 
+            # Fallback for any older rows you may have saved as canonical (like "AMD")
+            if not latest_quote:
+                latest_quote = (
+                    StockQuote.query
+                    .filter(StockQuote.symbol.ilike(f"{canonical}%"))
+                    .order_by(StockQuote.market_ts.desc())
+                    .first()
+                )
+
         price_str = "NA"
         if latest_quote and latest_quote.close is not None:
             price_str = f"${latest_quote.close:.2f}"
@@ -221,10 +288,6 @@ def create_app():
             else:
                 neu += 1
 
-            # hour key in UTC (created_at is stored as UTC-naive)
-            hour_key = m.created_at.strftime("%Y-%m-%d %H:00")
-            mentions_by_hour[hour_key] = mentions_by_hour.get(hour_key, 0) + 1
-
             rows += f"""
             <tr>
             <td>{m.created_at}</td>
@@ -236,7 +299,7 @@ def create_app():
         # Build mentions/hour table (sorted newest first)
         hour_rows = ""
         for hk in sorted(mentions_by_hour.keys(), reverse=True):
-            hour_rows += f"<tr><td>{hk}</td><td>{mentions_by_hour[hk]}</td></tr>"
+            hour_rows += f"<tr><td>{hk.strftime('%Y-%m-%d %H:00')}</td><td>{mentions_by_hour[hk][0]}</td></tr>"
 
         avg_str = "NA" if avg_sent is None else f"{avg_sent:.3f}"
 
@@ -246,6 +309,7 @@ def create_app():
             resolved=resolved,
             price_str=price_str,
             count=count,
+            count_label="News stories" if by_cluster else "News mentions",
             avg_str=avg_str,
             sentiment_text=sentiment_text,
             pos=pos,
@@ -253,8 +317,164 @@ def create_app():
             neg=neg,
             hour_rows=hour_rows,
             rows=rows,
+            next_cursor=next_cursor or "",
         )
 
+    @app.route("/api/mentions")
+    @replica.read_only
+    def api_mentions():
+        symbol = (request.args.get("symbol") or "").strip().upper()
+        if symbol.startswith("$"):
+            symbol = symbol[1:]
+        canonical = symbol.split(".")[0]
+        if not canonical:
+            return jsonify({"error": "Missing symbol"}), 400
+
+        bucket = (request.args.get("bucket") or "").strip().lower() or None
+        if bucket and bucket not in BUCKETS:
+            return jsonify({"error": f"bucket must be one of {', '.join(BUCKETS)}"}), 400
+
+        try:
+            since = parse_timestamp(request.args.get("since"))
+            until = parse_timestamp(request.args.get("until"))
+            limit = int(request.args.get("limit") or DEFAULT_PAGE_SIZE)
+            rows, next_cursor = mentions_page(
+                db.session,
+                canonical,
+                since=since,
+                until=until,
+                bucket=bucket,
+                cursor=request.args.get("cursor") or None,
+                limit=limit,
+            )
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        return jsonify({
+            "symbol": canonical,
+            "items": [mention_to_dict(m) for m in rows],
+            "next_cursor": next_cursor,
+        })
+
+    @app.route("/api/mentions/search")
+    @replica.read_only
+    def api_mentions_search():
+        symbol = (request.args.get("symbol") or "").strip().upper().lstrip("$").split(".")[0] or None
+        try:
+            rows, next_cursor = search_mentions(
+                db.session,
+                request.args.get("q") or "",
+                symbol=symbol,
+                platform=(request.args.get("platform") or "").strip().lower() or None,
+                since=parse_timestamp(request.args.get("since")),
+                until=parse_timestamp(request.args.get("until")),
+                order=(request.args.get("order") or "rank").strip().lower(),
+                cursor=request.args.get("cursor") or None,
+                limit=int(request.args.get("limit") or DEFAULT_PAGE_SIZE),
+            )
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        return jsonify({
+            "items": [{**mention_to_dict(m), "platform": m.platform, "rank": rank} for m, rank in rows],
+            "next_cursor": next_cursor,
+        })
+
+    @app.route("/api/compare")
+    @replica.read_only
+    def api_compare():
+        raw = (request.args.get("symbols") or "").split(",")
+
+        # canonical for mentions, stooq form for quotes; no Finnhub round trip per symbol
+        pairs = []
+        seen = set()
+        for item in raw:
+            full = item.strip().lstrip("$").upper()
+            canonical = full.split(".")[0]
+            if not canonical or canonical in seen:
+                continue
+            seen.add(canonical)
+            pairs.append((canonical, to_stooq_symbol(full)))
+
+        if not pairs:
+            return jsonify({"error": "Missing symbols"}), 400
+        if len(pairs) > MAX_COMPARE_SYMBOLS:
+            return jsonify({"error": f"At most {MAX_COMPARE_SYMBOLS} symbols"}), 400
+
+        try:
+            window = parse_window(request.args.get("window"))
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        since = datetime.utcnow() - window
+        return jsonify({
+            "window_seconds": int(window.total_seconds()),
+            "since": since.isoformat(),
+            "symbols": compare_symbols(db.session, pairs, since),
+        })
+
+    @app.route("/api/timeseries")
+    @replica.read_only
+    def api_timeseries():
+        symbol = (request.args.get("symbol") or "").strip().lstrip("$").upper()
+        canonical = symbol.split(".")[0]
+        if not canonical:
+            return jsonify({"error": "Missing symbol"}), 400
+
+        interval = (request.args.get("interval") or "hour").strip().lower()
+        if interval not in INTERVALS:
+            return jsonify({"error": f"interval must be one of {', '.join(INTERVALS)}"}), 400
+
+        method = (request.args.get("method") or "lttb").strip().lower()
+        if method not in DOWNSAMPLE_METHODS:
+            return jsonify({"error": f"method must be one of {', '.join(DOWNSAMPLE_METHODS)}"}), 400
+
+        try:
+            end = parse_timestamp(request.args.get("to")) or datetime.utcnow()
+            start = parse_timestamp(request.args.get("from")) or end - timedelta(days=1)
+            max_points = int(request.args.get("max_points") or DEFAULT_MAX_POINTS)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        if start >= end:
+            return jsonify({"error": "from must be before to"}), 400
+
+        return jsonify(sentiment_timeseries(
+            db.session, canonical, start, end,
+            interval=interval, max_points=max_points, method=method,
+        ))
+
+    @app.route("/api/analytics")
+    @replica.read_only
+    def api_analytics():
+        symbol = (request.args.get("symbol") or "").strip().lstrip("$").upper()
+        canonical = symbol.split(".")[0]
+        if not canonical:
+            return jsonify({"error": "Missing symbol"}), 400
+
+        window_label = (request.args.get("window") or "30d").strip().lower()
+        try:
+            window = parse_window(window_label)
+            roll_hours = int(request.args.get("roll") or 24)
+            max_lag = int(request.args.get("max_lag") or 24)
+            z_threshold = float(request.args.get("z") or 3.0)
+        except ValueError as exc:
+            return jsonify({"error": str(exc)}), 400
+        if window > timedelta(days=5 * 365):
+            return jsonify({"error": "window is limited to 5 years"}), 400
+        if not (2 <= roll_hours <= 24 * 90) or not (0 <= max_lag <= 24 * 14):
+            return jsonify({"error": "roll must be 2..2160 hours and max_lag 0..336 hours"}), 400
+
+        return jsonify(sentiment_price_analytics(
+            db.session,
+            canonical,
+            to_stooq_symbol(symbol),
+            window,
+            window_label,
+            roll_hours=roll_hours,
+            max_lag=max_lag,
+            z_threshold=z_threshold,
+        ))
+
     @app.route("/")
     def main():
         return home_page_html()
@@ -270,7 +490,8 @@ def create_app():
             return jsonify([])
 
         try:
-            r = requests.get(
+            r = upstream.get(
+                "finnhub",
                 FINNHUB_SEARCH_URL,
                 params={"q": q, "token": api_key},
                 timeout=10,
@@ -301,12 +522,20 @@ def create_app():
         if not resolved_full:
             return "Missing symbol. Go back and enter one.", 400
 
+        replica.stick_to_primary(resolved_full)
+
         q = get_queue()
 
         # If Redis/RQ is configured, enqueue. Otherwise run inline.
         if q is not None:
             try:
-                job = q.enqueue(run_collectors_task, resolved_full)
+                job = jobstatus.enqueue(
+                    q,
+                    run_collectors_task,
+                    resolved_full,
+                    symbol=resolved_full,
+                    meta={"traceparent": tracing.current_traceparent()},
+                )
                 return redirect(f"/report?symbol={url_quote(resolved_full)}&job_id={job.id}")
             except Exception:
                 # Redis down / misconfigured -> fallback to synchronous
@@ -316,57 +545,93 @@ def create_app():
         run_collectors_task(resolved_full)
         return redirect(f"/report?symbol={url_quote(resolved_full)}")
         
-    @app.before_request
-    def before():
-        g.start_time = time.time()
-
-    @app.after_request
-    def after(response):
-        # Prometheus client metrics
-        try:
-            endpoint = request.path
-            REQUEST_COUNT.labels(request.method, endpoint, str(response.status_code)).inc()
-            dt = time.time() - g.start_time
-            REQUEST_LATENCY.labels(endpoint).observe(dt)
-        except Exception:
-            pass
-
-        return response
-    
     @app.route("/metrics")
     def metrics():
-        return Response(generate_latest(), mimetype=CONTENT_TYPE_LATEST)
+        if replica.enabled():
+            replica.replica_lag()  # keep the lag gauge fresh between reads
+        try:
+            observe_depths()
+        except Exception:
+            pass  # Redis down or not configured; the rest of /metrics still matters
+        return monitoring.metrics_response()
     
     @app.route("/health")
     def health():
+        # always 200 while the process can answer; the body says what is degraded
+        checks = health_checks.checks(stale_ok=True)
         return {
-            "status": "ok",
+            "status": health_checks.overall(checks),
             "uptime_seconds": int(time.time() - APP_START),
-            "db": "ok"
+            "checks": checks,
         }
+
+    @app.route("/ready")
+    def ready():
+        # load balancers drain this dyno while a required dependency is down
+        checks = health_checks.checks()
+        body = {"status": health_checks.overall(checks), "checks": checks}
+        return body, 200 if health_checks.ready(checks) else 503
     
         
     @app.route("/api/job/<job_id>")
     def api_job(job_id):
+        if not jobstatus.valid_job_id(job_id):
+            return jsonify({"status": "not_found"}), 404
+        conn = get_redis_conn()
+        if conn is None:
+            return jsonify({"status": "unavailable", "reason": "rq/redis not configured"}), 503
+
         try:
-            q = get_queue()
+            record = jobstatus.read(conn, job_id)
+        except Exception:
+            return jsonify({"status": "unavailable", "reason": "redis unreachable"}), 503
+        if record is None:
+            return jsonify({"status": "not_found"}), 404
+        return jsonify({"id": job_id, **record})
+
+    @app.route("/api/jobs")
+    def api_jobs():
+        ids = [i for i in (request.args.get("ids") or "").split(",") if i]
+        if not ids:
+            return jsonify({"error": "Missing ids"}), 400
+        if len(ids) > jobstatus.MAX_BATCH:
+            return jsonify({"error": f"At most {jobstatus.MAX_BATCH} ids"}), 400
+        conn = get_redis_conn()
+        if conn is None:
+            return jsonify({"status": "unavailable", "reason": "rq/redis not configured"}), 503
+
+        valid = [i for i in dict.fromkeys(ids) if jobstatus.valid_job_id(i)]
+        try:
+            records = jobstatus.read_many(conn, valid)
         except Exception:
-            q = None
+            return jsonify({"status": "unavailable", "reason": "redis unreachable"}), 503
+        return jsonify({"jobs": {
+            i: {"id": i, **records[i]} if records.get(i) else {"id": i, "status": "not_found"}
+            for i in dict.fromkeys(ids)
+        }})
+
+    @app.route("/api/job/<job_id>/profile")
+    def api_job_profile(job_id):
+        # same gate as /debug/profile
+        if not os.getenv("PROFILE_TOKEN"):
+            return jsonify({"error": "not found"}), 404
+        if not profiling.token_ok(request.headers.get("Authorization")):
+            return jsonify({"error": "unauthorized"}), 401, {"WWW-Authenticate": "Bearer"}
 
+        q = get_queue()
         if q is None:
             return jsonify({"status": "unavailable", "reason": "rq/redis not configured"}), 503
-
         try:
             job = Job.fetch(job_id, connection=q.connection)
         except Exception:
             return jsonify({"status": "not_found"}), 404
-
-        return jsonify({
-            "id": job.id,
-            "status": job.get_status(),   # queued/started/finished/failed
-            "result": job.result,
-            "exc_info": job.exc_info,
-        })
+        if "profile" not in job.meta:
+            return jsonify({"error": "job was not profiled"}), 404
+        return app.response_class(
+            job.meta["profile"],
+            mimetype="text/plain",
+            headers={"Content-Disposition": f'attachment; filename="job-{job.id}.collapsed"'},
+        )
 
     return app
 
@@ -0,0 +1,210 @@
+# src/breaker.py
+"""
+Circuit breakers: in-process, and shared across processes through Redis.
+
+After `failure_threshold` consecutive failures the breaker opens and
+allow() returns False for `reset_timeout` seconds, so callers take their
+fallback immediately instead of waiting on a dead dependency. Then one
+trial call is let through (half-open): success closes the breaker,
+failure opens it for another `reset_timeout`.
+"""
+import threading
+import time
+
+import redis
+
+from .monitoring import CIRCUIT_STATE, CIRCUIT_TRANSITIONS
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0, label: str | None = None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.label = label or name  # the `breaker` label on its metrics
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        CIRCUIT_STATE.labels(self.label).set(_STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def _set(self, state: str):
+        if state != self._state:
+            self._state = state
+            CIRCUIT_STATE.labels(self.label).set(_STATE_VALUES[state])
+            CIRCUIT_TRANSITIONS.labels(self.label, state).inc()
+
+    def rejecting(self) -> bool:
+        """True while calls would be refused; unlike allow(), never starts the half-open trial."""
+        with self._lock:
+            if self._state == OPEN:
+                return time.monotonic() - self._opened_at < self.reset_timeout
+            return self._state == HALF_OPEN
+
+    def allow(self) -> bool:
+        """True if a call may go ahead; moves open -> half-open once reset_timeout has passed."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set(HALF_OPEN)
+                return True  # the single trial call
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._set(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._set(OPEN)
+
+    def reset(self):
+        with self._lock:
+            self._failures = 0
+            self._set(CLOSED)
+
+
+class SharedCircuitBreaker:
+    """
+    The same state machine kept in Redis, so every web and worker process sees
+    one provider's breaker: when one job trips it, the others stop calling too.
+
+    State lives in the hash <prefix>:breaker:<name> (state, opened_at,
+    failures); a SET NX key elects the single half-open probe across
+    processes. Failures count within a reset_timeout window rather than
+    strictly consecutively. If Redis is unreachable the breaker falls back to
+    an in-process CircuitBreaker with the same settings, whose metrics carry
+    the label "<name>:local" so they never overwrite the shared state's.
+    """
+
+    def __init__(self, name: str, connection_factory, prefix: str,
+                 failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._connection = connection_factory
+        self._key = f"{prefix}:breaker:{name}"
+        self._probe_key = f"{self._key}:probe"
+        self._local = CircuitBreaker(name, failure_threshold, reset_timeout, label=f"{name}:local")
+        self._last = (CLOSED, 0)  # (state, failures) from this process's last read
+
+    def _conn(self):
+        return self._connection()
+
+    def _read(self, conn) -> tuple[str, float, int]:
+        state, opened_at, failures = conn.hmget(self._key, "state", "opened_at", "failures")
+        state = state.decode() if state else CLOSED
+        opened_at = float(opened_at) if opened_at else 0.0
+        failures = int(failures) if failures else 0
+        if state != CLOSED and time.time() - opened_at >= self.reset_timeout:
+            state = HALF_OPEN  # due for a probe
+        self._last = (state, failures)
+        CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[state])
+        return state, opened_at, failures
+
+    @property
+    def state(self) -> str:
+        conn = self._conn()
+        if conn is None:
+            return self._local.state
+        try:
+            return self._read(conn)[0]
+        except redis.RedisError:
+            return self._local.state
+
+    def rejecting(self) -> bool:
+        return self.state == OPEN
+
+    def allow(self) -> bool:
+        conn = self._conn()
+        if conn is None:
+            return self._local.allow()
+        try:
+            state, _, _ = self._read(conn)
+            if state == CLOSED:
+                return True
+            if state == OPEN:
+                return False
+            # half-open: exactly one process gets to probe
+            return bool(conn.set(self._probe_key, "1", nx=True, ex=max(int(self.reset_timeout), 1)))
+        except redis.RedisError:
+            return self._local.allow()
+
+    def record_success(self):
+        self._local.record_success()
+        if self._last == (CLOSED, 0):
+            return  # nothing to clear; keeps the healthy path at one read per call
+        conn = self._conn()
+        if conn is None:
+            return
+        try:
+            conn.delete(self._key, self._probe_key)
+        except redis.RedisError:
+            return
+        if self._last[0] != CLOSED:
+            CIRCUIT_TRANSITIONS.labels(self.name, CLOSED).inc()
+        self._last = (CLOSED, 0)
+        CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[CLOSED])
+
+    def record_failure(self):
+        self._local.record_failure()
+        conn = self._conn()
+        if conn is None:
+            return
+        try:
+            pipe = conn.pipeline()
+            pipe.hincrby(self._key, "failures", 1)
+            pipe.hget(self._key, "state")
+            failures, state = pipe.execute()
+            state = state.decode() if state else CLOSED
+            if failures == 1 and state == CLOSED:
+                # failures only count within one reset window
+                conn.expire(self._key, max(int(self.reset_timeout), 1))
+            if failures < self.failure_threshold and state == CLOSED:
+                self._last = (CLOSED, failures)
+                return
+            # trip, or re-open after a failed probe
+            pipe = conn.pipeline()
+            pipe.hset(self._key, mapping={"state": OPEN, "opened_at": repr(time.time()), "failures": 0})
+            pipe.expire(self._key, max(int(self.reset_timeout * 10), 60))
+            pipe.delete(self._probe_key)
+            pipe.execute()
+        except redis.RedisError:
+            return
+        if state == CLOSED:
+            CIRCUIT_TRANSITIONS.labels(self.name, OPEN).inc()
+        self._last = (OPEN, 0)
+        CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[OPEN])
+
+    def reset(self):
+        self._local.reset()
+        conn = self._conn()
+        if conn is not None:
+            try:
+                conn.delete(self._key, self._probe_key)
+            except redis.RedisError:
+                pass
+        self._last = (CLOSED, 0)
+
+
+def shared_names(conn, prefix: str) -> set[str]:
+    """Names of the breakers with state in Redis, i.e. ones that are failing or open."""
+    head = f"{prefix}:breaker:"
+    names = set()
+    for key in conn.scan_iter(match=f"{head}*", count=100):
+        key = key.decode() if isinstance(key, bytes) else key
+        if not key.endswith(":probe"):
+            names.add(key[len(head):])
+    return names
@@ -0,0 +1,120 @@
+# src/clustering.py
+"""
+Near-duplicate headline clustering (MinHash + LSH).
+
+GDELT reports one wire story from dozens of outlets with slightly different
+titles. At ingest each new headline is compared with the symbol's recent
+headlines on the same platform (CLUSTER_WINDOW_HOURS, default 48); when the
+estimated word-set Jaccard similarity is at least CLUSTER_SIMILARITY
+(default 0.6) it joins that headline's cluster.
+
+social_mentions.cluster_id holds the id of the cluster's first row, or NULL
+when the row started its own cluster, so COALESCE(cluster_id, id) is the
+cluster key and counting distinct keys counts stories instead of rows.
+
+Signatures are NUM_PERM MinHash values (universal hashing mod 2**61 - 1)
+computed for a whole batch at once with NumPy; LSH splits them into BANDS
+bands so only headlines sharing a band are compared.
+"""
+import os
+import re
+import zlib
+from datetime import timedelta
+
+import numpy as np
+
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS  # ~0.6 Jaccard is where a pair becomes likely to share a band
+SIMILARITY = float(os.getenv("CLUSTER_SIMILARITY", "0.6"))
+WINDOW = timedelta(hours=float(os.getenv("CLUSTER_WINDOW_HOURS", "48")))
+RECENT_LIMIT = int(os.getenv("CLUSTER_RECENT_LIMIT", "5000"))
+
+_PRIME = np.uint64((1 << 61) - 1)
+# fixed seed: signatures must agree across processes and runs
+_rng = np.random.default_rng(20261019)
+_A = _rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+_EMPTY = np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+
+_WORD = re.compile(r"[a-z0-9$%.']+")
+# trailing outlet name: "Apple beats estimates - Reuters", "... | CNBC"
+_OUTLET = re.compile(r"\s+[-|–—]\s+[^-|–—]{1,40}$")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or says said the to was were will with".split()
+)
+
+
+def shingles(text: str) -> list[int]:
+    """32-bit hashes of the headline's distinct content words."""
+    text = _OUTLET.sub("", text or "").lower()
+    words = {w.strip(".'") for w in _WORD.findall(text)}
+    return [zlib.crc32(w.encode()) for w in words if w and w not in STOPWORDS]
+
+
+def signatures(texts: list[str]) -> np.ndarray:
+    """(len(texts), NUM_PERM) MinHash signatures; texts with no content words get _EMPTY."""
+    hashed = [shingles(t) for t in texts]
+    sigs = np.tile(_EMPTY, (len(texts), 1))
+    present = [i for i, h in enumerate(hashed) if h]
+    if not present:
+        return sigs
+    flat = np.fromiter((x for i in present for x in hashed[i]), dtype=np.uint64)
+    starts = np.cumsum([0] + [len(hashed[i]) for i in present[:-1]])
+    # (a*x + b) mod p for every shingle and permutation; a, x < 2**32 so nothing overflows
+    permuted = (np.outer(flat, _A) + _B) % _PRIME
+    sigs[present] = np.minimum.reduceat(permuted, starts, axis=0)
+    return sigs
+
+
+class LshIndex:
+    """Banded MinHash index mapping signatures to cluster labels."""
+
+    def __init__(self):
+        self._buckets = [{} for _ in range(BANDS)]
+        self._sigs: list[np.ndarray] = []
+        self._labels: list = []
+
+    def _keys(self, sig: np.ndarray):
+        return [sig[b * ROWS:(b + 1) * ROWS].tobytes() for b in range(BANDS)]
+
+    def add(self, sig: np.ndarray, label) -> None:
+        if (sig == _EMPTY).all():
+            return  # nothing to match on
+        n = len(self._sigs)
+        self._sigs.append(sig)
+        self._labels.append(label)
+        for bucket, key in zip(self._buckets, self._keys(sig)):
+            bucket.setdefault(key, []).append(n)
+
+    def query(self, sig: np.ndarray):
+        """Label of the most similar indexed signature at or above SIMILARITY, else None."""
+        candidates = {n for bucket, key in zip(self._buckets, self._keys(sig)) for n in bucket.get(key, ())}
+        best, best_sim = None, SIMILARITY
+        for n in sorted(candidates):  # earliest wins ties
+            sim = float(np.count_nonzero(self._sigs[n] == sig)) / NUM_PERM
+            if sim >= best_sim and (best is None or sim > best_sim):
+                best, best_sim = n, sim
+        return None if best is None else self._labels[best]
+
+
+def assign_clusters(texts: list[str], recent: list[tuple[str, int]]) -> tuple[list[int | None], list[int | None]]:
+    """
+    Cluster new headlines against `recent` (text, cluster key) pairs and each other.
+
+    Returns (existing, head): for each new text either the cluster key of the
+    stored headline it matches, or the index of the earlier new text whose
+    cluster it joins. Both None means it starts a cluster.
+    """
+    index = LshIndex()
+    for sig, (_, key) in zip(signatures([t for t, _ in recent]), recent):
+        index.add(sig, key)
+    existing, head = [None] * len(texts), [None] * len(texts)
+    for i, sig in enumerate(signatures(texts)):
+        label = index.query(sig)
+        if isinstance(label, tuple):
+            head[i] = label[1]
+        elif label is not None:
+            existing[i] = label
+        index.add(sig, ("new", i) if label is None else label)
+    return existing, head
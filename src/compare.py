@@ -0,0 +1,114 @@
+# src/compare.py
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, literal, select, union_all
+
+from .mentions import NEGATIVE_THRESHOLD, POSITIVE_THRESHOLD
+from .models import SocialMention, StockQuote
+from .monitoring import track_query
+
+MAX_COMPARE_SYMBOLS = 500
+
+_WINDOW_RE = re.compile(r"^(\d+)([mhd])$")
+_WINDOW_UNITS = {"m": "minutes", "h": "hours", "d": "days"}
+
+
+def parse_window(value: str | None, default: str = "24h") -> timedelta:
+    """Parse a window like "90m", "24h" or "7d" into a timedelta."""
+    value = (value or default).strip().lower()
+    m = _WINDOW_RE.match(value)
+    if not m or int(m.group(1)) <= 0:
+        raise ValueError("window must look like 90m, 24h or 7d")
+    return timedelta(**{_WINDOW_UNITS[m.group(2)]: int(m.group(1))})
+
+
+def compare_symbols(
+    session,
+    symbols: list[tuple[str, str]],
+    since: datetime,
+    platform: str = "news",
+) -> list[dict]:
+    """
+    Per-symbol sentiment stats and latest close for many symbols in one round trip.
+
+    `symbols` is a list of (canonical, stooq_symbol) pairs, e.g. ("AAPL", "AAPL.US").
+    The requested symbols become an inline derived table which is left-joined to
+    a single GROUP BY over mentions and a ROW_NUMBER() "latest quote per symbol"
+    window query, so the statement count stays at one however many symbols are asked for.
+    """
+    if not symbols:
+        return []
+
+    # (VALUES ...) AS t(a, b) isn't portable to SQLite, UNION ALL of literals is.
+    requested = union_all(*[
+        select(literal(canonical).label("symbol"), literal(stooq).label("stooq_symbol"))
+        for canonical, stooq in symbols
+    ]).subquery("requested")
+    canonicals = [canonical for canonical, _ in symbols]
+    stooqs = [stooq for _, stooq in symbols]
+
+    agg = (
+        select(
+            SocialMention.symbol.label("symbol"),
+            func.count(SocialMention.id).label("count"),
+            func.avg(SocialMention.sentiment).label("avg_sentiment"),
+            func.sum(case((SocialMention.sentiment >= POSITIVE_THRESHOLD, 1), else_=0)).label("pos"),
+            func.sum(case((SocialMention.sentiment <= NEGATIVE_THRESHOLD, 1), else_=0)).label("neg"),
+        )
+        .where(SocialMention.platform == platform)
+        .where(SocialMention.symbol.in_(canonicals))
+        .where(SocialMention.created_at >= since)
+        .group_by(SocialMention.symbol)
+        .subquery("agg")
+    )
+
+    ranked = (
+        select(
+            StockQuote.symbol.label("symbol"),
+            StockQuote.close.label("close"),
+            StockQuote.market_ts.label("market_ts"),
+            func.row_number().over(
+                partition_by=StockQuote.symbol,
+                order_by=StockQuote.market_ts.desc(),
+            ).label("rn"),
+        )
+        .where(StockQuote.symbol.in_(stooqs))
+        .subquery("ranked")
+    )
+
+    stmt = (
+        select(
+            requested.c.symbol,
+            agg.c.count,
+            agg.c.avg_sentiment,
+            agg.c.pos,
+            agg.c.neg,
+            ranked.c.close,
+            ranked.c.market_ts,
+        )
+        .select_from(requested)
+        .outerjoin(agg, agg.c.symbol == requested.c.symbol)
+        .outerjoin(
+            ranked,
+            (ranked.c.symbol == requested.c.stooq_symbol) & (ranked.c.rn == 1),
+        )
+    )
+
+    with track_query("compare_symbols"):
+        result = session.execute(stmt).all()
+
+    out = []
+    for row in result:
+        count = row.count or 0
+        pos = row.pos or 0
+        neg = row.neg or 0
+        out.append({
+            "symbol": row.symbol,
+            "count": count,
+            "avg_sentiment": None if row.avg_sentiment is None else float(row.avg_sentiment),
+            "buckets": {"pos": pos, "neu": count - pos - neg, "neg": neg},
+            "latest_close": row.close,
+            "quote_market_ts": row.market_ts.isoformat() if row.market_ts else None,
+        })
+    return out
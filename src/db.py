@@ -1,5 +1,149 @@
-from flask_sqlalchemy import SQLAlchemy
+"""
+Database handle plus engine/pool settings for each process role.
+
+DB_ROLE picks the defaults: gunicorn.conf.py sets "web", worker.py sets
+"worker", and anything else (scripts, flask CLI, tests) is "cli". Every
+setting can be overridden per role or globally from the environment,
+e.g. DB_POOL_SIZE_WEB=8 or DB_POOL_SIZE=3:
+
+  DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (s), DB_POOL_RECYCLE (s),
+  DB_STATEMENT_TIMEOUT_MS (Postgres; 0 = none), DB_SQLITE_BUSY_TIMEOUT_MS
+
+Heroku Postgres caps connections per plan, so the defaults keep
+web (2 workers x 7) + worker (2) + a CLI session well under 20.
+
+With DATABASE_REPLICA_URL set, the session can route reads to a replica
+bind; see src/replica.py for which requests do.
+"""
+import os
+import sqlite3
+import time
+from contextvars import ContextVar
+
 from flask_migrate import Migrate
+from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from .monitoring import DB_POOL_CAPACITY, DB_POOL_CHECKED_OUT, DB_POOL_CHECKOUT_SECONDS, DB_POOL_TIMEOUTS
+
+REPLICA_BIND = "replica"
+
+# set for the duration of a replica-routed request (src/replica.py)
+replica_reads: ContextVar[bool] = ContextVar("replica_reads", default=False)
+
+
+class RoutingSession(Session):
+    """Sends statements to the replica bind while replica_reads is set; flushes always go to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and replica_reads.get() and not self._flushing:
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+migrate = Migrate()
+
+ROLES = ("web", "worker", "cli")
+
+ROLE_DEFAULTS = {
+    "web": {"pool_size": 5, "max_overflow": 2, "pool_timeout": 10, "statement_timeout_ms": 15_000},
+    "worker": {"pool_size": 2, "max_overflow": 0, "pool_timeout": 30, "statement_timeout_ms": 120_000},
+    "cli": {"pool_size": 1, "max_overflow": 1, "pool_timeout": 30, "statement_timeout_ms": 0},
+}
+POOL_RECYCLE_SECONDS = 1800
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+
+def process_role() -> str:
+    role = os.getenv("DB_ROLE", "cli").strip().lower()
+    return role if role in ROLES else "cli"
+
+
+def _setting(name: str, role: str, default: int) -> int:
+    value = os.getenv(f"DB_{name.upper()}_{role.upper()}") or os.getenv(f"DB_{name.upper()}")
+    return int(value) if value else default
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports checkout wait, saturation and timeouts to Prometheus."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.role = process_role()
+        DB_POOL_CAPACITY.labels(self.role).set(self.size() + max(self._max_overflow, 0))
+
+    def connect(self):
+        # queue wait + (re)connect + pre-ping: everything a request waits for
+        t0 = time.perf_counter()
+        try:
+            return super().connect()
+        except sa_exc.TimeoutError:
+            DB_POOL_TIMEOUTS.labels(self.role).inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.labels(self.role).observe(time.perf_counter() - t0)
+
+
+@event.listens_for(TimedQueuePool, "checkout")
+def _on_checkout(dbapi_conn, record, proxy):
+    DB_POOL_CHECKED_OUT.labels(process_role()).inc()
+
+
+@event.listens_for(TimedQueuePool, "checkin")
+def _on_checkin(dbapi_conn, record):
+    DB_POOL_CHECKED_OUT.labels(process_role()).dec()
+
+
+@event.listens_for(Engine, "connect")
+def _sqlite_pragmas(dbapi_conn, record):
+    # WAL lets the web app read while a collector writes; NORMAL is safe under WAL
+    if isinstance(dbapi_conn, sqlite3.Connection):
+        busy_ms = _setting("sqlite_busy_timeout_ms", process_role(), SQLITE_BUSY_TIMEOUT_MS)
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute(f"PRAGMA busy_timeout={int(busy_ms)}")
+        cur.close()
+
+
+def engine_options(uri: str, role: str | None = None) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for `uri` in this process role."""
+    role = role or process_role()
+    defaults = ROLE_DEFAULTS[role]
+
+    if uri.startswith("sqlite"):
+        if uri in ("sqlite://", "sqlite:///:memory:"):
+            return {}  # in-memory databases keep SQLAlchemy's single-connection pool
+        busy_ms = _setting("sqlite_busy_timeout_ms", role, SQLITE_BUSY_TIMEOUT_MS)
+        return {
+            "poolclass": TimedQueuePool,
+            "pool_size": _setting("pool_size", role, defaults["pool_size"]),
+            "max_overflow": _setting("max_overflow", role, defaults["max_overflow"]),
+            "pool_timeout": _setting("pool_timeout", role, defaults["pool_timeout"]),
+            "connect_args": {"timeout": busy_ms / 1000.0},
+        }
 
-db = SQLAlchemy()
-migrate = Migrate()
\ No newline at end of file
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": _setting("pool_size", role, defaults["pool_size"]),
+        "max_overflow": _setting("max_overflow", role, defaults["max_overflow"]),
+        "pool_timeout": _setting("pool_timeout", role, defaults["pool_timeout"]),
+        "pool_recycle": _setting("pool_recycle", role, POOL_RECYCLE_SECONDS),
+        "pool_pre_ping": True,
+        # reuse the warmest connection so surplus ones idle out and get recycled
+        "pool_use_lifo": True,
+    }
+    if uri.startswith("postgresql"):
+        connect_args = {"application_name": f"sentiment-scraper:{role}", "connect_timeout": 10}
+        statement_timeout = _setting("statement_timeout_ms", role, defaults["statement_timeout_ms"])
+        if statement_timeout:
+            connect_args["options"] = f"-c statement_timeout={statement_timeout}"
+        options["connect_args"] = connect_args
+    return options
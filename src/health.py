@@ -0,0 +1,177 @@
+# src/health.py
+"""
+Dependency probes for /health and /ready.
+
+  db        SELECT 1 on the primary, over its own short-timeout connection
+  replica   replication lag, when DATABASE_REPLICA_URL is set
+  redis     PING
+  queue     jobs waiting per priority queue
+  workers   RQ workers whose heartbeat is fresher than WORKER_STALE_SECONDS
+  upstreams provider circuit breaker states (src/upstream.py)
+
+Each probe reports a status (ok | degraded | down | disabled) and its
+latency_ms. A full set of results is cached per process for
+HEALTH_CACHE_SECONDS (default 5), so load balancers polling every second
+cost one round of probes per process every few seconds, not one per poll.
+The db probe connects outside the app's pool with HEALTH_PROBE_TIMEOUT
+(default 2s) as its connect and statement timeout, so a hung database reads
+as down within seconds. /health never waits for a round another request is
+running: it answers with the previous results.
+
+/ready answers 503 while any dependency in READY_REQUIRES (default "db") is
+down. Redis is not required by default: without it collects run inline.
+"""
+import math
+import os
+import threading
+import time
+
+from rq import Worker
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import NullPool
+
+from . import replica, upstream
+from .db import db
+from .queue import connection_pool, get_queues, get_redis_conn
+
+OK, DEGRADED, DOWN, DISABLED = "ok", "degraded", "down", "disabled"
+
+CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+MAX_QUEUE_DEPTH = int(os.getenv("HEALTH_MAX_QUEUE_DEPTH", "1000"))
+WORKER_STALE_SECONDS = int(os.getenv("WORKER_STALE_SECONDS", "420"))  # RQ's default worker TTL
+PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2"))
+
+_lock = threading.Lock()
+_cache = {"checked": float("-inf"), "checks": None}
+_probe_engines = {}
+
+
+def required() -> set[str]:
+    return {d.strip() for d in os.getenv("READY_REQUIRES", "db").split(",") if d.strip()}
+
+
+def _timed(probe, *args) -> dict:
+    t0 = time.perf_counter()
+    try:
+        result = probe(*args)
+    except Exception as exc:
+        result = {"status": DOWN, "error": type(exc).__name__}
+    result["latency_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    return result
+
+
+def probe_engine():
+    """
+    The primary without the web pool's 10s checkout, 10s connect and 15s
+    statement timeouts: one unpooled connection per probe, bounded by
+    PROBE_TIMEOUT. SQLite has no server to hang, so it keeps db.engine.
+    """
+    engine = db.engine
+    if engine.dialect.name != "postgresql":
+        return engine
+    probe = _probe_engines.get(engine.url)
+    if probe is None:
+        probe = _probe_engines[engine.url] = create_engine(engine.url, poolclass=NullPool, connect_args={
+            "application_name": "sentiment-scraper:health",
+            "connect_timeout": max(1, math.ceil(PROBE_TIMEOUT)),  # libpq takes whole seconds
+            "options": f"-c statement_timeout={int(PROBE_TIMEOUT * 1000)}",
+        })
+    return probe
+
+
+def probe_db() -> dict:
+    with probe_engine().connect() as conn:
+        conn.execute(text("SELECT 1"))
+    return {"status": OK}
+
+
+def probe_replica() -> dict:
+    lag = replica.replica_lag()
+    if lag is None:
+        return {"status": DOWN}
+    return {"status": OK if lag < replica.max_lag_seconds() else DEGRADED, "lag_seconds": round(lag, 1)}
+
+
+def probe_redis(conn) -> dict:
+    conn.ping()
+    return {"status": OK}
+
+
+def probe_queue(conn) -> dict:
+    pipe = conn.pipeline(transaction=False)
+    queues = get_queues(conn)
+    for queue in queues:
+        pipe.llen(queue.key)
+    depths = dict(zip((q.name for q in queues), pipe.execute()))
+    return {"status": OK if sum(depths.values()) <= MAX_QUEUE_DEPTH else DEGRADED, "depth": depths}
+
+
+def probe_workers(conn) -> dict:
+    now = time.time()
+    ages = [
+        now - w.last_heartbeat.timestamp()
+        for w in Worker.all(connection=conn)
+        if w.last_heartbeat is not None
+    ]
+    alive = [a for a in ages if a < WORKER_STALE_SECONDS]
+    result = {"status": OK if alive else DOWN, "alive": len(alive), "stale": len(ages) - len(alive)}
+    if alive:
+        result["last_heartbeat_seconds"] = round(min(alive), 1)
+    return result
+
+
+def probe_upstreams() -> dict:
+    states = upstream.breaker_states()
+    return {"status": DEGRADED if "open" in states.values() else OK, "breakers": states}
+
+
+def _run_checks() -> dict:
+    checks = {"db": _timed(probe_db)}
+    checks["replica"] = _timed(probe_replica) if replica.enabled() else {"status": DISABLED}
+    conn = get_redis_conn()
+    if connection_pool() is None:
+        checks["redis"] = {"status": DISABLED}
+    elif conn is None:
+        checks["redis"] = {"status": DOWN, "error": "circuit_open"}
+    else:
+        checks["redis"] = _timed(probe_redis, conn)
+    if checks["redis"]["status"] == OK:
+        checks["queue"] = _timed(probe_queue, conn)
+        checks["workers"] = _timed(probe_workers, conn)
+    else:
+        checks["queue"] = checks["workers"] = {"status": checks["redis"]["status"]}
+    checks["upstreams"] = _timed(probe_upstreams)
+    return checks
+
+
+def checks(stale_ok: bool = False) -> dict:
+    """
+    Probe results per dependency, at most HEALTH_CACHE_SECONDS old. With
+    stale_ok, a caller that finds another request probing gets the previous
+    results instead of waiting for that round to finish.
+    """
+    now = time.monotonic()
+    if now - _cache["checked"] < CACHE_SECONDS:
+        return _cache["checks"]
+    wait = not stale_ok or _cache["checks"] is None
+    if not _lock.acquire(blocking=wait):
+        return _cache["checks"]  # another request is probing; serve the last round
+    try:
+        if now - _cache["checked"] < CACHE_SECONDS:
+            return _cache["checks"]
+        result = _run_checks()
+        _cache.update(checked=time.monotonic(), checks=result)
+    finally:
+        _lock.release()
+    return result
+
+
+def overall(results: dict) -> str:
+    statuses = {r["status"] for r in results.values()}
+    if any(results[d]["status"] == DOWN for d in required() if d in results):
+        return DOWN
+    return DEGRADED if statuses & {DOWN, DEGRADED} else OK
+
+
+def ready(results: dict) -> bool:
+    return overall(results) != DOWN
@@ -0,0 +1,113 @@
+# src/jobstatus.py
+"""
+Compact per-job status records for polling clients.
+
+Each collect job has one small Redis hash, <RQ_QUEUE_NAME>:status:<job_id>,
+that the enqueueing request and run_collectors_task update as the job
+moves through its stages:
+
+  status    queued | started | finished | failed
+  stage     queued | quote | news | sources | done
+  symbol, enqueued_at / started_at / ended_at (epoch seconds), duration_ms
+  quote_inserted, news_inserted, news_irrelevant, ...  row counts
+  error     exception class of the first failure, e.g. "quote:HTTPError"
+  skipped   providers whose circuit breaker was open, e.g. "gdelt"
+
+The record is written before the job is enqueued (enqueue() below), so a
+worker that picks the job up at once never has its updates overwritten
+by "queued".
+
+/api/job/<id> reads it with one HGETALL and /api/jobs with one pipeline,
+never deserializing the pickled RQ job. Records expire JOB_STATUS_TTL
+seconds after their last update. The RQ jobs themselves keep results for
+JOB_RESULT_TTL and failures for JOB_FAILURE_TTL.
+"""
+import os
+import re
+import time
+import uuid
+
+import redis
+from rq import Callback
+
+from .queue import QUEUE_PREFIX
+
+STATUS_TTL = int(os.getenv("JOB_STATUS_TTL", "3600"))
+RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "600"))
+FAILURE_TTL = int(os.getenv("JOB_FAILURE_TTL", "86400"))
+MAX_BATCH = 100
+
+_JOB_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+_INT_FIELDS = re.compile(r"_(inserted|duplicate|stale|invalid|irrelevant|errors|skipped)$|^duration_ms$")
+_FLOAT_FIELDS = ("enqueued_at", "started_at", "ended_at")
+
+
+def valid_job_id(job_id: str) -> bool:
+    return bool(_JOB_ID.match(job_id or ""))
+
+
+def status_key(job_id: str) -> str:
+    return f"{QUEUE_PREFIX}:status:{job_id}"
+
+
+def enqueue_options() -> dict:
+    """Retention for RQ's own job records; pass to Queue.enqueue."""
+    return {"result_ttl": RESULT_TTL, "failure_ttl": FAILURE_TTL, "on_failure": Callback(on_job_failure)}
+
+
+def update(connection, job_id: str, **fields) -> None:
+    """Merge `fields` into the job's record and push its expiry out. Best effort: never fails the job."""
+    if connection is None or not job_id:
+        return
+    values = {k: str(v) for k, v in fields.items() if v is not None}
+    pipe = connection.pipeline(transaction=False)
+    if values:
+        pipe.hset(status_key(job_id), mapping=values)
+    pipe.expire(status_key(job_id), STATUS_TTL)
+    try:
+        pipe.execute()
+    except redis.RedisError:
+        pass
+
+
+def mark_queued(connection, job_id: str, symbol: str) -> None:
+    update(connection, job_id, status="queued", stage="queued", symbol=symbol, enqueued_at=round(time.time(), 3))
+
+
+def enqueue(queue, func, *args, symbol: str | None = None, meta: dict | None = None):
+    """Write the job's queued record under a pre-generated id, then enqueue it with that id."""
+    job_id = str(uuid.uuid4())
+    mark_queued(queue.connection, job_id, symbol)
+    return queue.enqueue(func, *args, job_id=job_id, meta=meta, **enqueue_options())
+
+
+def on_job_failure(job, connection, exc_type, exc_value, tb):
+    """RQ on_failure callback: covers failures outside the collectors, e.g. job timeouts."""
+    update(connection, job.id, status="failed", stage="done", error=exc_type.__name__, ended_at=round(time.time(), 3))
+
+
+def _decode(raw: dict) -> dict:
+    out = {}
+    for k, v in raw.items():
+        k = k.decode() if isinstance(k, bytes) else k
+        v = v.decode() if isinstance(v, bytes) else v
+        if _INT_FIELDS.search(k):
+            v = int(v)
+        elif k in _FLOAT_FIELDS:
+            v = float(v)
+        elif k == "has_profile":
+            v = v == "1"
+        out[k] = v
+    return out
+
+
+def read(connection, job_id: str) -> dict | None:
+    raw = connection.hgetall(status_key(job_id))
+    return _decode(raw) if raw else None
+
+
+def read_many(connection, job_ids: list[str]) -> dict[str, dict | None]:
+    pipe = connection.pipeline(transaction=False)
+    for job_id in job_ids:
+        pipe.hgetall(status_key(job_id))
+    return {job_id: _decode(raw) if raw else None for job_id, raw in zip(job_ids, pipe.execute())}
@@ -0,0 +1,138 @@
+# src/mentions.py
+import base64
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, tuple_
+
+from .models import SocialMention
+from .monitoring import track_query
+
+# Same thresholds the report uses for its buckets.
+POSITIVE_THRESHOLD = 0.2
+NEGATIVE_THRESHOLD = -0.2
+
+BUCKETS = ("pos", "neu", "neg")
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+
+def sentiment_bucket(score: float | None) -> str:
+    """Map a VADER compound score to pos / neu / neg (missing scores count as neutral)."""
+    if score is None:
+        return "neu"
+    if score >= POSITIVE_THRESHOLD:
+        return "pos"
+    if score <= NEGATIVE_THRESHOLD:
+        return "neg"
+    return "neu"
+
+
+def parse_timestamp(value: str | None) -> datetime | None:
+    """
+    Parse an ISO-8601 timestamp from a query string into naive UTC
+    (the way created_at is stored). Returns None for empty input.
+    """
+    value = (value or "").strip()
+    if not value:
+        return None
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is not None:
+        dt = (dt - dt.utcoffset()).replace(tzinfo=None)
+    return dt
+
+
+def encode_cursor(created_at: datetime, mention_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{mention_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Inverse of encode_cursor; raises ValueError on anything malformed."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        ts, mention_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(mention_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def bucket_filter(bucket: str):
+    col = SocialMention.sentiment
+    if bucket == "pos":
+        return col >= POSITIVE_THRESHOLD
+    if bucket == "neg":
+        return col <= NEGATIVE_THRESHOLD
+    return or_(
+        col.is_(None),
+        (col > NEGATIVE_THRESHOLD) & (col < POSITIVE_THRESHOLD),
+    )
+
+
+def mentions_page(
+    session,
+    symbol: str,
+    *,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    bucket: str | None = None,
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    platform: str = "news",
+) -> tuple[list[SocialMention], str | None]:
+    """
+    One page of mentions for a symbol, newest first.
+
+    Uses keyset pagination on (created_at, id): the cursor is the last row of
+    the previous page, so page N costs the same index range scan as page 1
+    instead of an OFFSET that grows with depth.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if since is None:
+        since = datetime.utcnow() - timedelta(days=1)
+
+    q = (
+        session.query(SocialMention)
+        .filter(SocialMention.platform == platform)
+        .filter(SocialMention.symbol == symbol)
+        .filter(SocialMention.created_at >= since)
+    )
+    if until is not None:
+        q = q.filter(SocialMention.created_at < until)
+    if bucket:
+        q = q.filter(bucket_filter(bucket))
+    if cursor:
+        c_ts, c_id = decode_cursor(cursor)
+        q = q.filter(tuple_(SocialMention.created_at, SocialMention.id) < tuple_(c_ts, c_id))
+
+    # fetch one extra row to know whether another page exists
+    with track_query("mentions_page"):
+        rows = (
+            q.order_by(SocialMention.created_at.desc(), SocialMention.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
+
+
+def mention_to_dict(m: SocialMention) -> dict:
+    return {
+        "id": m.id,
+        "created_at": m.created_at.isoformat(),
+        "symbol": m.symbol,
+        "source": m.source,
+        "text": m.text,
+        "url": m.url,
+        "sentiment": m.sentiment,
+        "bucket": sentiment_bucket(m.sentiment),
+    }
@@ -1,28 +1,69 @@
 from datetime import datetime
 from .db import db
 
+# compact ids for StockQuote.source_id / StockQuoteDaily.source_id
+QUOTE_SOURCES = {"stooq": 1}
+
+
 class StockQuote(db.Model):
+    """
+    Intraday quote snapshots, one row per (symbol, market timestamp). Polling
+    the same snapshot again upserts instead of adding a row (src/quotes.py);
+    rows older than QUOTE_INTRADAY_DAYS are folded into stock_quotes_daily.
+    """
     __tablename__ = "stock_quotes"
+    __table_args__ = (
+        # upsert target; also serves latest-quote lookups per symbol
+        db.UniqueConstraint("symbol", "market_ts", name="uq_stock_quotes_symbol_market_ts"),
+        # incremental export watermark (scripts/export.py)
+        db.Index("ix_stock_quotes_fetched_at", "fetched_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    symbol = db.Column(db.String(16), nullable=False, index=True)
-    fetched_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    symbol = db.Column(db.String(16), nullable=False)
+    market_ts = db.Column(db.DateTime, nullable=False)        # quote time reported by the source (UTC)
+    fetched_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)  # last poll that changed it
+
+    # Basic OHLCV fields (Stooq reports the session so far: cumulative high/low/volume)
+    open = db.Column(db.Float, nullable=True)
+    high = db.Column(db.Float, nullable=True)
+    low = db.Column(db.Float, nullable=True)
+    close = db.Column(db.Float, nullable=True)
+    volume = db.Column(db.BigInteger, nullable=True)
+
+    source_id = db.Column(db.SmallInteger, nullable=False, default=QUOTE_SOURCES["stooq"])
+
+class StockQuoteDaily(db.Model):
+    """One OHLCV bar per symbol and UTC day, downsampled from stock_quotes."""
+    __tablename__ = "stock_quotes_daily"
+
+    symbol = db.Column(db.String(16), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    market_ts = db.Column(db.DateTime, nullable=False)        # last snapshot folded into the bar
 
-    # Basic OHLCV fields
     open = db.Column(db.Float, nullable=True)
     high = db.Column(db.Float, nullable=True)
     low = db.Column(db.Float, nullable=True)
     close = db.Column(db.Float, nullable=True)
-    volume = db.Column(db.Integer, nullable=True)
+    volume = db.Column(db.BigInteger, nullable=True)
+    samples = db.Column(db.Integer, nullable=False, default=0)
 
-    source = db.Column(db.String(64), nullable=False, default="stooq")
+    source_id = db.Column(db.SmallInteger, nullable=False, default=QUOTE_SOURCES["stooq"])
 
 class SocialMention(db.Model):
     __tablename__ = "social_mentions"
+    __table_args__ = (
+        # serves the feed / report: filter on (platform, symbol), keyset on (created_at, id)
+        db.Index("ix_social_mentions_feed", "platform", "symbol", "created_at", "id"),
+        # min(created_at) for rollup refreshes and retention, without a scan of every partition
+        db.Index("ix_social_mentions_created_at", "created_at"),
+        # incremental export watermark (scripts/export.py)
+        db.Index("ix_social_mentions_fetched_at", "fetched_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    platform = db.Column(db.String(20), nullable=False)      # "reddit" or "x"
-    source = db.Column(db.String(120), nullable=True)        # subreddit name or account name
+    platform = db.Column(db.String(20), nullable=False)      # "news", "reddit" or "x"
+    source = db.Column(db.String(120), nullable=True)        # "gdelt", feed host, subreddit or account name
     symbol = db.Column(db.String(32), nullable=False)         # canonical ticker (e.g., AAPL)
     created_at = db.Column(db.DateTime, nullable=False)       # post/comment time (UTC)
     fetched_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
@@ -30,4 +71,46 @@ class SocialMention(db.Model):
     text = db.Column(db.Text, nullable=False)
     url = db.Column(db.Text, nullable=True)
 
-    sentiment = db.Column(db.Float, nullable=True)           # VADER compound [-1, 1]
\ No newline at end of file
+    sentiment = db.Column(db.Float, nullable=True)           # VADER compound [-1, 1]
+    # id of the first row of this near-duplicate cluster; NULL when the row is the first (src/clustering.py)
+    cluster_id = db.Column(db.Integer, nullable=True)
+
+class MentionRollup(db.Model):
+    """Hourly per-symbol aggregate of social_mentions, maintained by scripts/rollup_mentions.py."""
+    __tablename__ = "mention_rollups_hourly"
+
+    platform = db.Column(db.String(20), primary_key=True)
+    symbol = db.Column(db.String(32), primary_key=True)
+    bucket_start = db.Column(db.DateTime, primary_key=True)  # UTC-naive, truncated to the hour
+
+    count = db.Column(db.Integer, nullable=False, default=0)
+    sentiment_sum = db.Column(db.Float, nullable=False, default=0.0)
+    sentiment_count = db.Column(db.Integer, nullable=False, default=0)  # rows with a score
+
+class RollupWatermark(db.Model):
+    """How far a rollup is final: every hour before rolled_until is complete and won't change."""
+    __tablename__ = "rollup_watermarks"
+
+    name = db.Column(db.String(64), primary_key=True)      # the rollup table, e.g. "mention_rollups_hourly"
+    rolled_until = db.Column(db.DateTime, nullable=False)   # UTC-naive hour boundary
+
+class SocialMentionArchive(db.Model):
+    """
+    Raw mentions past the retention window when social_mentions is not
+    partitioned (SQLite, or a Postgres schema built without migrations).
+    Same columns as social_mentions; see src/partitions.py.
+    """
+    __tablename__ = "social_mentions_archive"
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    platform = db.Column(db.String(20), nullable=False)
+    source = db.Column(db.String(120), nullable=True)
+    symbol = db.Column(db.String(32), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, index=True)
+    fetched_at = db.Column(db.DateTime, nullable=False)
+
+    text = db.Column(db.Text, nullable=False)
+    url = db.Column(db.Text, nullable=True)
+
+    sentiment = db.Column(db.Float, nullable=True)
+    cluster_id = db.Column(db.Integer, nullable=True)
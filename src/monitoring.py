@@ -1,18 +1,260 @@
 # src/monitoring.py
-from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST
+"""
+All Prometheus metrics live here so web workers, the RQ worker and the
+collector scripts share one set of names.
+
+Set PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does it by default) and every
+process on the dyno writes its samples there; /metrics then aggregates them.
+The RQ worker keeps its own directory and has no /metrics of its own, so
+export_worker_metrics() serves it on WORKER_METRICS_PORT and/or pushes it
+to a Pushgateway.
+Labels are kept low-cardinality: routes are the URL rule template
+("/api/job/<job_id>"), never the raw path.
+"""
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    push_to_gateway,
+    start_http_server,
+)
 
 REQUEST_COUNT = Counter(
     "http_requests_total",
     "Total HTTP requests",
-    ["method", "path", "status"],
+    ["method", "route", "status"],
 )
 
 REQUEST_LATENCY = Histogram(
     "http_request_duration_seconds",
     "Request latency in seconds",
-    ["method", "path"],
+    ["method", "route"],
+)
+
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds",
+    "Outbound HTTP latency by provider and status (status=error for transport failures)",
+    ["provider", "status"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 15, 30),
+)
+
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "SQL time per named query",
+    ["query"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time to get a usable pooled connection (queue wait + connect + pre-ping)",
+    ["role"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections",
+    "Pooled connections currently in use (divide by capacity for saturation)",
+    ["role"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_CAPACITY = Gauge(
+    "db_pool_capacity_connections",
+    "pool_size + max_overflow, summed over live processes",
+    ["role"],
+    multiprocess_mode="livesum",
+)
+
+DB_POOL_TIMEOUTS = Counter(
+    "db_pool_timeouts_total",
+    "Checkouts that gave up after pool_timeout",
+    ["role"],
 )
 
+DB_REPLICA_LAG_SECONDS = Gauge(
+    "db_replica_lag_seconds",
+    "Replay lag of the read replica as last measured (-1 = unreachable)",
+    multiprocess_mode="livemax",
+)
+
+DB_READS = Counter(
+    "db_routed_reads_total",
+    "Read-only requests by the database they were served from and why",
+    ["target", "reason"],
+)
+
+RQ_QUEUE_DEPTH = Gauge(
+    "rq_queue_depth",
+    "Jobs waiting per priority queue (queued in RQ, or held back for fairness)",
+    ["queue", "state"],
+    multiprocess_mode="mostrecent",
+)
+
+RQ_QUEUE_WAIT = Histogram(
+    "rq_queue_wait_seconds",
+    "Time from enqueue to a worker starting the job",
+    ["queue"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600),
+)
+
+CIRCUIT_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state: 0 closed, 1 half-open, 2 open",
+    ["breaker"],
+    multiprocess_mode="livemax",
+)
+
+CIRCUIT_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes, by the state entered",
+    ["breaker", "state"],
+)
+
+UPSTREAM_REJECTED = Counter(
+    "upstream_requests_rejected_total",
+    "Outbound calls skipped because the provider's circuit breaker was open",
+    ["provider"],
+)
+
+SENTIMENT_SCORED = Counter(
+    "sentiment_scored_total",
+    "Texts scored with VADER",
+)
+
+SENTIMENT_SECONDS = Counter(
+    "sentiment_scoring_seconds_total",
+    "Time spent in VADER scoring (rate(scored)/rate(seconds) = texts/sec)",
+)
+
+INGEST_ROWS = Counter(
+    "collector_rows_total",
+    "Rows seen by collectors by outcome (inserted, duplicate, stale, invalid)",
+    ["collector", "outcome"],
+)
+
+COLLECTOR_RUNS = Histogram(
+    "collector_run_duration_seconds",
+    "Wall time of one collector run",
+    ["collector", "status"],
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300),
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@contextmanager
+def track_query(name: str):
+    """Time a named SQL query (or short group of statements) into db_query_duration_seconds."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        DB_QUERY_LATENCY.labels(name).observe(time.perf_counter() - t0)
+
+
+@contextmanager
+def track_collector_run(collector: str):
+    t0 = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        COLLECTOR_RUNS.labels(collector, status).observe(time.perf_counter() - t0)
+
+
+def count_rows(collector: str, **outcomes: int):
+    for outcome, n in outcomes.items():
+        if n:
+            INGEST_ROWS.labels(collector, outcome).inc(n)
+
+
+def _route_label() -> str:
+    from flask import request
+
+    rule = request.url_rule
+    return rule.rule if rule is not None else UNMATCHED_ROUTE
+
+
+def init_app(app):
+    """Register request timing hooks labelled by route template."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_timer():
+        g.start_time = time.perf_counter()
+
+    @app.after_request
+    def _record(response):
+        try:
+            route = _route_label()
+            REQUEST_COUNT.labels(request.method, route, str(response.status_code)).inc()
+            REQUEST_LATENCY.labels(request.method, route).observe(time.perf_counter() - g.start_time)
+        except Exception:
+            pass
+        return response
+
+
+def aggregate_registry():
+    """Every process writing to PROMETHEUS_MULTIPROC_DIR when it is set, else just this one."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
 def metrics_response():
-    data = generate_latest()
-    return data, 200, {"Content-Type": CONTENT_TYPE_LATEST}
\ No newline at end of file
+    data = generate_latest(aggregate_registry())
+    return data, 200, {"Content-Type": CONTENT_TYPE_LATEST}
+
+
+def _push_loop(url: str, interval: float, grouping_key: dict) -> None:
+    while True:
+        try:
+            push_to_gateway(url, job="sentiment-scraper-worker", registry=aggregate_registry(),
+                            grouping_key=grouping_key)
+        except Exception:
+            traceback.print_exc()  # the next push may well work; jobs must not care
+        time.sleep(interval)
+
+
+def export_worker_metrics() -> dict:
+    """
+    Make the worker's metrics reachable. Call once in the worker's main
+    process before it forks:
+      WORKER_METRICS_PORT           serve them over HTTP (default 9200, 0 = off)
+      PROMETHEUS_PUSHGATEWAY_URL    push them every WORKER_METRICS_PUSH_SECONDS
+                                    (default 15); for hosts that take no inbound
+                                    traffic, such as Heroku worker dynos
+    """
+    exported = {}
+    port = int(os.getenv("WORKER_METRICS_PORT", "9200"))
+    if port:
+        start_http_server(port, registry=aggregate_registry())
+        exported["port"] = port
+    url = os.getenv("PROMETHEUS_PUSHGATEWAY_URL")
+    if url:
+        interval = float(os.getenv("WORKER_METRICS_PUSH_SECONDS", "15"))
+        instance = os.getenv("DYNO") or socket.gethostname()
+        threading.Thread(
+            target=_push_loop, args=(url, interval, {"instance": instance}), name="metrics-push", daemon=True,
+        ).start()
+        exported["pushgateway"] = url
+    return exported
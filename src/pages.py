@@ -355,12 +355,14 @@ def report_page_html(
     price_str: str,
     count: int,
     avg_str: str,
+    count_label: str = "News mentions",
     sentiment_text: str,
     pos: int,
     neu: int,
     neg: int,
     hour_rows: str,
     rows: str,
+    next_cursor: str = "",
 ) -> str:
     # derive a CSS class for the sentiment badge
     badge_class = "neutral"
@@ -660,7 +662,7 @@ def report_page_html(
             <div class="sub">From Stooq</div>
           </div>
           <div class="kpi">
-            <div class="label">News mentions</div>
+            <div class="label">{count_label}</div>
             <div class="val">{count}</div>
             <div class="sub">GDELT (24h)</div>
           </div>
@@ -701,13 +703,16 @@ def report_page_html(
       <div class="card">
         <div class="hd">
           <h2>Recent headlines</h2>
-          <div class="muted">top 25</div>
+          <div class="muted">newest first</div>
         </div>
         <div class="bd" style="padding:0;">
-          <table>
+          <table id="headlines">
             <tr><th style="width:160px;">Time (UTC)</th><th style="width:110px;">Sentiment</th><th>Headline</th></tr>
             {rows if rows else '<tr><td class="muted">—</td><td class="muted">NA</td><td class="muted">No headlines stored yet. Click “Collect latest”.</td></tr>'}
           </table>
+          <div id="headlines-more" class="muted" data-cursor="{next_cursor}" style="padding:12px; font-size:13px;">
+            {"Loading more…" if next_cursor else ""}
+          </div>
         </div>
       </div>
     </div>
@@ -762,6 +767,65 @@ def report_page_html(
     }}
 
     btn.addEventListener("click", collectAndRefresh);
+
+    // Infinite scroll: page through /api/mentions with the keyset cursor.
+    const table = document.getElementById("headlines");
+    const more = document.getElementById("headlines-more");
+    let loadingMore = false;
+
+    function fmtTime(iso) {{
+        return iso.replace("T", " ");
+    }}
+
+    async function loadMore() {{
+        const cursor = more.dataset.cursor;
+        if (!cursor || loadingMore) return;
+        loadingMore = true;
+
+        try {{
+        const params = new URLSearchParams({{ symbol: btn.dataset.symbol, cursor }});
+        const res = await fetch(`/api/mentions?${{params}}`);
+        if (!res.ok) throw new Error("bad status");
+        const data = await res.json();
+
+        for (const m of data.items) {{
+            const tr = document.createElement("tr");
+            const tdTime = document.createElement("td");
+            tdTime.textContent = fmtTime(m.created_at);
+            const tdSent = document.createElement("td");
+            tdSent.textContent = m.sentiment === null ? "NA" : m.sentiment.toFixed(3);
+            const tdHead = document.createElement("td");
+            const a = document.createElement("a");
+            a.href = m.url || "#";
+            a.target = "_blank";
+            a.rel = "noopener noreferrer";
+            a.textContent = m.text;
+            tdHead.appendChild(a);
+            tr.append(tdTime, tdSent, tdHead);
+            table.appendChild(tr);
+        }}
+
+        more.dataset.cursor = data.next_cursor || "";
+        if (!data.next_cursor) {{
+            more.textContent = "";
+            observer.disconnect();
+        }} else {{
+            // re-arm so a sentinel that is still on screen fires again
+            observer.unobserve(more);
+            observer.observe(more);
+        }}
+        }} catch (err) {{
+        more.textContent = "Could not load more headlines.";
+        more.dataset.cursor = "";
+        }} finally {{
+        loadingMore = false;
+        }}
+    }}
+
+    const observer = new IntersectionObserver((entries) => {{
+        if (entries.some((e) => e.isIntersecting)) loadMore();
+    }}, {{ rootMargin: "200px" }});
+    if (more.dataset.cursor) observer.observe(more);
     </script>
 </body>
 </html>
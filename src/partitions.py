@@ -0,0 +1,233 @@
+# src/partitions.py
+"""
+Partition maintenance and retention for social_mentions.
+
+On Postgres the table is RANGE-partitioned on created_at (see migration
+8d2e6c4a1f73). ensure_partitions() keeps MENTION_PARTITIONS_AHEAD future
+partitions in place and gives rows that landed in the DEFAULT partition
+(backfills, clock skew) a proper partition. Every hot-window query filters
+on created_at, so the planner prunes it to the last one or two partitions.
+
+apply_retention() removes raw mentions older than MENTION_RETENTION_DAYS:
+  rollup  (default) fold them into mention_rollups_hourly first, so time
+          series and analytics keep working over the removed range
+  drop    just remove them
+Partitioned tables lose whole partitions (DETACH + DROP, no vacuum debt).
+Elsewhere (SQLite, or Postgres built with create_all) the rows move to
+social_mentions_archive.
+
+Settings: MENTION_PARTITION_INTERVAL (day|month, default month),
+MENTION_PARTITIONS_AHEAD (3), MENTION_RETENTION_DAYS (0 = keep everything),
+MENTION_RETENTION_MODE (rollup|drop).
+"""
+import os
+import re
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, insert, select, text
+
+from .models import MentionRollup, SocialMention, SocialMentionArchive
+from .monitoring import track_query
+from .rollups import advance_watermark, as_datetime, refresh_hourly_rollups
+
+PARENT = "social_mentions"
+DEFAULT_PARTITION = "social_mentions_default"
+
+INTERVALS = ("day", "month")
+RETENTION_MODES = ("rollup", "drop")
+
+_BOUND_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def partition_interval() -> str:
+    interval = os.getenv("MENTION_PARTITION_INTERVAL", "month").strip().lower()
+    return interval if interval in INTERVALS else "month"
+
+
+def period_start(dt: datetime, interval: str) -> datetime:
+    day = dt.replace(hour=0, minute=0, second=0, microsecond=0)
+    return day if interval == "day" else day.replace(day=1)
+
+
+def next_period(start: datetime, interval: str) -> datetime:
+    if interval == "day":
+        return start + timedelta(days=1)
+    return start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+
+
+def partition_name(start: datetime, interval: str) -> str:
+    # matches the names the migration creates for monthly partitions
+    if interval == "day":
+        return f"{PARENT}_y{start:%Y}m{start:%m}d{start:%d}"
+    return f"{PARENT}_y{start:%Y}m{start:%m}"
+
+
+def is_partitioned(session) -> bool:
+    if session.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(session.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :parent AND pg_table_is_visible(c.oid))"
+    ), {"parent": PARENT}).scalar())
+
+
+def list_partitions(session) -> list[tuple[str, datetime, datetime]]:
+    """(name, lower, upper) of each range partition, oldest first; the DEFAULT partition is left out."""
+    rows = session.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+        "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :parent"
+    ), {"parent": PARENT}).all()
+    out = []
+    for name, bound in rows:
+        m = _BOUND_RE.search(bound or "")
+        if m:
+            out.append((name, datetime.fromisoformat(m.group(1)), datetime.fromisoformat(m.group(2))))
+    return sorted(out, key=lambda p: p[1])
+
+
+def _quote(session, name: str) -> str:
+    return session.get_bind().dialect.identifier_preparer.quote(name)
+
+
+def _stored_columns(session) -> list[str]:
+    """The parent's columns in table order, minus generated ones."""
+    return session.execute(text(
+        "SELECT attname FROM pg_attribute WHERE attrelid = CAST(:parent AS regclass) "
+        "AND attnum > 0 AND NOT attisdropped AND attgenerated = '' ORDER BY attnum"
+    ), {"parent": PARENT}).scalars().all()
+
+
+def _create_partition(session, name: str, lo: datetime, hi: datetime) -> None:
+    table = _quote(session, name)
+    bounds = f"FOR VALUES FROM ('{lo.isoformat(' ')}') TO ('{hi.isoformat(' ')}')"
+    params = {"lo": lo, "hi": hi}
+    stranded = session.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created_at >= :lo AND created_at < :hi)"
+    ), params).scalar()
+    if not stranded:
+        session.execute(text(f"CREATE TABLE {table} PARTITION OF {PARENT} {bounds}"))
+        return
+    # Postgres refuses a new partition while the DEFAULT partition holds rows
+    # for its range, so build it standalone, move those rows over, then attach.
+    # Generated columns (search_vector) must stay generated for ATTACH to
+    # accept the table, and can't be inserted into, so they're left out of the copy.
+    session.execute(text(
+        f"CREATE TABLE {table} (LIKE {PARENT} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING GENERATED)"
+    ))
+    columns = ", ".join(_quote(session, c) for c in _stored_columns(session))
+    session.execute(text(
+        f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {DEFAULT_PARTITION} "
+        "WHERE created_at >= :lo AND created_at < :hi"
+    ), params)
+    session.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= :lo AND created_at < :hi"), params)
+    session.execute(text(f"ALTER TABLE {PARENT} ATTACH PARTITION {table} {bounds}"))
+
+
+def ensure_partitions(
+    session,
+    now: datetime | None = None,
+    interval: str | None = None,
+    ahead: int | None = None,
+) -> list[str]:
+    """Create missing partitions for this period, `ahead` more, and any period stuck in DEFAULT."""
+    if not is_partitioned(session):
+        return []
+    now = now or datetime.utcnow()
+    interval = interval or partition_interval()
+    ahead = int(os.getenv("MENTION_PARTITIONS_AHEAD", "3")) if ahead is None else ahead
+
+    wanted = []
+    start = period_start(now, interval)
+    for _ in range(ahead + 1):
+        wanted.append(start)
+        start = next_period(start, interval)
+    with track_query("partitions_default_periods"):
+        stranded = session.execute(text(
+            f"SELECT DISTINCT date_trunc('{interval}', created_at) FROM {DEFAULT_PARTITION}"
+        )).scalars().all()
+    wanted.extend(stranded)
+
+    existing = list_partitions(session)
+    created = []
+    for lo in sorted(set(wanted)):
+        hi = next_period(lo, interval)
+        # a daily partition inside an existing monthly one (or vice versa) is already covered
+        if any(lo < e_hi and e_lo < hi for _, e_lo, e_hi in existing):
+            continue
+        name = partition_name(lo, interval)
+        with track_query("partition_create"):
+            _create_partition(session, name, lo, hi)
+        existing.append((name, lo, hi))
+        created.append(name)
+    session.commit()
+    return created
+
+
+def _shared_columns():
+    names = set(SocialMentionArchive.__table__.columns.keys())
+    return [c for c in SocialMention.__table__.columns if c.key in names]
+
+
+def apply_retention(
+    session,
+    now: datetime | None = None,
+    days: int | None = None,
+    mode: str | None = None,
+) -> dict:
+    """Remove (and by default roll up) raw mentions older than `days`. Returns what was done."""
+    days = int(os.getenv("MENTION_RETENTION_DAYS", "0")) if days is None else days
+    mode = (mode or os.getenv("MENTION_RETENTION_MODE", "rollup")).strip().lower()
+    if mode not in RETENTION_MODES:
+        raise ValueError(f"retention mode must be one of {', '.join(RETENTION_MODES)}")
+    result = {"retention_days": days, "mode": mode, "horizon": None, "rolled_up": 0,
+              "dropped_partitions": [], "removed_rows": 0, "archived_rows": 0}
+    if days <= 0:
+        return result
+
+    now = now or datetime.utcnow()
+    horizon = period_start(now - timedelta(days=days), "day")
+    result["horizon"] = horizon.isoformat()
+
+    # one probe of ix_social_mentions_created_at (per partition on Postgres)
+    oldest = session.execute(select(func.min(SocialMention.created_at))).scalar()
+    if oldest is None or as_datetime(oldest) >= horizon:
+        return result
+
+    if mode == "rollup":
+        # roll up to wherever the existing rollup starts too, so the range
+        # timeseries reads from mention_rollups_hourly stays gap-free
+        first_rolled = session.execute(select(func.min(MentionRollup.bucket_start))).scalar()
+        until = max(horizon, as_datetime(first_rolled)) if first_rolled is not None else horizon
+        with track_query("retention_rollup"):
+            result["rolled_up"] = refresh_hourly_rollups(session, oldest, until)
+        # the raw rows are about to go, so these hours can't change any more
+        advance_watermark(session, horizon)
+
+    if is_partitioned(session):
+        for name, _, hi in list_partitions(session):
+            if hi <= horizon:
+                table = _quote(session, name)
+                with track_query("partition_drop"):
+                    session.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {table}"))
+                    session.execute(text(f"DROP TABLE {table}"))
+                result["dropped_partitions"].append(name)
+        with track_query("retention_default_delete"):
+            result["removed_rows"] = session.execute(
+                text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created_at < :horizon"), {"horizon": horizon}
+            ).rowcount
+    else:
+        cols = _shared_columns()
+        archive = SocialMentionArchive.__table__
+        with track_query("retention_archive"):
+            result["archived_rows"] = session.execute(
+                insert(archive).from_select(
+                    [archive.c[c.key] for c in cols],
+                    select(*cols).where(SocialMention.created_at < horizon),
+                )
+            ).rowcount
+            result["removed_rows"] = session.execute(
+                delete(SocialMention).where(SocialMention.created_at < horizon)
+            ).rowcount
+    session.commit()
+    return result
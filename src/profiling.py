@@ -0,0 +1,219 @@
+# src/profiling.py
+"""
+Low-overhead sampling profiler with flamegraph-compatible output.
+
+A background OS thread walks sys._current_frames() every `interval` seconds
+and counts each stack; nothing is hooked into the profiled code, so the cost
+is one stack walk per thread per sample and zero when no profile is running.
+Output is the collapsed format ("thread;outer;inner count" per line) read by
+flamegraph.pl, speedscope and inferno.
+
+Both entry points are off unless configured:
+  PROFILE_TOKEN         enables /debug/profile; callers send it as a Bearer token
+  PROFILE_MAX_SECONDS   longest allowed /debug/profile run (default 60), capped
+                        TIMEOUT_HEADROOM seconds below gunicorn's WEB_TIMEOUT
+  PROFILE_JOBS          fraction of run_collectors_task jobs to profile (0 = off, 1 = all)
+
+Under gevent only the greenlet running at sample time is visible per thread,
+which is still the one burning CPU. A sync worker serves one request per
+process, so /debug/profile there would only see itself and refuses to run.
+"""
+import _thread
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from .serving import gevent_active
+
+DEFAULT_INTERVAL = 0.01
+MIN_INTERVAL = 0.001
+TIMEOUT_HEADROOM = 5
+# past WEB_TIMEOUT gunicorn kills a sync worker mid-profile
+MAX_SECONDS = min(
+    float(os.getenv("PROFILE_MAX_SECONDS", "60")),
+    float(os.getenv("WEB_TIMEOUT", "30")) - TIMEOUT_HEADROOM,
+)
+
+# one on-demand profile per process at a time
+_busy = threading.Lock()
+
+
+def _real_thread_primitives():
+    """(start_new_thread, allocate_lock, sleep, get_ident) that stay OS-level under gevent."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        monkey = None
+    if monkey is not None and monkey.is_module_patched("threading"):
+        return (
+            monkey.get_original("_thread", "start_new_thread"),
+            monkey.get_original("_thread", "allocate_lock"),
+            monkey.get_original("time", "sleep"),
+            monkey.get_original("_thread", "get_ident"),
+        )
+    return _thread.start_new_thread, _thread.allocate_lock, time.sleep, _thread.get_ident
+
+
+class SamplingProfiler:
+    def __init__(self, interval: float = DEFAULT_INTERVAL, exclude_threads: set[int] | None = None):
+        self.interval = max(MIN_INTERVAL, interval)
+        self.exclude = set(exclude_threads or ())
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._labels: dict = {}
+        self._running = False
+        self._done = None
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            for prefix in sys.path:
+                if prefix and filename.startswith(prefix):
+                    filename = filename[len(prefix):].lstrip(os.sep)
+                    break
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _sample(self, own_ident: int) -> None:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident or ident in self.exclude:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(ident, f"thread-{ident}").replace(";", ":").replace(" ", "_"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        _, _, sleep, get_ident = _real_thread_primitives()
+        own = get_ident()
+        try:
+            while self._running:
+                self._sample(own)
+                sleep(self.interval)
+        finally:
+            self._done.release()
+
+    def start(self) -> "SamplingProfiler":
+        start_new_thread, allocate_lock, _, _ = _real_thread_primitives()
+        # held by the sampler thread until it exits
+        self._done = allocate_lock()
+        self._done.acquire()
+        self._running = True
+        start_new_thread(self._run, ())
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._running = False
+        if self._done is not None:
+            self._done.acquire(timeout=5)
+        return self
+
+    def collapsed(self, prefix: str | None = None) -> str:
+        lead = f"{prefix};" if prefix else ""
+        return "".join(f"{lead}{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+
+def profile_for(seconds: float, interval: float = DEFAULT_INTERVAL, exclude_threads: set[int] | None = None) -> SamplingProfiler | None:
+    """
+    Sample every thread in this process for `seconds`. Returns None if another
+    profile is already running here.
+    """
+    if not _busy.acquire(blocking=False):
+        return None
+    try:
+        profiler = SamplingProfiler(interval, exclude_threads).start()
+        try:
+            # cooperative under gevent, so the worker keeps serving while we watch
+            time.sleep(seconds)
+        finally:
+            profiler.stop()
+        return profiler
+    finally:
+        _busy.release()
+
+
+def jobs_enabled() -> bool:
+    """Roll PROFILE_JOBS (a 0..1 sampling fraction) for one job."""
+    try:
+        rate = float(os.getenv("PROFILE_JOBS", "0") or 0)
+    except ValueError:
+        return False
+    return rate > 0 and random.random() < rate
+
+
+@contextmanager
+def profile_to_file(path: str | None, interval: float = DEFAULT_INTERVAL):
+    """Profile the block and write collapsed stacks to `path`; no-op when path is falsy."""
+    if not path:
+        yield None
+        return
+    profiler = SamplingProfiler(interval).start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        with open(path, "w") as f:
+            f.write(profiler.collapsed())
+
+
+def token_ok(header_value: str | None) -> bool:
+    expected = os.getenv("PROFILE_TOKEN")
+    if not expected or not header_value:
+        return False
+    scheme, _, supplied = header_value.partition(" ")
+    if scheme.lower() != "bearer":
+        return False
+    return hmac.compare_digest(supplied.strip().encode(), expected.encode())
+
+
+def init_app(app):
+    """Register /debug/profile. It 404s unless PROFILE_TOKEN is set, so it is safe to ship."""
+    from flask import Response, jsonify, request
+
+    @app.route("/debug/profile")
+    def debug_profile():
+        if not os.getenv("PROFILE_TOKEN"):
+            return jsonify({"error": "not found"}), 404
+        if not token_ok(request.headers.get("Authorization")):
+            return jsonify({"error": "unauthorized"}), 401, {"WWW-Authenticate": "Bearer"}
+
+        try:
+            seconds = float(request.args.get("seconds", "10"))
+            interval_ms = float(request.args.get("interval_ms", str(DEFAULT_INTERVAL * 1000)))
+        except ValueError:
+            return jsonify({"error": "seconds and interval_ms must be numbers"}), 400
+        if not 0 < seconds <= MAX_SECONDS:
+            return jsonify({"error": f"seconds must be in (0, {MAX_SECONDS:g}]"}), 400
+
+        # this request's own thread just sleeps; leave it out of the picture
+        # (under gevent it shares the OS thread with every other request)
+        exclude = set() if gevent_active() else {threading.get_ident()}
+        if not set(sys._current_frames()) - exclude:
+            return jsonify({
+                "error": "nothing to profile: this worker serves one request at a time (WEB_WORKER_CLASS=sync); "
+                         "run with WEB_WORKER_CLASS=gevent, or profile collector jobs with PROFILE_JOBS",
+            }), 409
+        profiler = profile_for(seconds, interval_ms / 1000.0, exclude_threads=exclude)
+        if profiler is None:
+            return jsonify({"error": "a profile is already running in this worker"}), 409
+
+        return Response(
+            profiler.collapsed(),
+            mimetype="text/plain",
+            headers={
+                "Content-Disposition": f'attachment; filename="profile-{os.getpid()}.collapsed"',
+                "X-Profile-Samples": str(profiler.samples),
+                "X-Profile-Pid": str(os.getpid()),
+            },
+        )
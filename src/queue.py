@@ -1,9 +1,44 @@
 # src/queue.py
+"""
+RQ queues by priority, plus round-robin fairness for bulk work.
+
+  interactive  "Collect latest" / "Track" clicks   <RQ_QUEUE_NAME>
+  scheduled    maintenance, watchlist refreshes     <RQ_QUEUE_NAME>:scheduled
+  backfill     bulk historical collection           <RQ_QUEUE_NAME>:backfill
+
+Workers listen on all three in that order, and RQ always dequeues from the
+first non-empty queue, so an interactive job waits for at most the jobs
+already running.
+
+Bulk callers use enqueue_fair(): items wait in one Redis list per tenant,
+and feed() moves them into the RQ queue one tenant at a time, keeping at
+most FAIR_QUEUE_DEPTH jobs queued. A 10k-symbol backfill therefore takes
+turns with a 5-symbol one instead of queueing in front of it. Workers call
+feed() before each dequeue.
+"""
+import json
 import os
+from datetime import datetime, timezone
+
 import redis
 from rq import Queue
 
-QUEUE_NAME = os.getenv("RQ_QUEUE_NAME", "sentiment-scraper")
+from .breaker import HALF_OPEN, CircuitBreaker
+from .monitoring import RQ_QUEUE_DEPTH, RQ_QUEUE_WAIT
+
+# RQ_QUEUE was the worker's name for the same setting; still honoured
+QUEUE_PREFIX = os.getenv("RQ_QUEUE_NAME") or os.getenv("RQ_QUEUE") or "sentiment-scraper"
+PRIORITIES = ("interactive", "scheduled", "backfill")
+FAIR_QUEUE_DEPTH = int(os.getenv("FAIR_QUEUE_DEPTH", "10"))
+DEFAULT_TIMEOUT = 300
+
+
+def queue_name(priority: str) -> str:
+    if priority not in PRIORITIES:
+        raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+    # interactive keeps the original name so jobs queued before the split still run
+    return QUEUE_PREFIX if priority == "interactive" else f"{QUEUE_PREFIX}:{priority}"
+
 
 def get_redis_url() -> str | None:
     # Heroku Redis normally sets REDIS_URL.
@@ -20,18 +55,202 @@ def get_redis_url() -> str | None:
     return "redis://localhost:6379/0"
 
 
+# repeated connect failures open this and web requests skip Redis until it recovers
+redis_breaker = CircuitBreaker(
+    "redis",
+    failure_threshold=int(os.getenv("REDIS_BREAKER_FAILURES", "3")),
+    reset_timeout=float(os.getenv("REDIS_BREAKER_RESET_SECONDS", "30")),
+)
+
+
+# what BlockingConnectionPool raises when no connection frees up within its timeout
+POOL_EXHAUSTED = "No connection available."
+
+
+class BreakerConnectionPool(redis.BlockingConnectionPool):
+    """
+    Pool that feeds connect outcomes to redis_breaker and fails fast while it
+    is open. When every connection is checked out, callers wait up to
+    REDIS_POOL_TIMEOUT for one; running out means the process is busy, not
+    that Redis is down, so it doesn't count against the breaker.
+    """
+
+    def get_connection(self, *args, **kwargs):
+        if not redis_breaker.allow():
+            raise redis.ConnectionError("Redis circuit breaker is open")
+        trial = redis_breaker.state == HALF_OPEN
+        try:
+            conn = super().get_connection(*args, **kwargs)
+        except redis.ConnectionError as exc:
+            if str(exc) != POOL_EXHAUSTED or trial:
+                redis_breaker.record_failure()
+            raise
+        except redis.TimeoutError:
+            redis_breaker.record_failure()
+            raise
+        except BaseException:
+            if trial:
+                # the trial has to end one way or the other, or the breaker stays half-open
+                redis_breaker.record_failure()
+            raise
+        redis_breaker.record_success()
+        return conn
+
+
+_pool: BreakerConnectionPool | None = None
+
+
+def _reset_after_fork():
+    # forked children (RQ work horses, pool workers) build their own pool
+    global _pool
+    _pool = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def connection_pool() -> BreakerConnectionPool | None:
+    """The process-wide pool; None when Redis isn't configured."""
+    global _pool
+    if _pool is None:
+        url = get_redis_url()
+        if not url:
+            return None
+        options = {
+            "max_connections": int(os.getenv("REDIS_MAX_CONNECTIONS", "20")),
+            "timeout": float(os.getenv("REDIS_POOL_TIMEOUT", "0.5")),
+            "socket_connect_timeout": float(os.getenv("REDIS_CONNECT_TIMEOUT", "1")),
+            "socket_timeout": float(os.getenv("REDIS_SOCKET_TIMEOUT", "5")),
+            "socket_keepalive": True,
+            "health_check_interval": 30,
+        }
+        if url.startswith("rediss://"):
+            # Some hosted redis providers use self-signed certs (Heroku Redis does).
+            options["ssl_cert_reqs"] = None
+        _pool = BreakerConnectionPool.from_url(url, **options)
+    return _pool
+
+
 def get_redis_conn():
-    url = get_redis_url()
-    if not url:
+    """Client on the shared pool; None when Redis isn't configured or the breaker is open."""
+    pool = connection_pool()
+    if pool is None or redis_breaker.rejecting():
         return None
-
-    # Some hosted redis providers require TLS; this handles rediss:// URLs too.
-    # ssl_cert_reqs=None avoids cert issues in some setups.
-    return redis.from_url(url, ssl_cert_reqs=None)
+    return redis.Redis(connection_pool=pool)
 
 
-def get_queue() -> Queue | None:
-    conn = get_redis_conn()
+def get_queue(priority: str = "interactive", connection=None) -> Queue | None:
+    conn = connection or get_redis_conn()
     if not conn:
         return None
-    return Queue(QUEUE_NAME, connection=conn, default_timeout=300)
\ No newline at end of file
+    return Queue(queue_name(priority), connection=conn, default_timeout=DEFAULT_TIMEOUT)
+
+
+def get_queues(connection=None) -> list[Queue]:
+    """All queues, highest priority first (the order workers listen in)."""
+    conn = connection or get_redis_conn()
+    if not conn:
+        return []
+    return [get_queue(p, conn) for p in PRIORITIES]
+
+
+def _ring_key(queue: Queue) -> str:
+    return f"{queue.name}:fair:ring"
+
+
+def _members_key(queue: Queue) -> str:
+    return f"{queue.name}:fair:members"
+
+
+def _tenant_key(queue: Queue, tenant: str) -> str:
+    return f"{queue.name}:fair:tenant:{tenant}"
+
+
+def enqueue_fair(queue: Queue, func: str, items: list, tenant: str) -> int:
+    """
+    Queue `func(*args)` for each args tuple in `items` behind `tenant`'s
+    earlier items, then feed the queue. `func` is an import path such as
+    "src.tasks.run_collectors_task". Returns the tenant's backlog.
+    """
+    conn = queue.connection
+    key = _tenant_key(queue, tenant)
+    pipe = conn.pipeline()
+    for args in items:
+        pipe.rpush(key, json.dumps({"f": func, "args": list(args)}))
+    pipe.sadd(_members_key(queue), tenant)
+    *_, added = pipe.execute()
+    if added:
+        conn.rpush(_ring_key(queue), tenant)
+    feed(queue)
+    return conn.llen(key)
+
+
+def feed(queue: Queue, depth: int | None = None) -> int:
+    """Top `queue` up to `depth` jobs, taking one item per tenant in turn. Returns jobs enqueued."""
+    from . import jobstatus
+
+    conn = queue.connection
+    ring, members = _ring_key(queue), _members_key(queue)
+    room = (FAIR_QUEUE_DEPTH if depth is None else depth) - queue.count
+    moved = 0
+    while moved < room:
+        tenant = conn.lmove(ring, ring, "LEFT", "RIGHT")
+        if tenant is None:
+            break
+        tenant = tenant.decode() if isinstance(tenant, bytes) else tenant
+        raw = conn.lpop(_tenant_key(queue, tenant))
+        if raw is None:
+            conn.lrem(ring, 0, tenant)
+            conn.srem(members, tenant)
+            # enqueue_fair may have pushed between the pop and the removal
+            if conn.llen(_tenant_key(queue, tenant)) and conn.sadd(members, tenant):
+                conn.rpush(ring, tenant)
+            continue
+        item = json.loads(raw)
+        jobstatus.enqueue(
+            queue, item["f"], *item["args"],
+            symbol=item["args"][0] if item["args"] else None, meta={"tenant": tenant},
+        )
+        moved += 1
+    return moved
+
+
+def fair_backlog(queue: Queue) -> int:
+    conn = queue.connection
+    tenants = [t.decode() if isinstance(t, bytes) else t for t in conn.smembers(_members_key(queue))]
+    return sum(conn.llen(_tenant_key(queue, t)) for t in tenants)
+
+
+def observe_depths(connection=None) -> None:
+    """Set rq_queue_depth for every queue; called on /metrics scrapes."""
+    for priority, queue in zip(PRIORITIES, get_queues(connection)):
+        RQ_QUEUE_DEPTH.labels(priority, "queued").set(queue.count)
+        RQ_QUEUE_DEPTH.labels(priority, "fair_backlog").set(fair_backlog(queue))
+
+
+def _priority_of(name: str) -> str:
+    for p in PRIORITIES:
+        if queue_name(p) == name:
+            return p
+    return name
+
+
+class PriorityWorkerMixin:
+    """Feeds the fair queues before each dequeue and records how long each job waited."""
+
+    def dequeue_job_and_maintain_ttl(self, timeout, max_idle_time=None):
+        for queue in self.queues:
+            try:
+                feed(queue)
+            except redis.RedisError:
+                pass  # the dequeue below surfaces connection trouble
+        return super().dequeue_job_and_maintain_ttl(timeout, max_idle_time)
+
+    def perform_job(self, job, queue):
+        if job.enqueued_at is not None:
+            enqueued = job.enqueued_at
+            if enqueued.tzinfo is None:
+                enqueued = enqueued.replace(tzinfo=timezone.utc)
+            waited = (datetime.now(timezone.utc) - enqueued).total_seconds()
+            RQ_QUEUE_WAIT.labels(_priority_of(queue.name)).observe(max(waited, 0.0))
+        return super().perform_job(job, queue)
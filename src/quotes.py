@@ -0,0 +1,128 @@
+# src/quotes.py
+"""
+Quote storage: idempotent upserts of intraday snapshots and daily downsampling.
+
+stock_quotes holds one row per (symbol, market_ts). Stooq reports the
+session so far, so polling every minute between trades returns the same
+snapshot; the upsert turns those polls into no-ops instead of new rows.
+Snapshots older than QUOTE_INTRADAY_DAYS are folded into one
+stock_quotes_daily bar per symbol and UTC day and then deleted, so the
+intraday table stays bounded however often we poll.
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .models import StockQuote, StockQuoteDaily
+from .monitoring import track_query
+from .rollups import as_datetime, bucket_expr
+
+OHLCV = ("open", "high", "low", "close", "volume")
+
+
+def _insert(session, model):
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(model.__table__)
+
+
+def upsert_quote(session, row: dict) -> int:
+    """
+    Insert a snapshot, or refresh the OHLCV of the stored one with the same
+    (symbol, market_ts). Returns 1 when a row was written, 0 when an identical
+    snapshot was already stored. Does not commit.
+
+    A refresh also moves fetched_at, the incremental export's watermark
+    (scripts/export.py), so corrected quotes are exported again.
+    """
+    stmt = _insert(session, StockQuote).values(**row)
+    table = StockQuote.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["symbol", "market_ts"],
+        set_={**{c: stmt.excluded[c] for c in OHLCV if c in row}, "fetched_at": stmt.excluded.fetched_at},
+        # skip no-op updates so repeat polls report 0 and leave the row alone
+        where=or_(*(table.c[c].is_distinct_from(stmt.excluded[c]) for c in OHLCV if c in row)),
+    )
+    with track_query("quote_upsert"):
+        return session.execute(stmt).rowcount
+
+
+def intraday_cutoff(now: datetime | None = None, days: int | None = None) -> datetime | None:
+    """Start of the oldest UTC day kept intraday; None when QUOTE_INTRADAY_DAYS is 0 (keep all)."""
+    days = int(os.getenv("QUOTE_INTRADAY_DAYS", "7")) if days is None else days
+    if days <= 0:
+        return None
+    now = now or datetime.utcnow()
+    return datetime.combine((now - timedelta(days=days)).date(), datetime.min.time())
+
+
+def downsample_daily(session, now: datetime | None = None, days: int | None = None) -> dict:
+    """
+    Fold stock_quotes snapshots from days before the intraday cutoff into
+    stock_quotes_daily, then delete them. A bar is open of the first snapshot,
+    high/low/volume extremes, close of the last. A late snapshot for a day that
+    was already downsampled replaces the bar only if it is newer, which is
+    right because Stooq snapshots are cumulative for the session.
+    """
+    cutoff = intraday_cutoff(now, days)
+    if cutoff is None:
+        return {"daily_bars": 0, "removed_quotes": 0}
+
+    day = bucket_expr(session, StockQuote.market_ts, "day")
+    agg = (
+        select(
+            StockQuote.symbol.label("symbol"),
+            day.label("day"),
+            func.min(StockQuote.market_ts).label("first_ts"),
+            func.max(StockQuote.market_ts).label("last_ts"),
+            func.max(StockQuote.high).label("high"),
+            func.min(StockQuote.low).label("low"),
+            func.max(StockQuote.volume).label("volume"),
+            func.count().label("samples"),
+            func.max(StockQuote.source_id).label("source_id"),
+        )
+        .where(StockQuote.market_ts < cutoff)
+        .group_by(StockQuote.symbol, day)
+        .subquery("agg")
+    )
+    first = StockQuote.__table__.alias("first_quote")
+    last = StockQuote.__table__.alias("last_quote")
+    stmt = (
+        select(agg, first.c.open, last.c.close)
+        .join(first, (first.c.symbol == agg.c.symbol) & (first.c.market_ts == agg.c.first_ts))
+        .join(last, (last.c.symbol == agg.c.symbol) & (last.c.market_ts == agg.c.last_ts))
+    )
+    with track_query("quote_downsample_select"):
+        grouped = session.execute(stmt).all()
+
+    rows = [
+        {
+            "symbol": r.symbol,
+            "day": as_datetime(r.day).date(),
+            "market_ts": as_datetime(r.last_ts),
+            "open": r.open,
+            "high": r.high,
+            "low": r.low,
+            "close": r.close,
+            "volume": r.volume,
+            "samples": r.samples,
+            "source_id": r.source_id,
+        }
+        for r in grouped
+    ]
+    if rows:
+        stmt = _insert(session, StockQuoteDaily)
+        daily = StockQuoteDaily.__table__
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["symbol", "day"],
+            set_={c: stmt.excluded[c] for c in ("market_ts", *OHLCV, "samples", "source_id")},
+            where=stmt.excluded.market_ts >= daily.c.market_ts,
+        )
+        with track_query("quote_downsample_upsert"):
+            session.execute(stmt, rows)
+
+    with track_query("quote_downsample_delete"):
+        removed = session.query(StockQuote).filter(StockQuote.market_ts < cutoff).delete(synchronize_session=False)
+    session.commit()
+    return {"daily_bars": len(rows), "removed_quotes": removed}
@@ -0,0 +1,146 @@
+# src/relevance.py
+"""
+Is a headline about the symbol it was collected for?
+
+GDELT is queried with a broad "(Apple OR AAPL)" and Reddit search matches
+post bodies, so many returned titles never mention the company. Before
+scoring, store_mentions keeps only texts that contain one of the symbol's
+aliases:
+
+  - its cashtag ($AAPL, any case)
+  - the bare ticker in upper case (AAPL), unless the ticker is one or two
+    letters or a common word (ON, IT, ALL, NOW, ...)
+  - the company name without legal suffixes ("Apple" from "Apple Inc"),
+    any case, plus its first word when that is distinctive enough
+
+All aliases of a symbol are compiled into one Aho-Corasick automaton, so a
+headline is scanned once however many aliases there are. Matches must sit
+on word boundaries. A symbol whose company name is unknown (no
+FINNHUB_API_KEY, a failed lookup or an open breaker) is not filtered at all:
+most headlines name the company, not the ticker. Set RELEVANCE_FILTER=0 to
+store everything.
+"""
+import os
+import re
+from collections import deque
+from functools import lru_cache
+
+LEGAL_SUFFIXES = re.compile(
+    r"[,.]?\s+(inc|incorporated|corp|corporation|co|company|ltd|limited|plc|ag|sa|nv|n\.v|se|holdings?|group|"
+    r"class [a-c]|the)\.?$",
+    re.IGNORECASE,
+)
+COMMON_WORDS = frozenset("""
+    a all am an and any are as at be best big box by can car cat com cost day do dog eat for fast fun go good
+    has hear help her hi his home hope hot how if in is it key kind life live love low main make man me
+    more most my net new next now of on one open out own pay play post real run safe see so sun take team
+    tech the true two up us very wash well win work you advanced american general international national first
+    united global energy capital
+""".split())
+
+CASHTAG, TICKER, NAME = "cashtag", "ticker", "name"
+
+
+def enabled() -> bool:
+    return os.getenv("RELEVANCE_FILTER", "1").lower() not in ("0", "false", "no", "off")
+
+
+def company_aliases(company: str) -> list[str]:
+    """Lower-cased name aliases: "Apple Inc." gives ["apple"], "Tesla Motors Inc" ["tesla motors", "tesla"]."""
+    name = (company or "").strip()
+    while True:
+        stripped = LEGAL_SUFFIXES.sub("", name).strip()
+        if stripped == name:
+            break
+        name = stripped
+    name = name.lower()
+    if len(name) < 3:
+        return []
+    aliases = [name]
+    first = name.split()[0]
+    if first != name and len(first) >= 4 and first not in COMMON_WORDS:
+        aliases.append(first)
+    return aliases
+
+
+class Automaton:
+    """Aho-Corasick over lower-cased text; each pattern carries a kind."""
+
+    def __init__(self, patterns: dict[str, str]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[tuple[str, str]]] = [[]]
+        for pattern, kind in patterns.items():
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append((pattern, kind))
+        # breadth-first failure links
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def matches(self, text: str):
+        """(end index in `text`, pattern, kind) for every case-insensitive occurrence."""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, ch in enumerate(text):
+            ch = ch.lower()  # per character, so indices line up with `text`
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pattern, kind in out[node]:
+                yield i, pattern, kind
+
+
+def _boundary(text: str, start: int, end: int) -> bool:
+    before = text[start - 1] if start > 0 else " "
+    after = text[end] if end < len(text) else " "
+    return not (before.isalnum() or before == "$") and not after.isalnum()
+
+
+class RelevanceMatcher:
+    def __init__(self, symbol: str, company: str = ""):
+        self.symbol = symbol.upper()
+        ticker = self.symbol.lower()
+        patterns = {f"${ticker}": CASHTAG}
+        self.ticker_usable = len(ticker) >= 3 and ticker not in COMMON_WORDS
+        if self.ticker_usable:
+            patterns[ticker] = TICKER
+        for alias in company_aliases(company):
+            patterns.setdefault(alias, NAME)
+        # without a company name most headlines ("Apple beats estimates")
+        # name neither the cashtag nor the ticker, so nothing is filtered
+        self.usable = NAME in patterns.values()
+        self._automaton = Automaton(patterns)
+
+    def is_relevant(self, text: str) -> bool:
+        text = text or ""
+        for end, pattern, kind in self._automaton.matches(text):
+            start = end - len(pattern) + 1
+            if kind == CASHTAG:
+                if end + 1 >= len(text) or not text[end + 1].isalnum():
+                    return True
+            elif _boundary(text, start, end + 1):
+                if kind == NAME or text[start:end + 1] == self.symbol:
+                    return True
+        return False
+
+
+@lru_cache(maxsize=1024)
+def matcher(symbol: str, company: str = "") -> RelevanceMatcher:
+    return RelevanceMatcher(symbol, company)
@@ -0,0 +1,159 @@
+# src/replica.py
+"""
+Read-replica routing for the read-only endpoints.
+
+Set DATABASE_REPLICA_URL (e.g. a Heroku Postgres follower) and views
+decorated with @read_only run their queries on the replica. A request stays
+on the primary when:
+
+  - the user collected one of the requested symbols within the last
+    REPLICA_STICKY_SECONDS (default 120), so they see their own writes;
+    /collect and /track set a cookie listing those symbols
+  - the replica is REPLICA_MAX_LAG_SECONDS (default 30) or more behind,
+    or its lag can't be measured
+
+Lag is measured at most every REPLICA_LAG_CHECK_SECONDS per process and
+exported as db_replica_lag_seconds.
+"""
+import functools
+import os
+import threading
+import time
+
+from flask import after_this_request, request
+from sqlalchemy import text
+
+from .db import REPLICA_BIND, db, replica_reads
+from .monitoring import DB_READS, DB_REPLICA_LAG_SECONDS
+
+STICKY_COOKIE = "db_primary"
+
+# 0 when the standby has replayed everything it received, so an idle primary
+# doesn't read as a growing lag
+LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+_lag_lock = threading.Lock()
+_lag = {"checked": float("-inf"), "seconds": None}
+
+
+def replica_url() -> str | None:
+    url = os.getenv("DATABASE_REPLICA_URL")
+    if not url:
+        return None
+    # Heroku uses deprecated postgres:// scheme
+    return url.replace("postgres://", "postgresql://", 1)
+
+
+def sticky_seconds() -> int:
+    return int(os.getenv("REPLICA_STICKY_SECONDS", "120"))
+
+
+def max_lag_seconds() -> float:
+    return float(os.getenv("REPLICA_MAX_LAG_SECONDS", "30"))
+
+
+def enabled() -> bool:
+    return REPLICA_BIND in db.engines
+
+
+def replica_lag() -> float | None:
+    """Seconds the replica is behind (cached per process); None if it can't be measured."""
+    interval = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "5"))
+    now = time.monotonic()
+    if now - _lag["checked"] < interval:
+        return _lag["seconds"]
+    with _lag_lock:
+        if now - _lag["checked"] < interval:
+            return _lag["seconds"]
+        engine = db.engines[REPLICA_BIND]
+        try:
+            if engine.dialect.name == "postgresql":
+                with engine.connect() as conn:
+                    seconds = float(conn.execute(LAG_SQL).scalar() or 0.0)
+            else:
+                seconds = 0.0  # nothing to measure (local SQLite copy)
+        except Exception:
+            seconds = None
+        _lag.update(checked=time.monotonic(), seconds=seconds)
+    DB_REPLICA_LAG_SECONDS.set(-1 if seconds is None else seconds)
+    return seconds
+
+
+def _canonical(symbol: str) -> str:
+    return symbol.strip().lstrip("$").upper().split(".")[0]
+
+
+def _pinned() -> dict[str, int]:
+    """{symbol: expiry epoch} from the sticky cookie, expired entries dropped."""
+    now = int(time.time())
+    pins = {}
+    for item in (request.cookies.get(STICKY_COOKIE) or "").split("|"):
+        symbol, _, until = item.partition(":")
+        if symbol and until.isdigit() and int(until) > now:
+            pins[symbol] = int(until)
+    return pins
+
+
+def stick_to_primary(symbol: str) -> None:
+    """Keep this client's reads for `symbol` on the primary for REPLICA_STICKY_SECONDS."""
+    canonical = _canonical(symbol)
+    if not canonical or not enabled():
+        return
+    ttl = sticky_seconds()
+    pins = _pinned()
+    pins[canonical] = int(time.time()) + ttl
+
+    @after_this_request
+    def _set_cookie(response):
+        value = "|".join(f"{s}:{until}" for s, until in sorted(pins.items()))
+        response.set_cookie(STICKY_COOKIE, value, max_age=ttl, httponly=True, samesite="Lax")
+        return response
+
+
+def _request_symbols() -> set[str]:
+    raw = [request.args.get("symbol") or ""] + (request.args.get("symbols") or "").split(",")
+    return {_canonical(s) for s in raw if _canonical(s)}
+
+
+def _route() -> tuple[str, str]:
+    """(target, reason) for the current request."""
+    if _request_symbols() & set(_pinned()):
+        return "primary", "sticky"
+    lag = replica_lag()
+    if lag is None:
+        return "primary", "replica_unavailable"
+    if lag >= max_lag_seconds():
+        return "primary", "lag"
+    return "replica", "ok"
+
+
+def read_only(view):
+    """Run a view's queries on the replica when one is configured and fresh enough for this client."""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not enabled():
+            return view(*args, **kwargs)
+        target, reason = _route()
+        DB_READS.labels(target, reason).inc()
+        if target != "replica":
+            return view(*args, **kwargs)
+        token = replica_reads.set(True)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            replica_reads.reset(token)
+
+    return wrapper
+
+
+def binds_config(options) -> dict:
+    """SQLALCHEMY_BINDS entry for the replica; `options` builds its engine options from the URL."""
+    url = replica_url()
+    return {REPLICA_BIND: {"url": url, **options(url)}} if url else {}
@@ -0,0 +1,157 @@
+# src/rollups.py
+"""
+Hourly rollups of social_mentions (mention_rollups_hourly).
+
+Mentions arrive up to ROLLUP_LATE_HOURS (default 48) after their
+created_at (GDELT reports a day late), so an hour's rollup is only final
+that long after it ends. roll_forward() recomputes everything from the
+stored watermark (rollup_watermarks) up to the current hour, then moves the
+watermark to the last hour that can no longer change. Readers serve hours
+before the watermark from the rollup and everything after it from
+social_mentions, so a missed run or a late mention never reads as zero.
+maintain_mentions_task runs it every MENTION_MAINTENANCE_HOURS.
+"""
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from .models import MentionRollup, RollupWatermark, SocialMention
+from .monitoring import track_query
+
+LATE_HOURS = int(os.getenv("ROLLUP_LATE_HOURS", "48"))
+WATERMARK = "mention_rollups_hourly"
+
+# SQLite has no date_trunc; strftime to the same text layout SQLAlchemy stores
+# DateTime in, so truncated values still compare correctly against bound params.
+_SQLITE_FORMATS = {
+    "minute": "%Y-%m-%d %H:%M:00.000000",
+    "hour": "%Y-%m-%d %H:00:00.000000",
+    "day": "%Y-%m-%d 00:00:00.000000",
+}
+
+
+def bucket_expr(session, column, interval: str):
+    """SQL expression truncating `column` to minute / hour / day for the session's dialect."""
+    if session.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(interval, column)
+    return func.strftime(_SQLITE_FORMATS[interval], column)
+
+
+def as_datetime(value) -> datetime:
+    """Bucket values come back as datetimes on Postgres and as text on SQLite."""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
+def truncate_hour(dt: datetime) -> datetime:
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def rolled_until(session) -> datetime | None:
+    """Hours before this are final in mention_rollups_hourly; None before the first roll_forward()."""
+    row = session.get(RollupWatermark, WATERMARK)
+    return row.rolled_until if row is not None else None
+
+
+def advance_watermark(session, until: datetime) -> None:
+    """Move the watermark forward to `until` (never back). Does not commit."""
+    row = session.get(RollupWatermark, WATERMARK)
+    if row is None:
+        session.add(RollupWatermark(name=WATERMARK, rolled_until=until))
+    elif until > row.rolled_until:
+        row.rolled_until = until
+
+
+def rollup_range(session, platform: str = "news") -> tuple[datetime, datetime] | None:
+    """
+    [first hour, watermark): hours in that range are served from
+    mention_rollups_hourly, anything outside it from social_mentions.
+    None when nothing final has been rolled up yet.
+    """
+    until = rolled_until(session)
+    if until is None:
+        return None
+    with track_query("rollup_range"):
+        first = session.execute(
+            select(func.min(MentionRollup.bucket_start)).where(MentionRollup.platform == platform)
+        ).scalar()
+    if first is None or as_datetime(first) >= until:
+        return None
+    return as_datetime(first), until
+
+
+def roll_forward(session, now: datetime | None = None) -> int:
+    """
+    Recompute the rollup from the watermark (or the oldest raw mention, the
+    first time) to the current hour and advance the watermark to
+    ROLLUP_LATE_HOURS before it. Returns the number of rollup rows written.
+    """
+    now = now or datetime.utcnow()
+    until = truncate_hour(now)
+    # refresh_hourly_rollups starts no earlier than the oldest raw mention
+    since = rolled_until(session) or datetime.min
+    written = refresh_hourly_rollups(session, since, until)
+    advance_watermark(session, until - timedelta(hours=LATE_HOURS))
+    session.commit()
+    return written
+
+
+def refresh_hourly_rollups(session, since: datetime, until: datetime | None = None) -> int:
+    """
+    Recompute hourly rollups for every platform/symbol in [since, until).
+
+    Only complete hours are rolled up (until defaults to the start of the
+    current hour). The range is rewritten in full, so re-running over the
+    ingest lookback window picks up late-arriving mentions. Hours before the
+    oldest raw mention are left alone: retention may have removed their rows
+    (src/partitions.py) and the rollup is all that is left of them.
+    Returns the number of rollup rows written.
+    """
+    # one probe of ix_social_mentions_created_at (per partition on Postgres)
+    oldest = session.execute(select(func.min(SocialMention.created_at))).scalar()
+    if oldest is None:
+        return 0
+    since = max(truncate_hour(since), truncate_hour(as_datetime(oldest)))
+    until = truncate_hour(until or datetime.utcnow())
+    if until <= since:
+        return 0
+
+    hour = bucket_expr(session, SocialMention.created_at, "hour")
+    stmt = (
+        select(
+            SocialMention.platform,
+            SocialMention.symbol,
+            hour.label("bucket_start"),
+            func.count(SocialMention.id),
+            func.coalesce(func.sum(SocialMention.sentiment), 0.0),
+            func.count(SocialMention.sentiment),
+        )
+        .where(SocialMention.created_at >= since)
+        .where(SocialMention.created_at < until)
+        .group_by(SocialMention.platform, SocialMention.symbol, hour)
+    )
+    with track_query("rollup_refresh_select"):
+        grouped = session.execute(stmt).all()
+
+    session.query(MentionRollup).filter(
+        MentionRollup.bucket_start >= since,
+        MentionRollup.bucket_start < until,
+    ).delete(synchronize_session=False)
+
+    rows = [
+        {
+            "platform": platform,
+            "symbol": symbol,
+            "bucket_start": as_datetime(bucket),
+            "count": count,
+            "sentiment_sum": float(s_sum),
+            "sentiment_count": s_count,
+        }
+        for platform, symbol, bucket, count, s_sum, s_count in grouped
+    ]
+    if rows:
+        session.execute(MentionRollup.__table__.insert(), rows)
+    session.commit()
+    return len(rows)
@@ -0,0 +1,182 @@
+# src/search.py
+"""
+Full-text search over stored headlines (social_mentions.text).
+
+Postgres: a generated tsvector column, search_vector, with a GIN index;
+queries use websearch_to_tsquery('english', q), so quoted phrases, OR and
+-term work, and are ranked with ts_rank_cd.
+
+SQLite: an external-content FTS5 table, social_mentions_fts (porter
+stemming), kept in sync by triggers and ranked with bm25.
+
+Either way the index follows every insert, update and delete on
+social_mentions, including ingestion and retention, without any extra
+application code. The migration creates it for existing databases, and the
+after_create hook below does the same for tables built with create_all.
+
+Results are keyset-paginated, by rank (best first) or by recency, so deep
+pages cost no more than the first.
+"""
+import base64
+import re
+from datetime import datetime
+
+from sqlalchemy import DDL, cast, column, event, func, literal_column, or_, table, text, tuple_
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+
+from .mentions import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
+from .models import SocialMention
+from .monitoring import track_query
+
+ORDERS = ("rank", "recent")
+TS_CONFIG = "english"
+
+POSTGRES_DDL = [
+    f"ALTER TABLE social_mentions ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS (to_tsvector('{TS_CONFIG}', coalesce(text, ''))) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_social_mentions_search ON social_mentions USING GIN (search_vector)",
+]
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS social_mentions_fts USING fts5("
+    "text, content='social_mentions', content_rowid='id', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS social_mentions_fts_ai AFTER INSERT ON social_mentions BEGIN "
+    "INSERT INTO social_mentions_fts(rowid, text) VALUES (new.id, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS social_mentions_fts_ad AFTER DELETE ON social_mentions BEGIN "
+    "INSERT INTO social_mentions_fts(social_mentions_fts, rowid, text) VALUES ('delete', old.id, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS social_mentions_fts_au AFTER UPDATE OF text ON social_mentions BEGIN "
+    "INSERT INTO social_mentions_fts(social_mentions_fts, rowid, text) VALUES ('delete', old.id, old.text); "
+    "INSERT INTO social_mentions_fts(rowid, text) VALUES (new.id, new.text); END",
+]
+
+for _statement in POSTGRES_DDL:
+    event.listen(SocialMention.__table__, "after_create", DDL(_statement).execute_if(dialect="postgresql"))
+for _statement in SQLITE_DDL:
+    event.listen(SocialMention.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+
+_fts = table("social_mentions_fts", column("rowid"))
+_TERM = re.compile(r'(-?)"([^"]*)"|(-?)([^\s"]+)')
+_WORD = re.compile(r"\w+")
+
+
+def fts5_query(q: str) -> str:
+    """
+    Translate web-search syntax ("exact phrase", OR, -term) into an FTS5
+    query with every term quoted, so user input can't be an FTS5 syntax error.
+    """
+    positive, negative = [], []
+    for neg_phrase, phrase, neg_word, word in _TERM.findall(q):
+        if word == "OR" and not neg_word:
+            if positive and positive[-1] != "OR":
+                positive.append("OR")
+            continue
+        words = _WORD.findall(phrase or word)
+        if not words:
+            continue
+        quoted = '"' + " ".join(words) + '"'
+        (negative if (neg_phrase or neg_word) else positive).append(quoted)
+    if positive and positive[-1] == "OR":
+        positive.pop()
+    if not positive:
+        raise ValueError("q must contain at least one search term")
+    expr = " ".join(positive)
+    return f"({expr}) NOT ({' OR '.join(negative)})" if negative else expr
+
+
+def encode_rank_cursor(rank: float, mention_id: int) -> str:
+    raw = f"{rank!r}|{mention_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_rank_cursor(cursor: str) -> tuple[float, int]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        rank, mention_id = base64.urlsafe_b64decode(padded.encode()).decode().rsplit("|", 1)
+        return float(rank), int(mention_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def _postgres(session, q: str):
+    vector = literal_column("social_mentions.search_vector")
+    tsquery = func.websearch_to_tsquery(TS_CONFIG, q)
+    # ts_rank_cd is float4; as float8 the value the cursor carries compares equal to itself
+    rank = cast(func.ts_rank_cd(vector, tsquery), DOUBLE_PRECISION)
+    return session.query(SocialMention, rank).filter(vector.op("@@")(tsquery)), rank
+
+
+def _sqlite(session, q: str):
+    hits = (
+        session.query(
+            _fts.c.rowid.label("id"),
+            (-func.bm25(literal_column("social_mentions_fts"))).label("rank"),
+        )
+        .select_from(_fts)
+        .filter(text("social_mentions_fts MATCH :fts_query").bindparams(fts_query=fts5_query(q)))
+        .subquery()
+    )
+    return session.query(SocialMention, hits.c.rank).join(hits, hits.c.id == SocialMention.id), hits.c.rank
+
+
+def search_mentions(
+    session,
+    q: str,
+    *,
+    symbol: str | None = None,
+    platform: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    order: str = "rank",
+    cursor: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> tuple[list[tuple[SocialMention, float]], str | None]:
+    """
+    One page of (mention, rank) matching `q`, best match first (order="rank")
+    or newest first (order="recent"). Returns (rows, next_cursor).
+    """
+    q = (q or "").strip()
+    if not q:
+        raise ValueError("Missing q")
+    if order not in ORDERS:
+        raise ValueError(f"order must be one of {', '.join(ORDERS)}")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        query, rank = _postgres(session, q)
+    elif dialect == "sqlite":
+        query, rank = _sqlite(session, q)
+    else:
+        raise ValueError(f"full-text search is not available on {dialect}")
+
+    if symbol:
+        query = query.filter(SocialMention.symbol == symbol)
+    if platform:
+        query = query.filter(SocialMention.platform == platform)
+    if since is not None:
+        query = query.filter(SocialMention.created_at >= since)
+    if until is not None:
+        query = query.filter(SocialMention.created_at < until)
+
+    if order == "rank":
+        if cursor:
+            c_rank, c_id = decode_rank_cursor(cursor)
+            query = query.filter(or_(rank < c_rank, (rank == c_rank) & (SocialMention.id < c_id)))
+        query = query.order_by(rank.desc(), SocialMention.id.desc())
+    else:
+        if cursor:
+            c_ts, c_id = decode_cursor(cursor)
+            query = query.filter(tuple_(SocialMention.created_at, SocialMention.id) < tuple_(c_ts, c_id))
+        query = query.order_by(SocialMention.created_at.desc(), SocialMention.id.desc())
+
+    # one extra row tells whether another page exists
+    with track_query("mention_search"):
+        rows = query.limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last, last_rank = rows[-1]
+        next_cursor = (
+            encode_rank_cursor(last_rank, last.id) if order == "rank" else encode_cursor(last.created_at, last.id)
+        )
+    return rows, next_cursor
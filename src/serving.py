@@ -0,0 +1,43 @@
+# src/serving.py
+"""
+Cooperative (gevent) serving support.
+
+With WEB_WORKER_CLASS=gevent each gunicorn worker runs many requests as
+greenlets. gunicorn monkey-patches sockets, so `requests` calls to
+Finnhub/Stooq/GDELT and inline collection yield instead of
+blocking; psycopg2 is a C extension and needs a wait callback to do the same.
+"""
+
+
+def gevent_active() -> bool:
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("socket")
+
+
+def _gevent_wait_callback(conn, timeout=None):
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state!r}")
+
+
+def make_psycopg2_green() -> bool:
+    """Let Postgres queries yield to other greenlets. Returns False if psycopg2 is absent."""
+    try:
+        from psycopg2 import extensions
+    except ImportError:
+        return False
+    extensions.set_wait_callback(_gevent_wait_callback)
+    return True
@@ -0,0 +1,23 @@
+# src/sources/__init__.py
+"""
+News and social source adapters behind one ingestion path.
+
+  rss      RSS 2.0 / Atom feeds (NEWS_RSS_FEEDS)
+  reddit   subreddit search listings (REDDIT_SUBREDDITS)
+
+To add a source, subclass SourceAdapter (pages -> fetch -> normalize),
+register it in ADAPTERS, and it shares the concurrent fetch, dedup, batched
+scoring and bulk insert in src.sources.ingest.
+"""
+from .base import Mention, SourceAdapter
+from .ingest import ADAPTERS, collect_sources, enabled_sources, fetch_all, store_mentions
+
+__all__ = [
+    "ADAPTERS",
+    "Mention",
+    "SourceAdapter",
+    "collect_sources",
+    "enabled_sources",
+    "fetch_all",
+    "store_mentions",
+]
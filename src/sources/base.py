@@ -0,0 +1,55 @@
+# src/sources/base.py
+"""
+The source-adapter interface.
+
+An adapter turns a symbol into page URLs, fetches each page through
+src.upstream (so it gets the shared session and the provider's circuit
+breaker) and normalizes the payload into Mentions. It does no scoring or
+database work; src.sources.ingest does that for every adapter at once.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable
+
+import requests
+
+from .. import upstream
+
+USER_AGENT = "CU-Boulder-Academic-Project/1.0 (sentiment scraper; contact: joelcomberiati@gmail.com)"
+
+
+@dataclass(frozen=True)
+class Mention:
+    platform: str          # SocialMention.platform, e.g. "news" or "reddit"
+    source: str | None     # feed host or subreddit
+    url: str
+    created_at: datetime   # UTC-aware
+    text: str
+
+
+class SourceAdapter:
+    name = ""        # registry key, e.g. "rss"
+    platform = ""
+    provider = ""    # upstream breaker / latency label
+    timeout = 10
+
+    def pages(self, symbol: str) -> list[str]:
+        """URLs to fetch for `symbol`; the runner fetches them concurrently."""
+        raise NotImplementedError
+
+    def provider_for(self, url: str) -> str:
+        """Breaker and latency label for one page: the adapter's provider unless a subclass splits it up."""
+        return self.provider
+
+    def fetch(self, url: str) -> requests.Response:
+        r = upstream.get(self.provider_for(url), url, headers={"User-Agent": USER_AGENT}, timeout=self.timeout)
+        r.raise_for_status()
+        return r
+
+    def normalize(self, response: requests.Response, symbol: str) -> Iterable[Mention | None]:
+        """One Mention per entry; None for entries missing a URL, title or date."""
+        raise NotImplementedError
+
+    def dedup_key(self, mention: Mention) -> tuple[str, str]:
+        # matches the stored dedup: (platform, symbol, url)
+        return mention.platform, mention.url
@@ -0,0 +1,192 @@
+# src/sources/ingest.py
+"""
+The shared ingestion path: fetch every adapter's pages concurrently, then
+dedup, score and insert the lot as one batch.
+
+Fetching runs on a thread pool of SOURCE_CONCURRENCY (default 8) threads
+(greenlets under gevent), since each page is a blocking HTTP call. A page
+that fails, or whose provider's breaker is open, is counted and skipped; the
+other pages still land. Scoring and the database work happen once, on the
+calling thread, for all pages together.
+"""
+import contextvars
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, update
+
+from .. import clustering, relevance, tracing, upstream
+from ..db import db
+from ..models import SocialMention
+from ..monitoring import count_rows, track_collector_run, track_query
+from .base import Mention, SourceAdapter
+from .reddit import RedditSource
+from .rss import RssSource
+
+CONCURRENCY = int(os.getenv("SOURCE_CONCURRENCY", "8"))
+
+# stored rows are looked up this far before `since`; covers items a source
+# re-reports with a later timestamp
+DEDUP_SLACK = timedelta(days=7)
+
+ADAPTERS: dict[str, type[SourceAdapter]] = {cls.name: cls for cls in (RssSource, RedditSource)}
+
+
+def enabled_sources() -> list[str]:
+    """Adapters collect jobs run, from INGEST_SOURCES (e.g. "rss,reddit"); none by default."""
+    names = [n.strip() for n in os.getenv("INGEST_SOURCES", "").split(",") if n.strip()]
+    unknown = set(names) - set(ADAPTERS)
+    if unknown:
+        raise ValueError(f"unknown source(s): {', '.join(sorted(unknown))}")
+    return names
+
+
+def store_mentions(
+    symbol: str, mentions: list[Mention | None], since: datetime, collector: str, company: str = "",
+) -> dict:
+    """
+    Drop mentions that don't name the symbol or `company` (src/relevance.py),
+    dedup the rest (None = an entry the adapter couldn't parse) against each
+    other and the stored rows, score the new ones in one batch and insert them
+    with one executemany. Runs in an app context.
+    """
+    from ..app import score_sentiments
+
+    counts = {"inserted": 0, "duplicate": 0, "stale": 0, "invalid": 0, "irrelevant": 0}
+    matcher = relevance.matcher(symbol, company) if relevance.enabled() else None
+    if matcher is not None and not matcher.usable:
+        matcher = None  # no company name: the ticker alone would drop most real headlines
+    candidates = {}  # (platform, url) -> Mention; first occurrence wins
+    with tracing.span("relevance", texts=len(mentions)):
+        for m in mentions:
+            if m is None:
+                counts["invalid"] += 1
+            elif m.created_at < since:
+                counts["stale"] += 1
+            elif (m.platform, m.url) in candidates:
+                counts["duplicate"] += 1
+            elif matcher is not None and not matcher.is_relevant(m.text):
+                counts["irrelevant"] += 1
+            else:
+                candidates[(m.platform, m.url)] = m
+
+    with tracing.span("dedup_lookup", candidates=len(candidates)), track_query(f"{collector}_dedup_lookup"):
+        existing = {
+            (platform, url) for platform, url in db.session.query(SocialMention.platform, SocialMention.url)
+            .filter(SocialMention.platform.in_({p for p, _ in candidates}))
+            .filter(SocialMention.symbol == symbol)
+            # bounded so Postgres only probes recent partitions
+            .filter(SocialMention.created_at >= since.replace(tzinfo=None) - DEDUP_SLACK)
+            .filter(SocialMention.url.in_({u for _, u in candidates}))
+        } if candidates else set()
+    fresh = [m for key, m in candidates.items() if key not in existing]
+    counts["duplicate"] += len(candidates) - len(fresh)
+
+    with tracing.span("score_sentiment", texts=len(fresh)):
+        scores = score_sentiments([m.text for m in fresh])
+
+    if fresh:
+        with tracing.span("cluster", texts=len(fresh)):
+            existing_cluster, head = _clusters(symbol, fresh, collector)
+        rows = [
+            {
+                "platform": m.platform,
+                "source": m.source,
+                "symbol": symbol,
+                "created_at": m.created_at.astimezone(timezone.utc).replace(tzinfo=None),  # naive UTC
+                "text": m.text,
+                "url": m.url,
+                "sentiment": score,
+                "cluster_id": cluster_id,
+            }
+            for m, score, cluster_id in zip(fresh, scores, existing_cluster)
+        ]
+        with tracing.span("db_write", rows=len(fresh)), track_query(f"{collector}_insert"):
+            if any(h is not None for h in head):
+                # followers of a cluster started in this batch need the head's new id
+                ids = db.session.scalars(
+                    insert(SocialMention).returning(SocialMention.id, sort_by_parameter_order=True), rows
+                ).all()
+                db.session.execute(update(SocialMention), [
+                    {"id": ids[i], "cluster_id": ids[h]} for i, h in enumerate(head) if h is not None
+                ])
+            else:
+                db.session.execute(insert(SocialMention), rows)
+            db.session.commit()
+    counts["inserted"] = len(fresh)
+    count_rows(collector, **counts)
+    return counts
+
+
+def _clusters(symbol: str, fresh: list[Mention], collector: str) -> tuple[list, list]:
+    """clustering.assign_clusters per platform, against the symbol's headlines from the last CLUSTER_WINDOW_HOURS."""
+    existing, head = [None] * len(fresh), [None] * len(fresh)
+    start = min(m.created_at for m in fresh).astimezone(timezone.utc).replace(tzinfo=None) - clustering.WINDOW
+    for platform in {m.platform for m in fresh}:
+        positions = [i for i, m in enumerate(fresh) if m.platform == platform]
+        with track_query(f"{collector}_cluster_lookup"):
+            recent = (
+                db.session.query(SocialMention.text, func.coalesce(SocialMention.cluster_id, SocialMention.id))
+                .filter(SocialMention.platform == platform)
+                .filter(SocialMention.symbol == symbol)
+                .filter(SocialMention.created_at >= start)
+                .order_by(SocialMention.created_at.desc())
+                .limit(clustering.RECENT_LIMIT)
+                .all()
+            )
+        # oldest first, so ties go to the cluster that started first
+        matched, heads = clustering.assign_clusters([fresh[i].text for i in positions], recent[::-1])
+        for i, cluster_id, h in zip(positions, matched, heads):
+            existing[i] = cluster_id
+            head[i] = None if h is None else positions[h]
+    return existing, head
+
+
+def _fetch_page(adapter: SourceAdapter, url: str, symbol: str) -> list[Mention | None]:
+    with tracing.span(f"source_{adapter.name}", **{"http.url": url}):
+        return list(adapter.normalize(adapter.fetch(url), symbol))
+
+
+def fetch_all(adapters: list[SourceAdapter], symbol: str) -> tuple[list[Mention | None], dict]:
+    """Every page of every adapter, fetched concurrently. Returns (mentions, {"errors": n, "skipped": n})."""
+    pages = [(a, url) for a in adapters for url in a.pages(symbol)]
+    mentions, stats = [], {"errors": 0, "skipped": 0}
+    if not pages:
+        return mentions, stats
+    with ThreadPoolExecutor(max_workers=min(CONCURRENCY, len(pages))) as pool:
+        # each page's span joins the caller's trace
+        futures = [pool.submit(contextvars.copy_context().run, _fetch_page, a, url, symbol) for a, url in pages]
+        for future in futures:
+            try:
+                mentions.extend(future.result())
+            except upstream.UpstreamUnavailable:
+                stats["skipped"] += 1
+            except Exception:
+                traceback.print_exc()
+                stats["errors"] += 1
+    return mentions, stats
+
+
+def collect_sources(user_input: str, app=None, sources: list[str] | None = None, since: datetime | None = None) -> dict:
+    """
+    Run the named adapters (default: INGEST_SOURCES) for a symbol and store
+    what they found in the last day. Pass `app` to reuse its engine.
+    """
+    from ..app import create_app, get_company_name, resolve_symbol
+
+    symbol = resolve_symbol(user_input).split(".")[0]
+    since = since or datetime.now(timezone.utc) - timedelta(days=1)
+    adapters = [ADAPTERS[name]() for name in (enabled_sources() if sources is None else sources)]
+    company = get_company_name(symbol) if relevance.enabled() else ""
+
+    app = app or create_app()
+    with app.app_context(), track_collector_run("sources"):
+        mentions, stats = fetch_all(adapters, symbol)
+        counts = store_mentions(symbol, mentions, since, "sources", company=company)
+    print(f"Stored {counts['inserted']} mentions for {symbol} from {', '.join(a.name for a in adapters)}. "
+          f"Skipped {counts['duplicate']} duplicates, {counts['stale']} older-than-24h, "
+          f"{counts['irrelevant']} not about {symbol}; "
+          f"{stats['errors']} pages failed, {stats['skipped']} skipped by open breakers.")
+    return {"symbol": symbol, **counts, **stats}
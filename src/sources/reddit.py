@@ -0,0 +1,46 @@
+# src/sources/reddit.py
+"""
+Reddit JSON listings: a search for the ticker in each subreddit in
+REDDIT_SUBREDDITS (default stocks, wallstreetbets, investing), newest first,
+last day only.
+"""
+import os
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from .base import Mention, SourceAdapter
+
+REDDIT_URL = os.getenv("REDDIT_URL", "https://www.reddit.com")
+DEFAULT_SUBREDDITS = "stocks,wallstreetbets,investing"
+
+
+class RedditSource(SourceAdapter):
+    name = "reddit"
+    platform = "reddit"
+    provider = "reddit"
+
+    def __init__(self, subreddits: list[str] | None = None):
+        if subreddits is None:
+            subreddits = [s.strip() for s in os.getenv("REDDIT_SUBREDDITS", DEFAULT_SUBREDDITS).split(",") if s.strip()]
+        self.subreddits = subreddits
+
+    def pages(self, symbol: str) -> list[str]:
+        query = urlencode({"q": symbol, "restrict_sr": 1, "sort": "new", "t": "day", "limit": 100})
+        return [f"{REDDIT_URL}/r/{sub}/search.json?{query}" for sub in self.subreddits]
+
+    def normalize(self, response, symbol):
+        for child in response.json().get("data", {}).get("children", []):
+            post = child.get("data") or {}
+            title = (post.get("title") or "").strip()
+            permalink = post.get("permalink")
+            created = post.get("created_utc")
+            if not title or not permalink or created is None:
+                yield None
+                continue
+            yield Mention(
+                self.platform,
+                post.get("subreddit"),
+                f"https://www.reddit.com{permalink}",
+                datetime.fromtimestamp(float(created), tz=timezone.utc),
+                title,
+            )
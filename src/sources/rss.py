@@ -0,0 +1,74 @@
+# src/sources/rss.py
+"""
+RSS 2.0 and Atom feeds.
+
+NEWS_RSS_FEEDS is a comma-separated list of feed URL templates; "{symbol}"
+is replaced with the ticker. The default is Yahoo Finance's per-ticker
+headline feed. Each feed host has its own breaker ("rss:<host>"), so one
+dead feed doesn't skip the others.
+"""
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+from .base import Mention, SourceAdapter
+
+DEFAULT_FEEDS = "https://feeds.finance.yahoo.com/rss/2.0/headline?s={symbol}&region=US&lang=en-US"
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+def _parse_date(value: str | None) -> datetime | None:
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        dt = parsedate_to_datetime(value)  # RSS: RFC 822
+    except (TypeError, ValueError):
+        try:
+            dt = datetime.fromisoformat(value)  # Atom: RFC 3339
+        except ValueError:
+            return None
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+class RssSource(SourceAdapter):
+    name = "rss"
+    platform = "news"
+    provider = "rss"
+
+    def __init__(self, feeds: list[str] | None = None):
+        if feeds is None:
+            feeds = [f.strip() for f in os.getenv("NEWS_RSS_FEEDS", DEFAULT_FEEDS).split(",") if f.strip()]
+        self.feeds = feeds
+
+    def pages(self, symbol: str) -> list[str]:
+        return [feed.replace("{symbol}", symbol) for feed in self.feeds]
+
+    def provider_for(self, url: str) -> str:
+        return f"{self.provider}:{urlsplit(url).hostname}"
+
+    def normalize(self, response, symbol):
+        root = ET.fromstring(response.content)
+        host = urlsplit(response.url or "").hostname
+        if root.tag == f"{ATOM}feed":
+            for entry in root.iter(f"{ATOM}entry"):
+                link = entry.find(f"{ATOM}link[@rel='alternate']")
+                if link is None:
+                    link = entry.find(f"{ATOM}link")
+                yield self._mention(
+                    host,
+                    link.get("href") if link is not None else None,
+                    entry.findtext(f"{ATOM}title"),
+                    entry.findtext(f"{ATOM}published") or entry.findtext(f"{ATOM}updated"),
+                )
+        else:
+            for item in root.iter("item"):
+                yield self._mention(host, item.findtext("link"), item.findtext("title"), item.findtext("pubDate"))
+
+    def _mention(self, host, url, title, date) -> Mention | None:
+        url, title, created_at = (url or "").strip(), (title or "").strip(), _parse_date(date)
+        if not url or not title or created_at is None:
+            return None
+        return Mention(self.platform, host, url, created_at, title)
@@ -1,10 +1,170 @@
 # src/tasks.py
-import subprocess
-import sys
+import os
+import time
+import traceback
+from datetime import timedelta
+
+from flask import current_app, has_app_context
+from rq import Queue, get_current_job
+
+from . import jobstatus, profiling, tracing, upstream
+from .db import db
+from .partitions import apply_retention, ensure_partitions
+from .quotes import downsample_daily
+from .rollups import roll_forward
+
+# keep job meta small: only the heaviest stacks are stored
+PROFILE_MAX_STACKS = 2000
+
+MAINTENANCE_INTERVAL = timedelta(hours=float(os.getenv("MENTION_MAINTENANCE_HOURS", "6")))
+# set while a maintenance run is queued or scheduled, so workers don't start a second chain
+MAINTENANCE_KEY = "sentiment-scraper:mention-maintenance:scheduled"
+
+_app = None
+
+
+def _collector_app():
+    """
+    The app whose engine the collectors write through: the current one when run
+    inline from a request, otherwise one per process, so jobs share its pool
+    instead of each collector building an engine for a handful of statements.
+    """
+    global _app
+    if has_app_context():
+        return current_app._get_current_object()
+    if _app is None:
+        from .app import create_app
+
+        _app = create_app()
+    return _app
+
+
+def preload():
+    """
+    Build everything a collect job needs once: the Flask app and its engines,
+    mapped models, the VADER lexicon and the upstream HTTP session. worker.py
+    calls this before forking so every job slot starts warm.
+    """
+    from sqlalchemy.orm import configure_mappers
+
+    from scripts.fetch_news_gdelt import collect_news  # noqa: F401 - imports src.app (VADER)
+    from scripts.fetch_quote import collect_quote  # noqa: F401
+    from .app import sentiment_analyzer
+
+    app = _collector_app()
+    with app.app_context():
+        configure_mappers()
+        # nothing may hold a connection across fork; each process opens its own
+        for engine in db.engines.values():
+            engine.dispose()
+    sentiment_analyzer.polarity_scores("warm up")
+    upstream.session()
+    return app
+
+
+def _run_collector(name: str, collect, symbol: str, app) -> tuple[int, dict]:
+    """
+    Run one collector in-process. Returns (0 on success / 1 on failure, like the
+    old exit codes, and the fields it contributes to the job's status record).
+    """
+    prefix = name.removeprefix("collector_").split("_")[0]  # quote / news
+    with tracing.span(name):
+        try:
+            result = collect(symbol, app=app)
+        except upstream.UpstreamUnavailable as exc:
+            # provider's breaker is open: skip it, the other collector's results still count
+            return 1, {"error": f"{prefix}:{type(exc).__name__}", "skipped": exc.provider}
+        except Exception as exc:
+            traceback.print_exc()
+            return 1, {"error": f"{prefix}:{type(exc).__name__}"}
+    counts = {f"{prefix}_{k}": v for k, v in (result or {}).items() if isinstance(v, int) and not isinstance(v, bool)}
+    return 0, counts
+
+
+def _merge_fields(status: dict, fields: dict):
+    # the first collector's error wins; skipped providers accumulate
+    if "skipped" in status and "skipped" in fields:
+        status["skipped"] += "," + fields["skipped"]
+    status.update({k: v for k, v in fields.items() if k not in status})
 
 
 def run_collectors_task(symbol: str) -> dict:
-    """Run quote and news collection scripts for a single symbol."""
-    quote_rc = subprocess.run([sys.executable, "-m", "scripts.fetch_quote", symbol]).returncode
-    news_rc = subprocess.run([sys.executable, "-m", "scripts.fetch_news_gdelt", symbol]).returncode
+    """Run quote and news collection (plus any INGEST_SOURCES adapters) for a single symbol."""
+    from scripts.fetch_news_gdelt import collect_news
+    from scripts.fetch_quote import collect_quote
+
+    from .sources import collect_sources, enabled_sources
+
+    job = get_current_job()
+    traceparent = job.meta.get("traceparent") if job else None
+    conn, job_id = (job.connection, job.id) if job else (None, None)
+
+    # PROFILE_JOBS samples a fraction of jobs; the collapsed stacks land in job.meta["profile"]
+    profiler = profiling.SamplingProfiler().start() if job is not None and profiling.jobs_enabled() else None
+
+    started = time.time()
+    jobstatus.update(conn, job_id, status="started", stage="quote", symbol=symbol, started_at=round(started, 3))
+    status = {}
+    try:
+        app = _collector_app()
+        with tracing.span("run_collectors_task", traceparent=traceparent, symbol=symbol):
+            quote_rc, fields = _run_collector("collector_quote", collect_quote, symbol, app)
+            status.update(fields)
+            jobstatus.update(conn, job_id, stage="news", **fields)
+            news_rc, fields = _run_collector("collector_news_gdelt", collect_news, symbol, app)
+            _merge_fields(status, fields)
+            if enabled_sources():
+                jobstatus.update(conn, job_id, stage="sources", **status)
+                # RSS / Reddit adapters; failures here don't fail the job
+                _, fields = _run_collector("collector_sources", collect_sources, symbol, app)
+                _merge_fields(status, fields)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            lines = profiler.collapsed().splitlines()[:PROFILE_MAX_STACKS]
+            job.meta["profile"] = "\n".join(lines) + "\n"
+            job.save_meta()
+            status["has_profile"] = 1
+    ended = time.time()
+    jobstatus.update(
+        conn, job_id,
+        status="failed" if quote_rc and news_rc else "finished",
+        stage="done",
+        ended_at=round(ended, 3),
+        duration_ms=int((ended - started) * 1000),
+        **status,
+    )
     return {"fetch_quote": quote_rc, "fetch_news_gdelt": news_rc}
+
+
+def schedule_maintenance(queue: Queue, delay: timedelta | None = None) -> bool:
+    """Queue maintain_mentions_task (after `delay`) unless a run is already pending."""
+    ttl = int((delay or timedelta()).total_seconds() + MAINTENANCE_INTERVAL.total_seconds())
+    if not queue.connection.set(MAINTENANCE_KEY, "1", nx=True, ex=max(ttl, 60)):
+        return False
+    if delay:
+        queue.enqueue_in(delay, maintain_mentions_task)
+    else:
+        queue.enqueue(maintain_mentions_task)
+    return True
+
+
+def maintain_mentions_task() -> dict:
+    """
+    Create upcoming social_mentions partitions, roll the hourly rollup
+    forward, apply retention and fold old quotes into daily bars, then
+    reschedule itself.
+    """
+    job = get_current_job()
+    if job is not None:
+        job.connection.delete(MAINTENANCE_KEY)
+    try:
+        with _collector_app().app_context(), tracing.span("maintain_mentions"):
+            created = ensure_partitions(db.session)
+            rolled_up = roll_forward(db.session)
+            retention = apply_retention(db.session)
+            downsampled = downsample_daily(db.session)
+    finally:
+        if job is not None:
+            schedule_maintenance(Queue(job.origin, connection=job.connection), MAINTENANCE_INTERVAL)
+    return {"created_partitions": created, "rollup_rows": rolled_up, **retention, **downsampled}
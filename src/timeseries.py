@@ -0,0 +1,258 @@
+# src/timeseries.py
+import os
+from collections import deque
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from .models import MentionRollup, SocialMention
+from .monitoring import track_query
+from .rollups import as_datetime, bucket_expr, rollup_range, truncate_hour
+
+INTERVALS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+# Ceiling on buckets the database is asked to produce; finer requests are
+# coarsened to the next interval rather than grouping millions of minutes.
+MAX_BUCKETS = 100_000
+
+DEFAULT_MAX_POINTS = 1000
+MAX_POINTS = 5000
+DOWNSAMPLE_METHODS = ("lttb", "minmax")
+
+# vw_sentiment's trailing window, in buckets of the requested interval
+VW_WINDOW = int(os.getenv("TIMESERIES_VW_WINDOW", "24"))
+
+
+def effective_interval(start: datetime, end: datetime, interval: str) -> str:
+    names = list(INTERVALS)
+    i = names.index(interval)
+    while i < len(names) - 1 and (end - start) / INTERVALS[names[i]] > MAX_BUCKETS:
+        i += 1
+    return names[i]
+
+
+def bucket_floor(dt: datetime, interval: str) -> datetime:
+    if interval == "minute":
+        return dt.replace(second=0, microsecond=0)
+    if interval == "hour":
+        return truncate_hour(dt)
+    return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil_hour(dt: datetime) -> datetime:
+    floor = truncate_hour(dt)
+    return floor if floor == dt else floor + timedelta(hours=1)
+
+
+def _add_buckets(acc: dict, rows) -> None:
+    for bucket, count, s_sum, s_count in rows:
+        t = as_datetime(bucket)
+        cur = acc.setdefault(t, [0, 0.0, 0])
+        cur[0] += count
+        cur[1] += float(s_sum or 0.0)
+        cur[2] += s_count
+
+
+def _raw_buckets(session, acc, symbol, start, end, interval, platform):
+    bucket = bucket_expr(session, SocialMention.created_at, interval)
+    stmt = (
+        select(
+            bucket,
+            func.count(SocialMention.id),
+            func.sum(SocialMention.sentiment),
+            func.count(SocialMention.sentiment),
+        )
+        .where(SocialMention.platform == platform)
+        .where(SocialMention.symbol == symbol)
+        .where(SocialMention.created_at >= start)
+        .where(SocialMention.created_at < end)
+        .group_by(bucket)
+    )
+    with track_query("timeseries_raw"):
+        rows = session.execute(stmt).all()
+    _add_buckets(acc, rows)
+
+
+def _rollup_buckets(session, acc, symbol, start, end, interval, platform):
+    bucket = bucket_expr(session, MentionRollup.bucket_start, interval)
+    stmt = (
+        select(
+            bucket,
+            func.sum(MentionRollup.count),
+            func.sum(MentionRollup.sentiment_sum),
+            func.sum(MentionRollup.sentiment_count),
+        )
+        .where(MentionRollup.platform == platform)
+        .where(MentionRollup.symbol == symbol)
+        .where(MentionRollup.bucket_start >= start)
+        .where(MentionRollup.bucket_start < end)
+        .group_by(bucket)
+    )
+    with track_query("timeseries_rollup"):
+        rows = session.execute(stmt).all()
+    _add_buckets(acc, rows)
+
+
+def load_buckets(
+    session,
+    symbol: str,
+    start: datetime,
+    end: datetime,
+    interval: str,
+    platform: str = "news",
+) -> dict[datetime, list]:
+    """
+    {bucket_start: [count, sentiment_sum, sentiment_count]} for [start, end).
+
+    Hour and day buckets read whole hours from the hourly rollup where it covers
+    the range and fall back to grouping social_mentions for the edges it doesn't.
+    """
+    acc: dict[datetime, list] = {}
+    raw_ranges = [(start, end)]
+
+    covered = rollup_range(session, platform) if interval != "minute" else None
+    if covered:
+        lo = _ceil_hour(max(start, covered[0]))
+        hi = truncate_hour(min(end, covered[1]))
+        if lo < hi:
+            _rollup_buckets(session, acc, symbol, lo, hi, interval, platform)
+            raw_ranges = [(start, lo), (hi, end)]
+
+    for r_start, r_end in raw_ranges:
+        if r_start < r_end:
+            _raw_buckets(session, acc, symbol, r_start, r_end, interval, platform)
+    return acc
+
+
+def build_points(acc: dict[datetime, list], interval: str = "hour", prior: dict[datetime, list] | None = None) -> list[dict]:
+    """
+    Turn bucket sums into chart points.
+
+    mean_sentiment is the bucket's own average. vw_sentiment averages every
+    scored mention in the VW_WINDOW buckets ending with this one, so each
+    bucket counts in proportion to its volume: busy hours pull it harder than
+    quiet ones. The window has a fixed length, so a bucket's value doesn't
+    depend on where the requested range starts. `prior` holds the buckets
+    before the range that the first windows reach back into.
+    """
+    combined: dict[datetime, list] = {}
+    for source in (prior or {}, acc):
+        for t, (_, s_sum, s_count) in source.items():
+            cur = combined.setdefault(t, [0.0, 0])
+            cur[0] += s_sum
+            cur[1] += s_count
+
+    span = INTERVALS[interval] * VW_WINDOW
+    window: deque = deque()
+    w_sum, w_n = 0.0, 0
+    points = []
+    for t in sorted(combined):
+        s_sum, s_count = combined[t]
+        window.append((t, s_sum, s_count))
+        w_sum += s_sum
+        w_n += s_count
+        while window[0][0] <= t - span:
+            _, old_sum, old_n = window.popleft()
+            w_sum -= old_sum
+            w_n -= old_n
+        if t not in acc:
+            continue
+        count, b_sum, b_n = acc[t]
+        points.append({
+            "t": t.isoformat(),
+            "count": count,
+            "mean_sentiment": b_sum / b_n if b_n else None,
+            "vw_sentiment": w_sum / w_n if w_n else None,
+        })
+    return points
+
+
+def lttb_indices(xs: list[float], ys: list[float], threshold: int) -> list[int]:
+    """Largest-Triangle-Three-Buckets: indices of `threshold` visually representative points."""
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        span = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / span
+        avg_y = sum(ys[avg_start:avg_end]) / span
+
+        range_start = int(i * every) + 1
+        range_end = int((i + 1) * every) + 1
+        ax, ay = xs[a], ys[a]
+        best, best_area = range_start, -1.0
+        for j in range(range_start, range_end):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+def minmax_indices(ys: list[float], threshold: int) -> list[int]:
+    """Keep the min and max of each of threshold/2 equal chunks, in time order."""
+    n = len(ys)
+    if threshold >= n or threshold < 2:
+        return list(range(n))
+
+    chunks = threshold // 2
+    size = n / chunks
+    selected = []
+    for c in range(chunks):
+        lo = int(c * size)
+        hi = int((c + 1) * size) if c < chunks - 1 else n
+        idx = range(lo, hi)
+        selected.extend(sorted({min(idx, key=ys.__getitem__), max(idx, key=ys.__getitem__)}))
+    return selected
+
+
+def downsample(points: list[dict], max_points: int, method: str = "lttb") -> list[dict]:
+    if len(points) <= max_points:
+        return points
+    xs = [datetime.fromisoformat(p["t"]).timestamp() for p in points]
+    ys = [p["mean_sentiment"] or 0.0 for p in points]
+    if method == "minmax":
+        idx = minmax_indices(ys, max_points)
+    else:
+        idx = lttb_indices(xs, ys, max_points)
+    return [points[i] for i in idx]
+
+
+def sentiment_timeseries(
+    session,
+    symbol: str,
+    start: datetime,
+    end: datetime,
+    interval: str = "hour",
+    max_points: int = DEFAULT_MAX_POINTS,
+    method: str = "lttb",
+    platform: str = "news",
+) -> dict:
+    interval = effective_interval(start, end, interval)
+    acc = load_buckets(session, symbol, start, end, interval, platform)
+    lookback = bucket_floor(start, interval) - INTERVALS[interval] * (VW_WINDOW - 1)
+    prior = load_buckets(session, symbol, lookback, start, interval, platform) if acc else {}
+    points = build_points(acc, interval, prior)
+    max_points = max(3, min(max_points, MAX_POINTS))
+    sampled = downsample(points, max_points, method)
+    return {
+        "symbol": symbol,
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "interval": interval,
+        "buckets": len(points),
+        "downsampled": len(sampled) < len(points),
+        "points": sampled,
+    }
@@ -0,0 +1,276 @@
+# src/tracing.py
+"""
+Lightweight span tracing.
+
+Spans nest through a contextvar, so `with span("fetch_quote"):` anywhere
+under a request or job becomes a child of it. Trace context travels as a
+W3C `traceparent` string: from the browser/proxy header into the request,
+from the request into RQ job meta, and into collector scripts run by hand
+or cron through the TRACEPARENT env var.
+
+Finished traces go to the exporter picked by TRACE_EXPORTER:
+  none     (default) keep spans only for the Server-Timing header
+  console  one line per span on stderr
+  file     OTLP-shaped JSON lines appended to TRACE_FILE (default traces.jsonl)
+  otlp     OTLP/HTTP JSON to OTEL_EXPORTER_OTLP_ENDPOINT (default http://localhost:4318)
+"""
+import json
+import os
+import queue
+import re
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "sentiment-scraper")
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+_current: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "error", "_finished", "_local_root")
+
+    def __init__(self, name: str, trace_id: str, parent_id: str | None, local_root: "Span | None"):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = {}
+        self.error = None
+        # spans finished so far in this process for this trace, kept on the local root
+        self._finished = [] if local_root is None else None
+        self._local_root = local_root or self
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    @property
+    def finished_spans(self) -> list["Span"]:
+        return self._local_root._finished
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": [_otlp_attr(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otlp_attr(key, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    m = _TRACEPARENT_RE.match((value or "").strip().lower())
+    if not m or set(m.group(1)) == {"0"}:
+        return None
+    return m.group(1), m.group(2)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def current_traceparent() -> str | None:
+    s = _current.get()
+    return s.traceparent if s else None
+
+
+def start_span(name: str, traceparent: str | None = None, **attributes) -> tuple[Span, object]:
+    """
+    Start a span under the current one, or continue `traceparent` if there is
+    no current span, or start a new trace. Returns (span, token) for end_span.
+    """
+    parent = _current.get()
+    if parent is not None:
+        s = Span(name, parent.trace_id, parent.span_id, parent._local_root)
+    else:
+        remote = parse_traceparent(traceparent)
+        trace_id, parent_id = remote if remote else (secrets.token_hex(16), None)
+        s = Span(name, trace_id, parent_id, None)
+    s.attributes.update(attributes)
+    return s, _current.set(s)
+
+
+def end_span(s: Span, token) -> None:
+    s.end_ns = time.time_ns()
+    s.finished_spans.append(s)
+    _current.reset(token)
+    if s._local_root is s:
+        export(s.finished_spans)
+
+
+@contextmanager
+def span(name: str, traceparent: str | None = None, **attributes):
+    s, token = start_span(name, traceparent, **attributes)
+    try:
+        yield s
+    except BaseException as exc:
+        s.error = type(exc).__name__
+        raise
+    finally:
+        end_span(s, token)
+
+
+def server_timing(root: Span) -> str:
+    """Server-Timing header value: time per span name (children summed) plus the total."""
+    totals: dict[str, float] = {}
+    for s in root.finished_spans:
+        if s is root:
+            continue
+        key = re.sub(r"[^A-Za-z0-9_-]+", "_", s.name).strip("_") or "span"
+        totals[key] = totals.get(key, 0.0) + s.duration_ms
+    parts = [f"{name};dur={ms:.1f}" for name, ms in totals.items()]
+    parts.append(f"total;dur={root.duration_ms:.1f}")
+    return ", ".join(parts)
+
+
+# ---- exporters ---------------------------------------------------------------
+
+class _ConsoleExporter:
+    def export(self, spans):
+        for s in spans:
+            print(
+                f"[trace {s.trace_id[:8]}] {s.name} {s.duration_ms:.1f}ms"
+                + (f" error={s.error}" if s.error else "")
+                + (f" {s.attributes}" if s.attributes else ""),
+                file=sys.stderr,
+            )
+
+
+class _FileExporter:
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def export(self, spans):
+        lines = "".join(json.dumps(dict(s.to_otlp(), service=SERVICE_NAME)) + "\n" for s in spans)
+        with self.lock, open(self.path, "a") as f:
+            f.write(lines)
+
+
+class _OtlpHttpExporter:
+    """Ships spans as OTLP/HTTP JSON from a background thread so requests never wait on it."""
+
+    def __init__(self, endpoint: str):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.q = queue.Queue(maxsize=10_000)
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def export(self, spans):
+        try:
+            self.q.put_nowait([s.to_otlp() for s in spans])
+        except queue.Full:
+            pass
+
+    def _run(self):
+        import requests
+
+        while True:
+            batch = self.q.get()
+            while not self.q.empty() and len(batch) < 512:
+                batch.extend(self.q.get_nowait())
+            payload = {"resourceSpans": [{
+                "resource": {"attributes": [_otlp_attr("service.name", SERVICE_NAME)]},
+                "scopeSpans": [{"scope": {"name": "src.tracing"}, "spans": batch}],
+            }]}
+            try:
+                requests.post(self.url, json=payload, timeout=5)
+            except Exception:
+                pass
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def _build_exporter():
+    kind = os.getenv("TRACE_EXPORTER", "none").strip().lower()
+    if kind == "console":
+        return _ConsoleExporter()
+    if kind == "file":
+        return _FileExporter(os.getenv("TRACE_FILE", "traces.jsonl"))
+    if kind == "otlp":
+        return _OtlpHttpExporter(os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318"))
+    return None
+
+
+def export(spans: list[Span]) -> None:
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                _exporter = _build_exporter() or False
+    if _exporter:
+        try:
+            _exporter.export(spans)
+        except Exception:
+            pass
+
+
+def reset_exporter() -> None:
+    """Re-read TRACE_EXPORTER on the next export (tests, forked workers)."""
+    global _exporter
+    _exporter = None
+
+
+def init_app(app):
+    """One root span per request, continued from an incoming traceparent; adds Server-Timing."""
+    from flask import g, request
+
+    @app.before_request
+    def _start_request_span():
+        rule = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        g.trace_span, g.trace_token = start_span(
+            f"{request.method} {rule}",
+            traceparent=request.headers.get("traceparent"),
+            **{"http.method": request.method, "http.route": rule},
+        )
+
+    @app.after_request
+    def _server_timing(response):
+        root = g.get("trace_span")
+        if root is not None:
+            root.set_attribute("http.status_code", response.status_code)
+            response.headers["Server-Timing"] = server_timing(root)
+            response.headers["traceresponse"] = root.traceparent
+        return response
+
+    @app.teardown_request
+    def _end_request_span(exc):
+        root = g.pop("trace_span", None)
+        if root is not None:
+            if exc is not None:
+                root.error = type(exc).__name__
+            end_span(root, g.pop("trace_token"))
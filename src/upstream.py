@@ -0,0 +1,118 @@
+# src/upstream.py
+"""
+Outbound HTTP to the data providers (Finnhub, Stooq, GDELT, and the RSS and
+Reddit source adapters).
+
+Every call goes through one process-wide Session and through the provider's
+circuit breaker. The breakers live in Redis (src/breaker.py), so once
+UPSTREAM_BREAKER_FAILURES calls to a provider fail within
+UPSTREAM_BREAKER_RESET_SECONDS, every web and worker process gets
+UpstreamUnavailable at once instead of waiting out its own timeouts. After
+the reset window one process probes the provider again.
+
+Timeouts, connection errors, 5xx and 429 count as failures; other responses
+count as successes, including 4xx the caller will reject itself.
+"""
+import os
+import time
+
+import redis
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import tracing
+from .breaker import SharedCircuitBreaker, shared_names
+from .monitoring import UPSTREAM_LATENCY, UPSTREAM_REJECTED
+from .queue import QUEUE_PREFIX, get_redis_conn
+
+# kept-alive connections per upstream host (Finnhub, Stooq, GDELT)
+POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", "10"))
+
+# plus one "rss:<host>" breaker per feed host (src/sources/rss.py)
+PROVIDERS = ("finnhub", "stooq", "gdelt", "reddit")
+BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5"))
+BREAKER_RESET_SECONDS = float(os.getenv("UPSTREAM_BREAKER_RESET_SECONDS", "60"))
+
+_session: requests.Session | None = None
+_breakers: dict[str, SharedCircuitBreaker] = {}
+
+
+class UpstreamUnavailable(Exception):
+    """The provider's breaker is open; the call was not attempted."""
+
+    def __init__(self, provider: str):
+        super().__init__(f"{provider} circuit breaker is open")
+        self.provider = provider
+
+
+def breaker(provider: str) -> SharedCircuitBreaker:
+    if provider not in _breakers:
+        _breakers[provider] = SharedCircuitBreaker(
+            provider, get_redis_conn, QUEUE_PREFIX,
+            failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET_SECONDS,
+        )
+    return _breakers[provider]
+
+
+def breaker_states() -> dict[str, str]:
+    """
+    closed | half_open | open per provider, for /health. Per-host breakers
+    are listed once this process has used them or any process has recorded
+    a failure on them.
+    """
+    names = set(_breakers)
+    conn = get_redis_conn()
+    if conn is not None:
+        try:
+            names |= shared_names(conn, QUEUE_PREFIX)
+        except redis.RedisError:
+            pass
+    return {p: breaker(p).state for p in (*PROVIDERS, *sorted(names - set(PROVIDERS)))}
+
+
+def session() -> requests.Session:
+    """Process-wide Session, so repeat calls to a provider reuse TCP/TLS connections."""
+    global _session
+    if _session is None:
+        s = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        _session = s
+    return _session
+
+
+def _reset_after_fork():
+    # a forked child must not share its parent's sockets; it builds its own pool on first use
+    global _session
+    _session = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get(provider: str, url: str, **kwargs) -> requests.Response:
+    """
+    GET through the shared session; records latency under upstream_request_duration_seconds{provider,status}
+    and as a `<provider>` span in the current trace. Raises UpstreamUnavailable without calling out while
+    the provider's breaker is open.
+    """
+    b = breaker(provider)
+    if not b.allow():
+        UPSTREAM_REJECTED.labels(provider).inc()
+        raise UpstreamUnavailable(provider)
+    with tracing.span(provider, **{"http.url": url}) as s:
+        t0 = time.perf_counter()
+        try:
+            r = session().get(url, **kwargs)
+        except requests.RequestException:
+            UPSTREAM_LATENCY.labels(provider, "error").observe(time.perf_counter() - t0)
+            b.record_failure()
+            raise
+        UPSTREAM_LATENCY.labels(provider, str(r.status_code)).observe(time.perf_counter() - t0)
+        s.set_attribute("http.status_code", r.status_code)
+        if r.status_code >= 500 or r.status_code == 429:
+            b.record_failure()
+        else:
+            b.record_success()
+        return r
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+from flask_migrate import upgrade
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from src.app import create_app
+from src.db import db
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.sqlite3'}")
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# a throwaway database: the fixture drops and recreates its public schema
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL", "postgresql://localhost/sentiment_test")
+
+
+@pytest.fixture
+def live_postgres(monkeypatch):
+    engine = create_engine(TEST_POSTGRES_URL)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("DROP SCHEMA public CASCADE"))
+            conn.execute(text("CREATE SCHEMA public"))
+    except OperationalError:
+        pytest.skip("needs a local Postgres")
+    finally:
+        engine.dispose()
+    monkeypatch.setenv("DATABASE_URL", TEST_POSTGRES_URL)
+    monkeypatch.delenv("DATABASE_REPLICA_URL", raising=False)
+    app = create_app()
+    with app.app_context():
+        upgrade()
+        yield app
+        db.session.remove()
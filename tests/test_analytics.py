@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from src.analytics import (
+    clear_cache,
+    forward_fill,
+    lagged_cross_correlation,
+    rolling_corr,
+    rolling_zscore,
+)
+from src.db import db
+from src.models import SocialMention, StockQuote
+
+
+def test_rolling_corr_matches_corrcoef():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=200)
+    y = 0.5 * x + rng.normal(size=200)
+    x[17] = np.nan
+    out = rolling_corr(x, y, 24)
+    assert np.isnan(out[:23]).all()
+    for i in (23, 60, 199):
+        xs, ys = x[i - 23:i + 1], y[i - 23:i + 1]
+        mask = np.isfinite(xs)
+        expected = np.corrcoef(xs[mask], ys[mask])[0, 1]
+        assert abs(out[i] - expected) < 1e-9
+
+
+def test_lagged_cross_correlation_finds_lead():
+    rng = np.random.default_rng(1)
+    sentiment = rng.normal(size=500)
+    returns = np.roll(sentiment, 3) + 0.1 * rng.normal(size=500)  # price follows 3h later
+    xcorr = lagged_cross_correlation(sentiment, returns, 6)
+    best = max(xcorr, key=lambda c: c["corr"])
+    assert best["lag_hours"] == 3
+
+
+def test_rolling_zscore_flags_spike_and_forward_fill():
+    counts = np.ones(100) + np.tile([0.0, 1.0], 50)
+    counts[80] = 40
+    z = rolling_zscore(counts, 24)
+    assert np.nanargmax(z) == 80
+    assert z[80] > 3
+
+    filled = forward_fill(np.array([np.nan, 1.0, np.nan, 2.0, np.nan]))
+    assert np.isnan(filled[0])
+    assert list(filled[1:]) == [1.0, 1.0, 2.0, 2.0]
+
+
+def test_api_analytics_aligns_series(client):
+    clear_cache()
+    start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(hours=72)
+    for h in range(72):
+        score = float(np.sin(h / 5))
+        db.session.add(SocialMention(
+            platform="news", source="gdelt", symbol="AAPL",
+            created_at=start + timedelta(hours=h, minutes=5), text="t", url=f"u{h}", sentiment=score,
+        ))
+        db.session.add(StockQuote(
+            symbol="AAPL.US", close=100 + h + score, market_ts=start + timedelta(hours=h, minutes=30),
+        ))
+    db.session.commit()
+
+    data = client.get("/api/analytics", query_string={"symbol": "AAPL", "window": "3d", "roll": 12}).get_json()
+    assert data["quote_symbol"] == "AAPL.US"
+    assert data["overall_corr"] is not None
+    assert len(data["cross_correlation"]) == 49
+    assert any(c is not None for c in data["rolling_corr"]["corr"])
+
+    assert client.get("/api/analytics", query_string={"symbol": "AAPL", "roll": 1}).status_code == 400
@@ -0,0 +1,96 @@
+import os
+import time
+
+import pytest
+import redis
+
+from src import queue as q
+from src.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+def test_breaker_opens_then_half_opens(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    b = CircuitBreaker("unit", failure_threshold=2, reset_timeout=10)
+
+    b.record_failure()
+    assert b.allow() and b.state == CLOSED
+    b.record_failure()
+    assert b.state == OPEN and not b.allow() and b.rejecting()
+
+    clock[0] += 10
+    assert not b.rejecting()
+    assert b.allow() and b.state == HALF_OPEN
+    assert not b.allow()  # only one trial call
+    b.record_failure()
+    assert b.state == OPEN
+
+    clock[0] += 10
+    assert b.allow()
+    b.record_success()
+    assert b.state == CLOSED
+
+
+@pytest.fixture
+def dead_redis(monkeypatch):
+    monkeypatch.setenv("REDIS_URL", "redis://127.0.0.1:1/0")  # nothing listens on port 1
+    monkeypatch.setattr(q, "_pool", None)
+    q.redis_breaker.reset()
+    yield
+    q.redis_breaker.reset()
+
+
+def test_collect_skips_redis_once_breaker_opens(client, dead_redis, monkeypatch):
+    ran = []
+    monkeypatch.setattr("src.app.run_collectors_task", ran.append)
+    for _ in range(q.redis_breaker.failure_threshold):
+        assert client.post("/collect", data={"symbol": "AAPL"}).get_json()["status"] == "ran_inline"
+    assert q.redis_breaker.state == OPEN
+
+    # no connection attempt at all now
+    assert q.get_redis_conn() is None
+    assert client.post("/collect", data={"symbol": "AAPL"}).get_json()["status"] == "ran_inline"
+    assert client.get("/api/job/abc").status_code == 503
+    assert len(ran) == q.redis_breaker.failure_threshold + 1
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.pid = os.getpid()
+
+    def connect(self):
+        pass
+
+    def can_read(self):
+        return False
+
+    def disconnect(self):
+        pass
+
+
+def test_pool_exhaustion_is_not_a_redis_failure(monkeypatch):
+    q.redis_breaker.reset()
+    pool = q.BreakerConnectionPool(max_connections=1, timeout=0.01)
+    monkeypatch.setattr(pool, "make_connection", _FakeConnection)
+    held = pool.get_connection("PING")
+    for _ in range(q.redis_breaker.failure_threshold + 1):
+        with pytest.raises(redis.ConnectionError, match=q.POOL_EXHAUSTED):
+            pool.get_connection("PING")
+    assert q.redis_breaker.state == CLOSED
+    pool.release(held)
+
+
+def test_any_error_during_the_trial_reopens(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    q.redis_breaker.reset()
+    for _ in range(q.redis_breaker.failure_threshold):
+        q.redis_breaker.record_failure()
+    clock[0] += q.redis_breaker.reset_timeout
+
+    pool = q.BreakerConnectionPool(max_connections=1, timeout=0.01)
+    monkeypatch.setattr(pool, "make_connection", lambda: (_ for _ in ()).throw(OSError("bad fd")))
+    with pytest.raises(OSError):
+        pool.get_connection("PING")
+    assert q.redis_breaker.state == OPEN  # not stuck half-open
+    q.redis_breaker.reset()
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+from src import clustering
+from src.db import db
+from src.models import SocialMention
+from src.sources import Mention, store_mentions
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+SINCE = NOW - timedelta(days=1)
+
+SYNDICATED = [
+    "Apple beats estimates as iPhone sales climb - Reuters",
+    "Apple beats estimates as iPhone sales climb | CNBC",
+    "Apple beats estimates as strong iPhone sales climb",
+]
+
+
+def _mentions(titles, start=0):
+    return [
+        Mention("news", "gdelt", f"https://example.com/{start + i}", NOW - timedelta(minutes=i), t)
+        for i, t in enumerate(titles)
+    ]
+
+
+def test_signatures_separate_near_duplicates_from_other_stories():
+    existing, head = clustering.assign_clusters(
+        SYNDICATED + ["Nvidia slides on export curbs", "Nvidia slides on new export curbs - Bloomberg"],
+        recent=[("Tesla recalls 2 million cars", 7)],
+    )
+    assert existing == [None] * 5
+    assert head == [None, 0, 0, None, 3]
+
+
+def test_ingest_assigns_cluster_ids(app):
+    store_mentions("AAPL", _mentions(SYNDICATED + ["Apple unveils new Macs"]), SINCE, "test", company="Apple Inc")
+    rows = {r.text: r for r in db.session.query(SocialMention)}
+    first = rows[SYNDICATED[0]]
+    assert first.cluster_id is None
+    assert rows[SYNDICATED[1]].cluster_id == rows[SYNDICATED[2]].cluster_id == first.id
+    assert rows["Apple unveils new Macs"].cluster_id is None
+
+    # a later batch joins the stored cluster
+    store_mentions("AAPL", _mentions(["Apple beats estimates as iPhone sales climb - AP"], start=10), SINCE, "test", company="Apple Inc")
+    late = db.session.query(SocialMention).filter(SocialMention.url == "https://example.com/10").one()
+    assert late.cluster_id == first.id
+
+
+def test_report_counts_clusters(client):
+    store_mentions("AAPL", _mentions(SYNDICATED + ["Apple unveils new Macs"]), SINCE, "test", company="Apple Inc")
+    assert "<div class=\"val\">4</div>" in client.get("/report?symbol=AAPL").get_data(as_text=True)
+    page = client.get("/report?symbol=AAPL&count=clusters").get_data(as_text=True)
+    assert "News stories" in page and "<div class=\"val\">2</div>" in page
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.compare import parse_window
+from src.db import db
+from src.models import SocialMention, StockQuote
+
+
+def test_parse_window():
+    assert parse_window("90m") == timedelta(minutes=90)
+    assert parse_window("7d") == timedelta(days=7)
+    assert parse_window(None) == timedelta(hours=24)
+    with pytest.raises(ValueError):
+        parse_window("0h")
+    with pytest.raises(ValueError):
+        parse_window("1w")
+
+
+def test_api_compare_groups_per_symbol(client):
+    now = datetime.utcnow()
+    for sym, scores in {"AAPL": [0.5, 0.5, -0.5], "MSFT": [0.0]}.items():
+        for i, score in enumerate(scores):
+            db.session.add(SocialMention(
+                platform="news", source="gdelt", symbol=sym,
+                created_at=now - timedelta(minutes=i), text="t", url=f"u{i}", sentiment=score,
+            ))
+    db.session.add(StockQuote(symbol="AAPL.US", close=100.0, market_ts=now - timedelta(hours=2)))
+    db.session.add(StockQuote(symbol="AAPL.US", close=101.0, market_ts=now))
+    db.session.commit()
+
+    data = client.get("/api/compare", query_string={"symbols": "aapl,MSFT,NVDA"}).get_json()
+    by_symbol = {row["symbol"]: row for row in data["symbols"]}
+
+    assert by_symbol["AAPL"]["count"] == 3
+    assert by_symbol["AAPL"]["buckets"] == {"pos": 2, "neu": 0, "neg": 1}
+    assert by_symbol["AAPL"]["latest_close"] == 101.0
+    assert by_symbol["MSFT"]["buckets"] == {"pos": 0, "neu": 1, "neg": 0}
+    assert by_symbol["MSFT"]["latest_close"] is None
+    assert by_symbol["NVDA"]["count"] == 0
+    assert by_symbol["NVDA"]["avg_sentiment"] is None
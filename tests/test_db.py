@@ -0,0 +1,46 @@
+import pytest
+from flask_migrate import check, upgrade
+from sqlalchemy import text
+
+from src.app import create_app
+from src.db import TimedQueuePool, db, engine_options
+
+
+def test_engine_options_per_role_and_env_override(monkeypatch):
+    web = engine_options("postgresql://u:p@h/db", role="web")
+    worker = engine_options("postgresql://u:p@h/db", role="worker")
+    assert web["poolclass"] is TimedQueuePool
+    assert web["pool_pre_ping"] is True
+    assert web["pool_size"] > worker["pool_size"]
+    assert web["connect_args"]["options"] == "-c statement_timeout=15000"
+    assert web["connect_args"]["application_name"] == "sentiment-scraper:web"
+
+    monkeypatch.setenv("DB_POOL_SIZE", "3")
+    monkeypatch.setenv("DB_POOL_SIZE_WORKER", "7")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS_WEB", "0")
+    assert engine_options("postgresql://u:p@h/db", role="web")["pool_size"] == 3
+    assert engine_options("postgresql://u:p@h/db", role="worker")["pool_size"] == 7
+    assert "options" not in engine_options("postgresql://u:p@h/db", role="web")["connect_args"]
+
+    assert engine_options("sqlite://", role="web") == {}
+
+
+def test_sqlite_connections_get_wal_pragmas(app):
+    assert isinstance(db.engine.pool, TimedQueuePool)
+    with db.engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+
+
+def test_migrated_sqlite_schema_matches_the_models(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'migrated.sqlite3'}")
+    with create_app().app_context():
+        upgrade()
+        check()  # exits non-zero if autogenerate would emit anything (e.g. drop social_mentions_fts)
+        db.session.remove()
+
+
+@pytest.mark.postgres
+def test_migrated_postgres_schema_matches_the_models(live_postgres):
+    check()  # search_vector, its GIN index and the partitions are left alone
@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import text
+
+from src import health
+from src.db import db
+
+
+@pytest.fixture
+def no_redis(monkeypatch):
+    monkeypatch.setattr(health, "CACHE_SECONDS", 0)
+    monkeypatch.setattr(health, "connection_pool", lambda: None)
+    monkeypatch.setattr(health, "get_redis_conn", lambda: None)
+    monkeypatch.setattr(health.upstream, "breaker_states", lambda: {"gdelt": "closed"})
+
+
+def test_health_probes_db(client, no_redis):
+    body = client.get("/health").get_json()
+    assert body["status"] == "ok"
+    assert body["checks"]["db"]["status"] == "ok"
+    assert body["checks"]["db"]["latency_ms"] >= 0
+    assert body["checks"]["redis"] == {"status": "disabled"}
+
+
+def test_ready_fails_only_on_required_dependencies(client, no_redis, monkeypatch):
+    monkeypatch.setattr(health, "connection_pool", lambda: object())  # configured but unreachable
+    resp = client.get("/ready")
+    assert resp.status_code == 200
+    assert resp.get_json()["status"] == "degraded"
+    assert resp.get_json()["checks"]["workers"] == {"status": "down"}
+
+    monkeypatch.setenv("READY_REQUIRES", "db,redis")
+    assert client.get("/ready").status_code == 503
+
+
+def test_db_failure_drains(client, no_redis, monkeypatch):
+    def broken():
+        raise ConnectionError("db gone")
+
+    monkeypatch.setattr(health, "probe_db", broken)
+    resp = client.get("/ready")
+    assert resp.status_code == 503
+    assert resp.get_json()["checks"]["db"]["error"] == "ConnectionError"
+    assert client.get("/health").status_code == 200  # liveness stays up
+
+
+def test_probes_are_cached(client, no_redis, monkeypatch):
+    monkeypatch.setattr(health, "CACHE_SECONDS", 60)
+    monkeypatch.setattr(health, "_cache", {"checked": float("-inf"), "checks": None})
+    calls = []
+    monkeypatch.setattr(health, "probe_db", lambda: calls.append(1) or {"status": "ok"})
+    for _ in range(5):
+        client.get("/ready")
+        client.get("/health")
+    assert len(calls) == 1
+
+
+def test_health_serves_the_last_round_while_another_request_probes(client, no_redis, monkeypatch):
+    monkeypatch.setattr(health, "_cache", {"checked": float("-inf"), "checks": None})
+    assert client.get("/health").get_json()["checks"]["db"]["status"] == "ok"
+
+    class Busy:  # a /ready round stuck on a hung database holds the lock
+        def acquire(self, blocking=True):
+            assert not blocking, "/health waited for another request's probes"
+            return False
+
+    monkeypatch.setattr(health, "_lock", Busy())
+    assert client.get("/health").get_json()["checks"]["db"]["status"] == "ok"
+
+
+def test_sqlite_probe_uses_the_app_engine(app):
+    assert health.probe_engine() is db.engine
+
+
+@pytest.mark.postgres
+def test_postgres_probe_has_its_own_short_timeouts(live_postgres, monkeypatch):
+    monkeypatch.setattr(health, "PROBE_TIMEOUT", 1.5)
+    monkeypatch.setattr(health, "_probe_engines", {})
+    engine = health.probe_engine()
+    assert engine is not db.engine
+    with engine.connect() as conn:
+        assert conn.execute(text("SHOW statement_timeout")).scalar() == "1500ms"
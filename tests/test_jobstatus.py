@@ -0,0 +1,71 @@
+import pytest
+import redis
+
+from src import jobstatus, queue as q
+from src.tasks import _run_collector
+
+
+def test_run_collector_reports_counts_and_error_class(app):
+    def ok(symbol, app=None):
+        return {"symbol": symbol, "inserted": 3, "duplicate": 1, "close": 10.5}
+
+    def boom(symbol, app=None):
+        raise TimeoutError("slow upstream")
+
+    assert _run_collector("collector_news_gdelt", ok, "AAPL", app) == (0, {"news_inserted": 3, "news_duplicate": 1})
+    assert _run_collector("collector_quote", boom, "AAPL", app) == (1, {"error": "quote:TimeoutError"})
+
+
+def test_job_ids_are_validated():
+    assert jobstatus.valid_job_id("0f3c9a2e-1b2c")
+    assert not jobstatus.valid_job_id("a:b")
+    assert not jobstatus.valid_job_id("x" * 65)
+
+
+def test_queued_record_is_written_before_the_job_exists(monkeypatch):
+    events = []
+
+    class RecordingQueue:
+        connection = None
+
+        def enqueue(self, func, *args, job_id=None, **kwargs):
+            events.append(("enqueue", job_id))
+            return job_id
+
+    monkeypatch.setattr(jobstatus, "mark_queued", lambda conn, job_id, symbol: events.append(("queued", job_id)))
+    job_id = jobstatus.enqueue(RecordingQueue(), print, "AAPL", symbol="AAPL")
+    # a worker can only see the job once it is enqueued, and by then "queued" is already stored
+    assert events == [("queued", job_id), ("enqueue", job_id)] and jobstatus.valid_job_id(job_id)
+
+
+def test_batch_endpoint_limits(client):
+    assert client.get("/api/jobs").status_code == 400
+    ids = ",".join(f"j{i}" for i in range(jobstatus.MAX_BATCH + 1))
+    assert client.get(f"/api/jobs?ids={ids}").status_code == 400
+
+
+@pytest.fixture
+def live_redis(monkeypatch):
+    conn = redis.Redis.from_url("redis://localhost:6379/15")
+    try:
+        conn.ping()
+    except redis.ConnectionError:
+        pytest.skip("needs a local Redis")
+    monkeypatch.setenv("REDIS_URL", "redis://localhost:6379/15")
+    monkeypatch.setattr(q, "_pool", None)
+    conn.flushdb()
+    yield conn
+    conn.flushdb()
+
+
+def test_status_round_trip(client, live_redis):
+    jobstatus.mark_queued(live_redis, "job1", "AAPL")
+    jobstatus.update(live_redis, "job1", status="finished", stage="done", news_inserted=4, duration_ms=850)
+    assert 0 < live_redis.ttl(jobstatus.status_key("job1")) <= jobstatus.STATUS_TTL
+
+    data = client.get("/api/job/job1").get_json()
+    assert (data["status"], data["symbol"], data["news_inserted"], data["duration_ms"]) == ("finished", "AAPL", 4, 850)
+
+    jobs = client.get("/api/jobs?ids=job1,missing").get_json()["jobs"]
+    assert jobs["job1"]["stage"] == "done"
+    assert jobs["missing"]["status"] == "not_found"
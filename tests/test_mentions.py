@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from src.db import db
+from src.mentions import decode_cursor, encode_cursor, sentiment_bucket
+from src.models import SocialMention
+
+
+def _seed(n, symbol="AAPL"):
+    now = datetime.utcnow()
+    for i in range(n):
+        db.session.add(SocialMention(
+            platform="news",
+            source="gdelt",
+            symbol=symbol,
+            # two rows per timestamp so the id tie-breaker matters
+            created_at=now - timedelta(minutes=i // 2),
+            text=f"headline {i}",
+            url=f"https://example.com/{i}",
+            sentiment=[0.5, 0.0, -0.5][i % 3],
+        ))
+    db.session.commit()
+
+
+def test_cursor_roundtrip():
+    ts = datetime(2026, 1, 27, 18, 30, 0, 123456)
+    assert decode_cursor(encode_cursor(ts, 42)) == (ts, 42)
+
+
+def test_sentiment_bucket_thresholds():
+    assert sentiment_bucket(0.2) == "pos"
+    assert sentiment_bucket(-0.2) == "neg"
+    assert sentiment_bucket(0.1) == "neu"
+    assert sentiment_bucket(None) == "neu"
+
+
+def test_api_mentions_pages_without_gaps_or_repeats(client):
+    _seed(53)
+    seen = []
+    cursor = None
+    while True:
+        params = {"symbol": "aapl", "limit": 10}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get("/api/mentions", query_string=params).get_json()
+        seen.extend(item["id"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == 53
+    assert len(set(seen)) == 53
+
+
+def test_api_mentions_bucket_filter_and_bad_input(client):
+    _seed(9)
+    data = client.get("/api/mentions", query_string={"symbol": "AAPL", "bucket": "neg"}).get_json()
+    assert len(data["items"]) == 3
+    assert all(item["bucket"] == "neg" for item in data["items"])
+
+    assert client.get("/api/mentions", query_string={"symbol": "AAPL", "bucket": "meh"}).status_code == 400
+    assert client.get("/api/mentions", query_string={"symbol": "AAPL", "cursor": "!!"}).status_code == 400
@@ -0,0 +1,33 @@
+import socket
+
+import requests
+
+from src.monitoring import export_worker_metrics, track_query
+
+
+def test_metrics_label_by_route_template(client):
+    client.get("/api/mentions?symbol=AAPL")
+    client.get("/no/such/page/12345")
+    with track_query("unit_test_query"):
+        pass
+
+    body = client.get("/metrics").get_data(as_text=True)
+    assert 'route="/api/mentions"' in body
+    assert 'route="<unmatched>"' in body
+    assert "/no/such/page/12345" not in body
+    assert 'db_query_duration_seconds_count{query="mentions_page"}' in body
+    assert 'query="unit_test_query"' in body
+
+
+def test_worker_metrics_are_served_on_their_own_port(monkeypatch):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    monkeypatch.setenv("WORKER_METRICS_PORT", str(port))
+    monkeypatch.delenv("PROMETHEUS_PUSHGATEWAY_URL", raising=False)
+    assert export_worker_metrics() == {"port": port}
+
+    with track_query("worker_side_query"):
+        pass
+    body = requests.get(f"http://127.0.0.1:{port}/metrics", timeout=5).text
+    assert 'query="worker_side_query"' in body
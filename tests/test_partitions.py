@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from src.db import db
+from src.models import MentionRollup, SocialMention, SocialMentionArchive
+from src.partitions import apply_retention, ensure_partitions, next_period, partition_name, period_start
+from src.rollups import refresh_hourly_rollups, rolled_until
+from src.search import search_mentions
+from src.timeseries import load_buckets
+
+
+def test_period_helpers():
+    dt = datetime(2026, 12, 17, 15, 4)
+    assert period_start(dt, "month") == datetime(2026, 12, 1)
+    assert next_period(datetime(2026, 12, 1), "month") == datetime(2027, 1, 1)
+    assert next_period(datetime(2026, 12, 31), "day") == datetime(2027, 1, 1)
+    assert partition_name(datetime(2026, 3, 1), "month") == "social_mentions_y2026m03"
+    assert partition_name(datetime(2026, 3, 9), "day") == "social_mentions_y2026m03d09"
+
+
+def test_sqlite_retention_rolls_up_then_archives(app):
+    now = datetime(2026, 6, 30, 12)
+    for days_ago in (100, 95, 5):
+        for i in range(3):
+            db.session.add(SocialMention(
+                platform="news", source="gdelt", symbol="AAPL",
+                created_at=now - timedelta(days=days_ago) + timedelta(minutes=i),
+                text="t", url=f"u{days_ago}-{i}", sentiment=0.5,
+            ))
+    db.session.commit()
+
+    assert ensure_partitions(db.session, now=now) == []  # nothing to partition on SQLite
+    assert apply_retention(db.session, now=now, days=0)["removed_rows"] == 0
+
+    result = apply_retention(db.session, now=now, days=30, mode="rollup")
+    assert result["removed_rows"] == 6 and result["archived_rows"] == 6
+    assert db.session.query(SocialMention).count() == 3
+    assert db.session.query(SocialMentionArchive).count() == 6
+    assert db.session.query(MentionRollup).filter(MentionRollup.bucket_start < now - timedelta(days=30)).count() == 2
+    assert rolled_until(db.session) == datetime(2026, 5, 31)  # the retention horizon
+
+    # a later backfill over the removed range must not wipe what retention rolled up
+    refresh_hourly_rollups(db.session, now - timedelta(days=200), now)
+    acc = load_buckets(db.session, "AAPL", now - timedelta(days=120), now, "day")
+    assert sum(v[0] for v in acc.values()) == 9
+
+
+@pytest.mark.postgres
+def test_rows_stranded_in_default_get_their_partition(live_postgres):
+    # before any partition the migration created, so it lands in DEFAULT
+    backfilled = datetime(2020, 1, 15, 9)
+    db.session.add(SocialMention(
+        platform="news", source="gdelt", symbol="AAPL", created_at=backfilled,
+        text="Apple cuts guidance", url="u1", sentiment=-0.4,
+    ))
+    db.session.commit()
+
+    assert "social_mentions_y2020m01" in ensure_partitions(db.session, now=datetime(2026, 10, 19))
+    stranded = db.session.execute(text("SELECT count(*) FROM social_mentions_default")).scalar()
+    moved = db.session.execute(text("SELECT count(*) FROM social_mentions_y2020m01")).scalar()
+    assert (stranded, moved) == (0, 1)
+
+    # the generated search_vector survives the move
+    rows, _ = search_mentions(db.session, "guidance cut", symbol="AAPL")
+    assert [m.created_at for m, _ in rows] == [backfilled]
@@ -0,0 +1,60 @@
+import sys
+import threading
+import time
+
+from src.profiling import MAX_SECONDS, SamplingProfiler
+
+
+def _spin(stop):
+    while not stop.is_set():
+        sum(i * i for i in range(1000))
+
+
+def test_sampler_collapses_busy_thread_stacks():
+    stop = threading.Event()
+    t = threading.Thread(target=_spin, args=(stop,), name="busy worker")
+    t.start()
+    profiler = SamplingProfiler(interval=0.002).start()
+    time.sleep(0.2)
+    profiler.stop()
+    stop.set()
+    t.join()
+
+    assert profiler.samples > 10
+    lines = profiler.collapsed().splitlines()
+    busy = [line for line in lines if line.startswith("busy_worker;")]
+    assert busy and any("_spin (" in line for line in busy)
+    stack, count = busy[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+
+
+def test_debug_profile_is_hidden_and_token_protected(client, monkeypatch):
+    monkeypatch.delenv("PROFILE_TOKEN", raising=False)
+    assert client.get("/debug/profile?seconds=0.05").status_code == 404
+
+    monkeypatch.setenv("PROFILE_TOKEN", "s3cret")
+    assert client.get("/debug/profile?seconds=0.05").status_code == 401
+    assert client.get("/debug/profile?seconds=0.05", headers={"Authorization": "Bearer nope"}).status_code == 401
+
+    auth = {"Authorization": "Bearer s3cret"}
+    assert client.get("/debug/profile?seconds=9999", headers=auth).status_code == 400
+    assert client.get(f"/debug/profile?seconds={MAX_SECONDS + 1}", headers=auth).status_code == 400
+
+    # like a sync worker: the request thread is the only one there is
+    with monkeypatch.context() as m:
+        m.setattr(sys, "_current_frames", lambda: {threading.get_ident(): None})
+        r = client.get("/debug/profile?seconds=0.1", headers=auth)
+    assert r.status_code == 409 and "WEB_WORKER_CLASS" in r.get_json()["error"]
+
+    stop = threading.Event()
+    t = threading.Thread(target=_spin, args=(stop,), name="busy worker")
+    t.start()
+    try:
+        r = client.get("/debug/profile?seconds=0.1&interval_ms=2", headers=auth)
+    finally:
+        stop.set()
+        t.join()
+    assert r.status_code == 200
+    assert r.mimetype == "text/plain"
+    assert int(r.headers["X-Profile-Samples"]) > 0
+    assert "\nbusy_worker;" in "\n" + r.get_data(as_text=True)
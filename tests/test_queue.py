@@ -0,0 +1,38 @@
+import pytest
+import redis
+
+from src import queue as q
+
+
+def test_queue_names_and_priority_order():
+    conn = redis.Redis()  # connects lazily; nothing here touches the server
+    names = [queue.name for queue in q.get_queues(conn)]
+    assert names == [q.QUEUE_PREFIX, f"{q.QUEUE_PREFIX}:scheduled", f"{q.QUEUE_PREFIX}:backfill"]
+    with pytest.raises(ValueError):
+        q.queue_name("urgent")
+
+
+@pytest.fixture
+def live_redis():
+    conn = redis.Redis.from_url("redis://localhost:6379/15")
+    try:
+        conn.ping()
+    except redis.ConnectionError:
+        pytest.skip("needs a local Redis")
+    conn.flushdb()
+    yield conn
+    conn.flushdb()
+
+
+def test_feed_takes_turns_between_tenants(live_redis):
+    backfill = q.get_queue("backfill", live_redis)
+    q.enqueue_fair(backfill, "src.tasks.run_collectors_task", [(f"BIG{i}",) for i in range(50)], "big")
+    q.enqueue_fair(backfill, "src.tasks.run_collectors_task", [("AAPL",), ("MSFT",)], "small")
+
+    # the big batch filled the queue first; as it drains, the small tenant gets every other slot
+    for job in backfill.jobs[:4]:
+        job.delete()
+    assert q.feed(backfill, depth=q.FAIR_QUEUE_DEPTH) == 4
+    tenants = [job.meta["tenant"] for job in backfill.jobs[-4:]]
+    assert sorted(tenants) == ["big", "big", "small", "small"]
+    assert q.fair_backlog(backfill) == 50 - q.FAIR_QUEUE_DEPTH - 2
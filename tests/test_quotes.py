@@ -0,0 +1,50 @@
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from scripts.fetch_quote import parse_market_ts
+from src.analytics import hourly_close
+from src.db import db
+from src.models import StockQuote, StockQuoteDaily
+from src.quotes import downsample_daily, upsert_quote
+
+
+def test_parse_market_ts_converts_stooq_time_to_utc():
+    assert parse_market_ts("2026-01-27", "22:00:09") == datetime(2026, 1, 27, 21, 0, 9)   # CET
+    assert parse_market_ts("2026-07-01", "22:00:09") == datetime(2026, 7, 1, 20, 0, 9)    # CEST
+    assert parse_market_ts("N/D", "N/D") is None
+
+
+def test_upsert_skips_repeat_polls(app):
+    ts = datetime(2026, 5, 4, 15, 0)
+    row = {"symbol": "AAPL.US", "market_ts": ts, "fetched_at": ts, "close": 100.0, "volume": 5_000_000_000}
+    assert upsert_quote(db.session, row) == 1
+    assert upsert_quote(db.session, dict(row, fetched_at=ts + timedelta(minutes=1))) == 0
+    assert upsert_quote(db.session, dict(row, close=100.5, fetched_at=ts + timedelta(minutes=2))) == 1
+    db.session.commit()
+
+    # a correction moves fetched_at, so the incremental export picks it up again
+    stored = db.session.query(StockQuote).one()
+    assert (stored.close, stored.volume, stored.fetched_at) == (100.5, 5_000_000_000, ts + timedelta(minutes=2))
+
+
+def test_downsample_daily_folds_old_snapshots(app):
+    now = datetime(2026, 5, 20, 12)
+    for day, closes in ((datetime(2026, 5, 4), [10.0, 12.0, 11.0]), (datetime(2026, 5, 19), [20.0])):
+        for i, close in enumerate(closes):
+            upsert_quote(db.session, {
+                "symbol": "AAPL.US", "market_ts": day + timedelta(hours=14 + i), "fetched_at": now,
+                "open": 10.0, "high": close + 1, "low": close - 1, "close": close, "volume": 100 * (i + 1),
+            })
+    db.session.commit()
+
+    assert downsample_daily(db.session, now=now, days=7) == {"daily_bars": 1, "removed_quotes": 3}
+    bar = db.session.query(StockQuoteDaily).one()
+    assert (bar.day, bar.open, bar.high, bar.low, bar.close, bar.volume, bar.samples) == (
+        date(2026, 5, 4), 10.0, 13.0, 9.0, 11.0, 300, 3,
+    )
+    assert db.session.query(StockQuote).count() == 1
+
+    # analytics keeps a price for the downsampled day
+    close = hourly_close(db.session, "AAPL.US", datetime(2026, 5, 4), 24 * 16)
+    assert np.isnan(close[15]) and close[16] == 11.0 and close[-1] == 20.0
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src import relevance
+from src.sources import Mention, store_mentions
+
+
+def test_automaton_finds_overlapping_patterns():
+    a = relevance.Automaton({"he": "x", "she": "x", "his": "x", "hers": "x"})
+    assert sorted((end, p) for end, p, _ in a.matches("uSHErs")) == [(3, "he"), (3, "she"), (5, "hers")]
+
+
+@pytest.mark.parametrize("text, relevant", [
+    ("Apple beats estimates", True),
+    ("Apple's services revenue hits record", True),
+    ("AAPL slips premarket", True),
+    ("Why $aapl could rally", True),
+    ("Pineapple prices soar", False),
+    ("Snapple maker sold", False),
+    ("aapl lowercase is not the ticker", False),
+])
+def test_matcher(text, relevant):
+    assert relevance.matcher("AAPL", "Apple Inc.").is_relevant(text) is relevant
+
+
+def test_common_word_ticker_needs_cashtag_or_name():
+    m = relevance.matcher("ON", "ON Semiconductor Corp")
+    assert not m.is_relevant("Stocks move ON news of rate cut")
+    assert m.is_relevant("$ON jumps after earnings")
+    assert m.is_relevant("onsemi? No: ON Semiconductor raises guidance")
+    assert not relevance.matcher("ON").usable
+
+
+def test_unknown_company_name_disables_the_filter(app, monkeypatch):
+    assert not relevance.matcher("AAPL").usable
+    now = datetime.now(timezone.utc)
+    mentions = [Mention("news", "gdelt", "https://example.com/1", now, "Apple beats estimates")]
+    monkeypatch.setattr("src.app.score_sentiments", lambda texts: [0.0] * len(texts))
+    counts = store_mentions("AAPL", mentions, now - timedelta(days=1), "test", company="")
+    assert (counts["inserted"], counts["irrelevant"]) == (1, 0)
+
+
+def test_irrelevant_mentions_are_dropped_before_scoring(app, monkeypatch):
+    now = datetime.now(timezone.utc)
+    mentions = [
+        Mention("news", "gdelt", f"https://example.com/{i}", now, text)
+        for i, text in enumerate(["Apple beats estimates", "Pear growers see record harvest", "AAPL falls 2%"])
+    ]
+    scored = []
+    monkeypatch.setattr("src.app.score_sentiments", lambda texts: scored.extend(texts) or [0.0] * len(texts))
+    counts = store_mentions("AAPL", mentions, now - timedelta(days=1), "test", company="Apple Inc")
+    assert (counts["inserted"], counts["irrelevant"]) == (2, 1)
+    assert "Pear growers see record harvest" not in scored
+
+    monkeypatch.setenv("RELEVANCE_FILTER", "0")
+    more = [Mention("news", "gdelt", "https://example.com/9", now, "Pear growers see record harvest")]
+    assert store_mentions("AAPL", more, now - timedelta(days=1), "test")["inserted"] == 1
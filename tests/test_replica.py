@@ -0,0 +1,58 @@
+from datetime import datetime
+
+import pytest
+
+from src import replica
+from src.app import create_app
+from src.db import db
+from src.models import SocialMention
+
+
+@pytest.fixture
+def replica_client(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'primary.sqlite3'}")
+    monkeypatch.setenv("DATABASE_REPLICA_URL", f"sqlite:///{tmp_path / 'replica.sqlite3'}")
+    monkeypatch.setenv("REPLICA_LAG_CHECK_SECONDS", "0")
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines[replica.REPLICA_BIND])
+        # only the primary has the row, so a replica read comes back empty
+        db.session.add(SocialMention(
+            platform="news", source="gdelt", symbol="AAPL", created_at=datetime.utcnow(), text="t", url="u",
+        ))
+        db.session.commit()
+        yield app.test_client()
+        db.session.remove()
+    # init_app registered an (empty) metadata for the bind; later apps have no replica
+    db.metadatas.pop(replica.REPLICA_BIND, None)
+
+
+def _items(client, symbol="AAPL"):
+    return client.get("/api/mentions", query_string={"symbol": symbol}).get_json()["items"]
+
+
+def test_reads_go_to_replica_until_collect(replica_client, monkeypatch):
+    assert _items(replica_client) == []
+
+    monkeypatch.setattr("src.app.run_collectors_task", lambda symbol: {})
+    resp = replica_client.post("/collect", data={"symbol": "aapl"})
+    assert replica.STICKY_COOKIE in resp.headers["Set-Cookie"]
+
+    # pinned for AAPL only
+    assert len(_items(replica_client)) == 1
+    assert _items(replica_client, "MSFT") == []
+
+
+def test_lagging_replica_falls_back_to_primary(replica_client, monkeypatch):
+    monkeypatch.setattr(replica, "replica_lag", lambda: 120.0)
+    assert len(_items(replica_client)) == 1
+    monkeypatch.setattr(replica, "replica_lag", lambda: None)
+    assert len(_items(replica_client)) == 1
+
+
+def test_no_replica_configured(client):
+    resp = client.post("/api/mentions?symbol=AAPL")
+    assert resp.status_code == 405
+    assert not replica.enabled()
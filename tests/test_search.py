@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.db import db
+from src.models import SocialMention
+from src.search import fts5_query, search_mentions
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+HEADLINES = [
+    ("NVDA", "Nvidia cuts guidance as export curbs bite", 0),
+    ("NVDA", "Nvidia guidance cut: what analysts say", 1),
+    ("NVDA", "Nvidia raises guidance on data center demand", 2),
+    ("NVDA", "Nvidia guidance cuts weigh on chip stocks", 30),
+    ("AMD", "AMD cuts guidance too", 3),
+    ("NVDA", "Nvidia unveils new GPU", 4),
+]
+
+
+@pytest.fixture
+def headlines(app):
+    for i, (symbol, text, hours_ago) in enumerate(HEADLINES):
+        db.session.add(SocialMention(
+            platform="news", source="gdelt", symbol=symbol, text=text,
+            url=f"https://example.com/{i}", created_at=NOW - timedelta(hours=hours_ago),
+        ))
+    db.session.commit()
+
+
+def _search(client, **params):
+    resp = client.get("/api/mentions/search", query_string=params)
+    assert resp.status_code == 200, resp.get_json()
+    return resp.get_json()
+
+
+def test_search_matches_stems_and_filters(client, headlines):
+    texts = [i["text"] for i in _search(client, q="guidance cut", symbol="NVDA")["items"]]
+    assert set(texts) == {HEADLINES[0][1], HEADLINES[1][1], HEADLINES[3][1]}
+
+    since = (NOW - timedelta(hours=24)).isoformat()
+    texts = [i["text"] for i in _search(client, q="guidance cut", symbol="NVDA", since=since)["items"]]
+    assert HEADLINES[3][1] not in texts and len(texts) == 2
+
+    items = _search(client, q="guidance -raises", symbol="NVDA")["items"]
+    assert all("raises" not in i["text"] for i in items) and len(items) == 3
+    assert {i["symbol"] for i in _search(client, q="guidance")["items"]} == {"NVDA", "AMD"}
+
+
+@pytest.mark.parametrize("order", ["rank", "recent"])
+def test_keyset_pages_cover_every_match_once(client, headlines, order):
+    seen, cursor = [], None
+    while True:
+        page = _search(client, q="guidance", order=order, limit=2, **({"cursor": cursor} if cursor else {}))
+        seen += [i["id"] for i in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 5
+    if order == "rank":
+        ranks = [i["rank"] for i in _search(client, q="guidance", limit=10)["items"]]
+        assert ranks == sorted(ranks, reverse=True)
+
+
+def test_index_follows_deletes(client, headlines):
+    db.session.query(SocialMention).filter(SocialMention.symbol == "AMD").delete()
+    db.session.commit()
+    assert {i["symbol"] for i in _search(client, q="guidance")["items"]} == {"NVDA"}
+
+
+def test_user_syntax_never_reaches_fts5_raw():
+    assert fts5_query('"guidance cut" OR raise -AMD') == '("guidance cut" OR "raise") NOT ("AMD")'
+    assert fts5_query('NEAR( AND "') == '"NEAR" "AND"'
+    with pytest.raises(ValueError):
+        fts5_query("-only OR")
+
+
+def test_bad_requests(client, headlines):
+    assert client.get("/api/mentions/search").status_code == 400
+    assert client.get("/api/mentions/search?q=x&order=best").status_code == 400
+    assert client.get("/api/mentions/search?q=x&cursor=!!").status_code == 400
+
+
+@pytest.mark.postgres
+def test_rank_pages_cross_ties_on_postgres(live_postgres):
+    # identical texts: every row has the same ts_rank_cd
+    for i in range(7):
+        db.session.add(SocialMention(
+            platform="news", source="gdelt", symbol="NVDA", text="Nvidia cuts guidance",
+            url=f"https://example.com/{i}", created_at=NOW - timedelta(hours=i),
+        ))
+    db.session.commit()
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = search_mentions(db.session, "guidance", order="rank", limit=2, cursor=cursor)
+        seen += [m.id for m, _ in rows]
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 7
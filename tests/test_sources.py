@@ -0,0 +1,98 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+import requests
+
+from src import upstream
+from src.db import db
+from src.models import SocialMention
+from src.sources import ADAPTERS, collect_sources, fetch_all
+from src.sources.reddit import RedditSource
+from src.sources.rss import RssSource
+
+FIXTURES = Path(__file__).parent / "fixtures" / "sources"
+SINCE = datetime(2026, 10, 17, tzinfo=timezone.utc)
+
+
+class _Session:
+    """Serves fixture files by URL suffix."""
+
+    def __init__(self, routes):
+        self.routes = routes
+
+    def get(self, url, **kwargs):
+        for suffix, name in self.routes.items():
+            if suffix in url:
+                r = requests.Response()
+                r.status_code, r.url = 200, url
+                r._content = (FIXTURES / name).read_bytes()
+                return r
+        raise requests.ConnectionError(url)
+
+
+@pytest.fixture
+def fixtures(monkeypatch):
+    monkeypatch.setattr(upstream, "get_redis_conn", lambda: None)
+    monkeypatch.setattr(upstream, "_breakers", {})
+    monkeypatch.setenv("NEWS_RSS_FEEDS", "https://finance.example.com/{symbol}.rss,https://wire.example.com/atom")
+    monkeypatch.setenv("REDDIT_SUBREDDITS", "stocks")
+    monkeypatch.setattr("src.app.get_company_name", lambda symbol: "Apple Inc")
+    monkeypatch.setattr(upstream, "session", lambda: _Session({
+        ".rss": "rss.xml", "/atom": "atom.xml", "search.json": "reddit.json",
+    }))
+
+
+def test_adapters_normalize_fixtures(fixtures):
+    rss, stats = fetch_all([RssSource()], "AAPL")
+    assert stats == {"errors": 0, "skipped": 0}
+    assert [m.url for m in rss if m] == [
+        "https://finance.example.com/news/apple-beats-estimates",
+        "https://finance.example.com/news/apple-supplier-warns",
+        "https://finance.example.com/news/apple-unveils-macs",
+        "https://wire.example.com/apple-record-high",
+        "https://finance.example.com/news/apple-beats-estimates",
+    ]
+    assert rss.count(None) == 1  # the undated item
+    assert rss[1].created_at == datetime(2026, 10, 18, 13, 30, tzinfo=timezone.utc)
+    assert rss[0].source == "finance.example.com"
+
+    reddit, _ = fetch_all([RedditSource()], "AAPL")
+    assert reddit[0].platform == "reddit" and reddit[0].source == "stocks"
+    assert reddit[0].url == "https://www.reddit.com/r/stocks/comments/abc123/aapl_earnings_thread/"
+    assert reddit[2] is None
+
+
+def test_collect_stores_one_batch_and_dedups(app, fixtures):
+    result = collect_sources("AAPL", app=app, sources=sorted(ADAPTERS), since=SINCE)
+    # 4 fresh news (one syndicated twice) + 2 reddit; 1 stale, 2 invalid
+    assert (result["inserted"], result["duplicate"], result["stale"], result["invalid"]) == (5, 1, 1, 2)
+    rows = db.session.query(SocialMention).all()
+    assert {r.platform for r in rows} == {"news", "reddit"}
+    assert all(r.symbol == "AAPL" and r.sentiment is not None for r in rows)
+
+    again = collect_sources("AAPL", app=app, sources=sorted(ADAPTERS), since=SINCE)
+    assert (again["inserted"], again["duplicate"]) == (0, 6)
+
+
+def test_open_breaker_skips_only_that_source(app, fixtures):
+    for _ in range(upstream.BREAKER_FAILURES):
+        upstream.breaker("reddit")._local.record_failure()
+    result = collect_sources("AAPL", app=app, sources=["rss", "reddit"], since=SINCE)
+    assert result["skipped"] == 1 and result["inserted"] == 3
+
+
+def test_dead_feed_host_skips_only_that_feed(fixtures):
+    for _ in range(upstream.BREAKER_FAILURES):
+        upstream.breaker("rss:wire.example.com")._local.record_failure()
+    rss, stats = fetch_all([RssSource()], "AAPL")
+    assert stats == {"errors": 0, "skipped": 1}
+    assert {m.source for m in rss if m} == {"finance.example.com"}
+    states = upstream.breaker_states()
+    assert states["rss:wire.example.com"] == "open" and states["rss:finance.example.com"] == "closed"
+
+
+def test_unknown_source_rejected(monkeypatch):
+    monkeypatch.setenv("INGEST_SOURCES", "rss,myspace")
+    with pytest.raises(ValueError, match="myspace"):
+        collect_sources("AAPL")
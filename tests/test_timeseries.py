@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+from src.db import db
+from src.models import MentionRollup, SocialMention
+from src.rollups import LATE_HOURS, roll_forward, rolled_until
+from src.timeseries import effective_interval, lttb_indices, minmax_indices
+
+
+def _seed(start, hours, per_hour=3):
+    for h in range(hours):
+        for i in range(per_hour):
+            db.session.add(SocialMention(
+                platform="news", source="gdelt", symbol="AAPL",
+                created_at=start + timedelta(hours=h, minutes=10 * i),
+                text="t", url=f"u{h}-{i}", sentiment=0.5 if h % 2 else -0.5,
+            ))
+    db.session.commit()
+
+
+def test_lttb_keeps_endpoints_and_bounds_size():
+    xs = [float(i) for i in range(1000)]
+    ys = [((i * 37) % 101) / 100 for i in range(1000)]
+    idx = lttb_indices(xs, ys, 50)
+    assert len(idx) == 50
+    assert idx[0] == 0 and idx[-1] == 999
+    assert idx == sorted(idx)
+
+
+def test_minmax_keeps_extremes():
+    ys = [0.0] * 100
+    ys[42] = 1.0
+    ys[77] = -1.0
+    idx = minmax_indices(ys, 10)
+    assert 42 in idx and 77 in idx
+    assert len(idx) <= 10
+
+
+def test_effective_interval_coarsens_huge_ranges():
+    start = datetime(2025, 1, 1)
+    assert effective_interval(start, start + timedelta(days=1), "minute") == "minute"
+    assert effective_interval(start, start + timedelta(days=365), "minute") == "hour"
+
+
+def test_timeseries_same_result_with_and_without_rollup(client):
+    start = datetime(2026, 1, 1)
+    _seed(start, hours=6)
+    params = {"symbol": "AAPL", "from": "2026-01-01T00:00:00", "to": "2026-01-01T06:00:00"}
+
+    raw = client.get("/api/timeseries", query_string=params).get_json()
+    roll_forward(db.session, now=start + timedelta(hours=4 + LATE_HOURS))
+    assert rolled_until(db.session) == start + timedelta(hours=4)
+    mixed = client.get("/api/timeseries", query_string=params).get_json()
+
+    assert raw["points"] == mixed["points"]
+    assert [p["count"] for p in raw["points"]] == [3] * 6
+    assert raw["points"][0]["mean_sentiment"] == -0.5
+    assert raw["points"][1]["vw_sentiment"] == 0.0
+
+    daily = client.get("/api/timeseries", query_string={**params, "interval": "day"}).get_json()
+    assert daily["points"][0]["count"] == 18
+
+
+def test_late_mentions_count_before_and_after_the_rollup_catches_up(client):
+    start = datetime(2026, 1, 1)
+    _seed(start, hours=6)
+    params = {"symbol": "AAPL", "from": "2026-01-01T00:00:00", "to": "2026-01-01T06:00:00"}
+
+    # hours still inside the late window are rolled up but read from raw rows
+    roll_forward(db.session, now=start + timedelta(hours=6))
+    db.session.add(SocialMention(
+        platform="news", source="gdelt", symbol="AAPL", created_at=start + timedelta(hours=1, minutes=45),
+        text="t", url="late", sentiment=0.5,
+    ))
+    db.session.commit()
+    counts = [p["count"] for p in client.get("/api/timeseries", query_string=params).get_json()["points"]]
+    assert counts == [3, 4, 3, 3, 3, 3]
+
+    # runs were missed; the next one recomputes everything since the watermark
+    roll_forward(db.session, now=start + timedelta(hours=6 + LATE_HOURS))
+    assert rolled_until(db.session) == start + timedelta(hours=6)
+    assert db.session.query(MentionRollup).filter_by(bucket_start=start + timedelta(hours=1)).one().count == 4
+    counts = [p["count"] for p in client.get("/api/timeseries", query_string=params).get_json()["points"]]
+    assert counts == [3, 4, 3, 3, 3, 3]
+
+
+def test_vw_sentiment_does_not_depend_on_the_range_start(client, monkeypatch):
+    monkeypatch.setattr("src.timeseries.VW_WINDOW", 4)
+    _seed(datetime(2026, 1, 1), hours=10)
+
+    def vw_at(frm, t="2026-01-01T08:00:00"):
+        params = {"symbol": "AAPL", "from": frm, "to": "2026-01-01T10:00:00"}
+        points = client.get("/api/timeseries", query_string=params).get_json()["points"]
+        return next(p["vw_sentiment"] for p in points if p["t"] == t)
+
+    # hours 5..8: two at +0.5, two at -0.5
+    assert vw_at("2026-01-01T00:00:00") == vw_at("2026-01-01T07:30:00") == vw_at("2026-01-01T08:00:00") == 0.0
+    assert vw_at("2026-01-01T00:00:00", "2026-01-01T02:00:00") == -0.5 / 3
+
+
+def test_report_hour_table_counts_all_rows(client):
+    created_at = datetime.utcnow() - timedelta(hours=12)
+    for i in range(30):
+        db.session.add(SocialMention(
+            platform="news", source="gdelt", symbol="AAPL",
+            created_at=created_at, text="t", url=f"u{i}", sentiment=0.1,
+        ))
+    db.session.commit()
+    html = client.get("/report", query_string={"symbol": "AAPL"}).get_data(as_text=True)
+    assert "<td>30</td>" in html
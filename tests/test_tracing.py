@@ -0,0 +1,24 @@
+from src import tracing
+
+
+def test_spans_nest_and_continue_remote_trace():
+    parent = "00-" + "ab" * 16 + "-" + "cd" * 8 + "-01"
+    with tracing.span("root", traceparent=parent) as root:
+        with tracing.span("child") as child:
+            assert tracing.current_traceparent() == child.traceparent
+    assert root.trace_id == "ab" * 16
+    assert root.parent_id == "cd" * 8
+    assert child.parent_id == root.span_id
+    assert [s.name for s in root.finished_spans] == ["child", "root"]
+    assert tracing.current_span() is None
+
+
+def test_parse_traceparent_rejects_garbage():
+    assert tracing.parse_traceparent("nonsense") is None
+    assert tracing.parse_traceparent("00-" + "0" * 32 + "-" + "cd" * 8 + "-01") is None
+
+
+def test_server_timing_header(client):
+    r = client.get("/api/mentions?symbol=AAPL", headers={"traceparent": "00-" + "ab" * 16 + "-" + "cd" * 8 + "-01"})
+    assert "total;dur=" in r.headers["Server-Timing"]
+    assert r.headers["traceresponse"].startswith("00-" + "ab" * 16)
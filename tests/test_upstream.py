@@ -0,0 +1,127 @@
+import pytest
+import redis
+import requests
+from prometheus_client import REGISTRY
+
+from src import queue as q
+from src import tasks, upstream
+from src.breaker import CLOSED, HALF_OPEN, OPEN, SharedCircuitBreaker
+
+
+class _Session:
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        r = requests.Response()
+        r.status_code = self.outcome
+        return r
+
+
+@pytest.fixture
+def local_breakers(monkeypatch):
+    # no Redis: every breaker runs on its in-process fallback
+    monkeypatch.setattr(upstream, "get_redis_conn", lambda: None)
+    monkeypatch.setattr(upstream, "_breakers", {})
+    monkeypatch.setattr(upstream, "BREAKER_FAILURES", 2)
+
+
+def test_open_breaker_fails_fast(local_breakers, monkeypatch):
+    s = _Session(requests.Timeout("slow"))
+    monkeypatch.setattr(upstream, "session", lambda: s)
+    for _ in range(2):
+        with pytest.raises(requests.Timeout):
+            upstream.get("gdelt", "http://gdelt.test")
+    with pytest.raises(upstream.UpstreamUnavailable):
+        upstream.get("gdelt", "http://gdelt.test")
+    assert s.calls == 2
+    states = upstream.breaker_states()
+    assert states["gdelt"] == OPEN and states["stooq"] == CLOSED
+
+
+def test_server_errors_trip_but_client_errors_do_not(local_breakers, monkeypatch):
+    monkeypatch.setattr(upstream, "session", lambda: _Session(404))
+    for _ in range(3):
+        assert upstream.get("stooq", "http://stooq.test").status_code == 404
+    assert upstream.breaker("stooq").state == CLOSED
+
+    monkeypatch.setattr(upstream, "session", lambda: _Session(503))
+    for _ in range(2):
+        upstream.get("stooq", "http://stooq.test")
+    assert upstream.breaker("stooq").state == OPEN
+
+
+def test_gdelt_429_after_backoff_is_an_error_not_a_skip(local_breakers, monkeypatch):
+    from scripts import fetch_news_gdelt
+
+    monkeypatch.setattr(upstream, "BREAKER_FAILURES", 5)
+    monkeypatch.setattr(upstream, "session", lambda: _Session(429))
+    monkeypatch.setattr(fetch_news_gdelt.time, "sleep", lambda s: None)
+    with pytest.raises(requests.HTTPError):
+        fetch_news_gdelt.fetch_gdelt_articles("AAPL")
+    assert upstream.breaker("gdelt").state == CLOSED
+
+    # once the 429s have tripped the breaker it is a skip
+    monkeypatch.setattr(upstream, "_breakers", {})
+    monkeypatch.setattr(upstream, "BREAKER_FAILURES", 1)
+    with pytest.raises(upstream.UpstreamUnavailable):
+        fetch_news_gdelt.fetch_gdelt_articles("AAPL")
+
+
+def test_local_fallback_exports_its_own_label(local_breakers):
+    b = upstream.breaker("gdelt")
+    b._local.record_failure()
+    b._local.record_failure()
+    assert REGISTRY.get_sample_value("circuit_breaker_state", {"breaker": "gdelt:local"}) == 2
+
+
+def test_open_provider_still_returns_partial_results(local_breakers, monkeypatch):
+    def collect_news(symbol, app=None):
+        raise upstream.UpstreamUnavailable("gdelt")
+
+    monkeypatch.setattr("scripts.fetch_news_gdelt.collect_news", collect_news)
+    monkeypatch.setattr("scripts.fetch_quote.collect_quote", lambda symbol, app=None: {"symbol": "AAPL.US", "inserted": 1})
+    monkeypatch.setattr(tasks, "_collector_app", lambda: None)
+    assert tasks.run_collectors_task("AAPL") == {"fetch_quote": 0, "fetch_news_gdelt": 1}
+
+
+def test_health_reports_breakers(client, local_breakers, monkeypatch):
+    monkeypatch.setattr("src.health.CACHE_SECONDS", 0)
+    upstream.breaker("gdelt")._local.record_failure()
+    upstream.breaker("gdelt")._local.record_failure()
+    check = client.get("/health").get_json()["checks"]["upstreams"]
+    assert check["status"] == "degraded" and check["breakers"]["gdelt"] == OPEN
+
+
+@pytest.fixture
+def live_redis():
+    conn = redis.Redis.from_url("redis://localhost:6379/15")
+    try:
+        conn.ping()
+    except redis.ConnectionError:
+        pytest.skip("needs a local Redis")
+    conn.flushdb()
+    yield conn
+    conn.flushdb()
+
+
+def test_breaker_state_is_shared_across_processes(live_redis, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("src.breaker.time.time", lambda: clock[0])
+    # two instances stand in for two processes
+    a, b = (SharedCircuitBreaker("gdelt", lambda: live_redis, q.QUEUE_PREFIX, 2, 10) for _ in range(2))
+
+    a.record_failure()
+    b.record_failure()
+    assert not a.allow() and not b.allow()
+
+    clock[0] += 10
+    assert a.state == HALF_OPEN
+    assert a.allow()
+    assert not b.allow()  # one probe across processes
+    a.record_success()
+    assert b.allow() and b.state == CLOSED
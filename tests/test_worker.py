@@ -0,0 +1,42 @@
+import os
+
+import importlib
+
+from rq import Worker
+
+from src import tasks, upstream
+
+
+def test_preload_warms_app_and_http_session(app, monkeypatch):
+    monkeypatch.setattr(tasks, "_app", None)
+    monkeypatch.setattr(upstream, "_session", None)
+    warm = tasks.preload()
+    assert tasks._collector_app() is app  # inside an app context the current app wins
+    assert warm is app
+    assert upstream._session is not None
+
+
+def test_http_session_is_not_shared_with_forked_children():
+    parent = upstream.session()
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.write(w, b"1" if upstream._session is None and upstream.session() is not parent else b"0")
+        os._exit(0)
+    os.waitpid(pid, 0)
+    assert os.read(r, 1) == b"1"
+    assert upstream.session() is parent
+
+
+def test_recycling_worker_passes_max_jobs(monkeypatch, tmp_path):
+    # worker.py sets these process-wide on import; keep them scoped to this test
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setenv("DB_ROLE", "worker")
+    worker = importlib.import_module("worker")
+
+    seen = {}
+    monkeypatch.setattr(Worker, "work", lambda self, *a, **kw: seen.update(kw) or True)
+    monkeypatch.setattr(worker.RecyclingWorker, "max_jobs", 3)
+    w = worker.RecyclingWorker.__new__(worker.RecyclingWorker)  # the constructor needs a live Redis
+    assert w.work(burst=True)
+    assert seen["max_jobs"] == 3
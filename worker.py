@@ -1,16 +1,107 @@
 # worker.py
+#
+# WORKER_MODE=fork (default) one RQ worker; every job runs in a fresh fork of it
+# WORKER_MODE=pool           WORKER_CONCURRENCY worker processes that run jobs
+#                            in-process and exit after WORKER_MAX_JOBS jobs
+#
+# Either way the app, its engines, the VADER lexicon and the HTTP session are
+# built once before forking (src.tasks.preload), so no job pays for them.
+# Workers take interactive, then scheduled, then backfill jobs (src/queue.py).
+#
+# Metrics from the worker, its jobs and the collectors they start are served on
+# WORKER_METRICS_PORT and/or pushed to PROMETHEUS_PUSHGATEWAY_URL
+# (src.monitoring.export_worker_metrics); the web dyno's /metrics doesn't see them.
+import multiprocessing
 import os
+import shutil
+import tempfile
+
+# Prometheus multiprocess dir: the worker's own, so it and a web server on the
+# same host never clear each other's files. Must be set before prometheus_client
+# is imported.
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR",
+    os.path.join(tempfile.gettempdir(), "sentiment-scraper-worker-metrics"),
+)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+os.environ.setdefault("DB_ROLE", "worker")  # pool sizing defaults, see src/db.py
+
 import redis
-from rq import Worker, Queue
+from rq import SimpleWorker, Worker
+from rq.worker_pool import WorkerPool
 
-# Keep compatibility with both env names used in this repo.
-queue_name = os.getenv("RQ_QUEUE_NAME") or os.getenv("RQ_QUEUE") or "sentiment-scraper"
-listen = [queue_name]
+from src.queue import PriorityWorkerMixin, get_queue, get_queues
 
 redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 conn = redis.from_url(redis_url)
 
+WORKER_MODES = ("fork", "pool")
+
+
+class PriorityWorker(PriorityWorkerMixin, Worker):
+    def fork_work_horse(self, job, queue):
+        super().fork_work_horse(job, queue)
+        self._metrics_pid = self._horse_pid  # monitor_work_horse resets _horse_pid
+
+    def execute_job(self, job, queue):
+        try:
+            return super().execute_job(job, queue)
+        finally:
+            from prometheus_client import multiprocess
+
+            # the horse has exited; drop its live gauges (its counters stay)
+            multiprocess.mark_process_dead(self._metrics_pid)
+
+
+class RecyclingWorker(PriorityWorkerMixin, SimpleWorker):
+    """Runs jobs in its own (preloaded) process and exits after WORKER_MAX_JOBS so the pool replaces it."""
+
+    max_jobs = int(os.getenv("WORKER_MAX_JOBS", "500")) or None
+
+    def work(self, *args, **kwargs):
+        kwargs.setdefault("max_jobs", self.max_jobs)
+        try:
+            return super().work(*args, **kwargs)
+        finally:
+            from prometheus_client import multiprocess
+
+            # drop this pid's live gauges; its replacement reports its own
+            multiprocess.mark_process_dead(os.getpid())
+
+
+def reset_metrics_dir() -> None:
+    """Start from an empty multiprocess dir; files left by a previous run would be summed in."""
+    metrics_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir, exist_ok=True)
+
+
 if __name__ == "__main__":
-    queues = [Queue(name, connection=conn) for name in listen]
-    worker = Worker(queues, connection=conn)
-    worker.work(with_scheduler=True)
+    from src.monitoring import export_worker_metrics
+    from src.tasks import preload, schedule_maintenance
+
+    mode = os.getenv("WORKER_MODE", "fork").strip().lower()
+    if mode not in WORKER_MODES:
+        raise SystemExit(f"WORKER_MODE must be one of {', '.join(WORKER_MODES)}")
+
+    reset_metrics_dir()
+    export_worker_metrics()
+    preload()
+
+    queues = get_queues(conn)  # highest priority first
+    # partition upkeep + retention; reschedules itself every MENTION_MAINTENANCE_HOURS
+    schedule_maintenance(get_queue("scheduled", conn))
+
+    if mode == "pool":
+        # children must inherit the preloaded interpreter, not re-import it
+        multiprocessing.set_start_method("fork", force=True)
+        pool = WorkerPool(
+            queues,
+            connection=conn,
+            num_workers=int(os.getenv("WORKER_CONCURRENCY", "4")),
+            worker_class=RecyclingWorker,
+        )
+        pool.start()
+    else:
+        worker = PriorityWorker(queues, connection=conn)
+        worker.work(with_scheduler=True)